@@ -1,5 +1,7 @@
 import streamlit as st
 
+from speroba.aset import gambar_web, muat_aset
+
 # ================= KONFIGURASI HALAMAN =================
 st.set_page_config(
     page_title="Sistem Informasi Sekolah",
@@ -7,6 +9,9 @@ st.set_page_config(
     page_icon="🎓"
 )
 
+# Semua aset gambar dibaca sekali per proses; aset yang hilang langsung error di sini
+muat_aset()
+
 # ================= CSS KUSTOM =================
 st.markdown("""
     <style>
@@ -125,7 +130,7 @@ col1, col2, col3 = st.columns([10, 100, 10])
 
 with col1:
     # Ganti dengan path ke logo kiri Anda
-    st.image("assets/logo_kiri.png", width=70)
+    st.image(gambar_web("logo_kiri", 70), width=70)
 
 with col2:
     st.markdown("<h1 class='title'>SISTEM INFORMASI SEKOLAH</h1>", unsafe_allow_html=True)
@@ -133,7 +138,7 @@ with col2:
 
 with col3:
     # Ganti dengan path ke logo kanan Anda
-    st.image("assets/logo_kanan.png", width=70)
+    st.image(gambar_web("logo_kanan", 70), width=70)
 
 # ================= TEKS PEMBUKA MENARIK =================
 st.markdown("""
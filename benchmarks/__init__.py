@@ -0,0 +1 @@
+"""Benchmark render dokumen (lihat benchmarks/render.py)."""
@@ -0,0 +1,66 @@
+"""
+Data sintetis seukuran sekolah untuk benchmark: roster daftar_siswa.csv digandakan `skala` kali
+(kelas salinan diberi akhiran, mis. 7A-2, tetap sejenjang), lalu nilai acak deterministik (seed tetap).
+"""
+import numpy as np
+import pandas as pd
+
+from speroba.laporan_asesmen import MAPEL_SEMUA
+from speroba.laporan_to import MAPEL_TO
+from speroba.olah_nilai import INPUT_SCORE_COLS, hitung_nilai, prepare_score_frame
+from speroba.peringkat_tkad import JUMLAH_SESI, hitung_peringkat_tkad
+from speroba.roster import DEFAULT_ROSTER_PATH, Roster, parse_roster_csv
+
+SEED = 2025
+
+
+def roster_sintetis(skala: int, path: str = DEFAULT_ROSTER_PATH) -> Roster:
+    """Roster asli digandakan `skala` kali; NIS salinan diberi awalan agar tetap unik."""
+    with open(path, "rb") as fh:
+        base = parse_roster_csv(fh.read())
+    salinan = []
+    for s in range(skala):
+        df = base.copy()
+        if s:
+            df["Kelas"] = df["Kelas"] + f"-{s + 1}"
+            df["NIS"] = f"{s + 1}" + df["NIS"]
+        salinan.append(df)
+    return Roster(pd.concat(salinan, ignore_index=True))
+
+
+def _skor(rng, n, kolom):
+    # Nilai 40-100 dengan sebagian pecahan .5 dan ~2% sel kosong
+    nilai = rng.integers(80, 201, size=(n, kolom)) / 2
+    nilai[rng.random((n, kolom)) < 0.02] = np.nan
+    return nilai
+
+
+def _identitas(roster: Roster) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Kelas": roster.df["Kelas"].to_numpy(),
+        "NIS": roster.df["NIS"].to_numpy(),
+        "Nama Siswa": roster.df["Nama"].to_numpy(),
+    })
+
+
+def nilai_asesmen_sintetis(roster: Roster, mapel=MAPEL_SEMUA, seed: int = SEED) -> pd.DataFrame:
+    """Workbook nilai Hasil Ujian (sudah dinormalisasi ke float) untuk seluruh roster."""
+    df = _identitas(roster)
+    skor = _skor(np.random.default_rng(seed), len(df), len(mapel))
+    return pd.concat([df, pd.DataFrame(skor, columns=mapel)], axis=1)
+
+
+def nilai_to_sintetis(roster: Roster, mapel=MAPEL_TO, seed: int = SEED) -> pd.DataFrame:
+    """Workbook nilai TKA/TKAD kelima sesi beserta kolom peringkatnya."""
+    df = _identitas(roster)
+    kolom = [f"{m}_TKAD{i}" for i in range(1, JUMLAH_SESI + 1) for m in mapel]
+    skor = _skor(np.random.default_rng(seed), len(df), len(kolom))
+    df = pd.concat([df, pd.DataFrame(skor, columns=kolom)], axis=1)
+    return df.join(hitung_peringkat_tkad(df, mapel))
+
+
+def nilai_olah_sintetis(roster: Roster, seed: int = SEED) -> pd.DataFrame:
+    """Frame Olah Nilai (TP/LM/PTS/SAS, sel kosong = 0.0) yang sudah dihitung NR, status TK, dan deskripsinya."""
+    df = prepare_score_frame(roster.df)
+    df[INPUT_SCORE_COLS] = np.nan_to_num(_skor(np.random.default_rng(seed), len(df), len(INPUT_SCORE_COLS)))
+    return hitung_nilai(df)
@@ -0,0 +1,197 @@
+"""
+Benchmark render semua generator dokumen pada data sintetis 1x/10x/100x daftar_siswa.csv.
+
+    python -m benchmarks.render                     # bandingkan dengan benchmarks/baseline.json
+    python -m benchmarks.render --skala 1 10        # hanya skala tertentu
+    python -m benchmarks.render --simpan-baseline   # tulis hasil sebagai baseline baru
+
+Setiap (kasus, skala) dijalankan di proses baru agar puncak memori (ru_maxrss) tidak tercampur
+antar kasus. Waktu adalah yang tercepat dari beberapa ulangan; memori adalah kenaikan puncak RSS
+proses selama render (tanpa proses worker). Keluar dengan kode 1 bila ada regresi.
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SKALA = (1, 10, 100)
+SEMESTER, TAHUN = "Ganjil", "2025/2026"
+TGL_TTD = datetime.date(2025, 12, 19)
+
+
+def _kasus_daftar_siswa(roster, workers):
+    from speroba.formulir import daftar_siswa_semua_kelas
+    return daftar_siswa_semua_kelas(roster, roster.kelas, SEMESTER, TAHUN, as_zip=True, max_workers=workers)
+
+
+def _kasus_form_nilai(roster, workers):
+    from speroba.formulir import buat_massal
+    args = [(roster.siswa_kelas(k), "Matematika", SEMESTER, k, TAHUN, "", "") for k in roster.kelas]
+    return b"".join(buat_massal("generate_excel_form_nilai_siswa", args, max_workers=workers))
+
+
+def _kasus_absensi(roster, workers):
+    from speroba.formulir import absensi_massal
+    return absensi_massal(roster, roster.kelas, ["Matematika"], SEMESTER, TAHUN, max_workers=workers)
+
+
+def _kasus_laporan_asesmen(roster, workers):
+    from benchmarks.data_sintetis import nilai_asesmen_sintetis
+    from speroba.laporan_asesmen import MAPEL_KELAS_7_8, MAPEL_KELAS_9, make_pdf_for_all_classes_parallel
+    df = nilai_asesmen_sintetis(roster)
+    return lambda: make_pdf_for_all_classes_parallel(df, roster.kelas, MAPEL_KELAS_7_8, MAPEL_KELAS_9,
+                                                     "ASESMEN SUMATIF AKHIR SEMESTER", TAHUN, TGL_TTD,
+                                                     max_workers=workers)
+
+
+def _kasus_laporan_to(roster, workers):
+    from benchmarks.data_sintetis import nilai_to_sintetis
+    from speroba.laporan_to import ASESMEN_TO, TGL_KEGIATAN_TO, make_pdf_for_all_classes_parallel
+    df = nilai_to_sintetis(roster)
+    return lambda: make_pdf_for_all_classes_parallel(df, roster.kelas, ASESMEN_TO[0], TAHUN, TGL_KEGIATAN_TO[0],
+                                                     TGL_TTD, max_workers=workers)
+
+
+def _kasus_olah_form_nilai(roster, workers):
+    from benchmarks.data_sintetis import nilai_olah_sintetis
+    from speroba.olah_nilai import export_multisheet_form_nilai
+    df = nilai_olah_sintetis(roster)
+    return lambda: export_multisheet_form_nilai(df, roster.kelas, "Matematika", SEMESTER, TAHUN, "", "")
+
+
+def _kasus_olah_report_tk(roster, workers):
+    from benchmarks.data_sintetis import nilai_olah_sintetis
+    from speroba.olah_nilai import export_multisheet_report_tk
+    df = nilai_olah_sintetis(roster)
+    return lambda: export_multisheet_report_tk(df, roster.kelas, "Matematika", TAHUN)
+
+
+# nama -> (fungsi, butuh_persiapan). Fungsi dengan persiapan mengembalikan callable render,
+# sehingga pembuatan workbook nilai sintetis tidak ikut terukur.
+KASUS = {
+    "daftar_siswa": (_kasus_daftar_siswa, False),
+    "form_nilai": (_kasus_form_nilai, False),
+    "absensi": (_kasus_absensi, False),
+    "laporan_asesmen_pdf": (_kasus_laporan_asesmen, True),
+    "laporan_to_pdf": (_kasus_laporan_to, True),
+    # Ekspor satu workbook berurutan (tanpa worker), --workers tidak berpengaruh
+    "olah_nilai_form_nilai": (_kasus_olah_form_nilai, True),
+    "olah_nilai_report_tk": (_kasus_olah_report_tk, True),
+}
+
+
+def _rss_puncak_mb():
+    try:
+        import resource
+    except ImportError:  # Windows: memori tidak diukur
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def _ukur(nama, skala, ulang, workers, antrean):
+    try:
+        from benchmarks.data_sintetis import roster_sintetis
+        fn, persiapan = KASUS[nama]
+        roster = roster_sintetis(skala)
+        render = fn(roster, workers) if persiapan else (lambda: fn(roster, workers))
+        rss_awal = _rss_puncak_mb()
+        waktu = []
+        for _ in range(ulang):
+            t = time.perf_counter()
+            hasil = render()
+            waktu.append(time.perf_counter() - t)
+        rss_akhir = _rss_puncak_mb()
+        antrean.put({
+            "detik": round(min(waktu), 4),
+            "memori_mb": None if rss_awal is None else round(rss_akhir - rss_awal, 1),
+            "ukuran_kb": round(len(hasil) / 1024, 1),
+            "siswa": len(roster.df),
+            "kelas": len(roster.kelas),
+        })
+    except Exception as e:  # dilaporkan sebagai kasus gagal, benchmark lain tetap jalan
+        antrean.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def jalankan(nama, skala, ulang, workers):
+    """Ukur satu kasus di proses baru (spawn)."""
+    ctx = multiprocessing.get_context("spawn")
+    antrean = ctx.Queue()
+    proses = ctx.Process(target=_ukur, args=(nama, skala, ulang, workers, antrean))
+    proses.start()
+    hasil = antrean.get()
+    proses.join()
+    return hasil
+
+
+def bandingkan(hasil, baseline, toleransi):
+    """Daftar regresi (teks) terhadap baseline: waktu atau memori naik lebih dari `toleransi`."""
+    regresi = []
+    for kunci, h in hasil.items():
+        b = baseline.get(kunci)
+        if not b or "error" in h or "error" in b:
+            continue
+        for metrik in ("detik", "memori_mb"):
+            lama, baru = b.get(metrik), h.get(metrik)
+            # Di bawah 50 ms / 5 MB selisih kecil didominasi noise
+            batas_bawah = 0.05 if metrik == "detik" else 5
+            if lama and baru and baru > max(lama * (1 + toleransi), lama + batas_bawah):
+                regresi.append(f"{kunci} {metrik}: {lama} -> {baru} (+{(baru / lama - 1) * 100:.0f}%)")
+    return regresi
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skala", type=int, nargs="+", default=list(SKALA))
+    parser.add_argument("--kasus", nargs="+", choices=sorted(KASUS), default=list(KASUS))
+    parser.add_argument("--ulang", type=int, default=3, help="ulangan per kasus pada skala 1 (skala lebih besar: 1x)")
+    parser.add_argument("--workers", type=int, default=1, help="proses worker untuk render massal (bawaan 1: urutan)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--simpan-baseline", action="store_true")
+    parser.add_argument("--toleransi", type=float, default=0.25, help="kenaikan relatif yang dianggap regresi")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh).get("hasil", {})
+
+    hasil = {}
+    print(f"{'kasus':<24}{'skala':>6}{'siswa':>8}{'detik':>10}{'memori MB':>11}{'ukuran KB':>12}{'vs baseline':>13}")
+    for skala in args.skala:
+        for nama in args.kasus:
+            kunci = f"{nama}@{skala}x"
+            h = jalankan(nama, skala, args.ulang if skala == 1 else 1, args.workers)
+            hasil[kunci] = h
+            if "error" in h:
+                print(f"{nama:<24}{skala:>5}x  GAGAL {h['error']}")
+                continue
+            b = baseline.get(kunci, {})
+            rasio = f"{h['detik'] / b['detik']:.2f}x" if b.get("detik") else "-"
+            memori = "-" if h["memori_mb"] is None else h["memori_mb"]
+            print(f"{nama:<24}{skala:>5}x{h['siswa']:>8}{h['detik']:>10.3f}{memori:>11}{h['ukuran_kb']:>12}{rasio:>13}")
+
+    if args.simpan_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({
+                "dibuat": datetime.datetime.now().isoformat(timespec="seconds"),
+                "mesin": f"{platform.platform()} / Python {platform.python_version()} / {os.cpu_count()} CPU",
+                "workers": args.workers,
+                "hasil": {**baseline, **hasil},
+            }, fh, indent=2, sort_keys=True)
+        print(f"Baseline disimpan ke {args.baseline}")
+        return 0
+
+    regresi = bandingkan(hasil, baseline, args.toleransi)
+    for r in regresi:
+        print("REGRESI", r)
+    return 1 if regresi else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Akar repo masuk sys.path saat pytest berjalan, jadi `pytest` dan `python -m pytest` sama-sama bisa import speroba
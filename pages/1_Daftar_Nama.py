@@ -1,17 +1,10 @@
 import streamlit as st
 import pandas as pd
-from io import BytesIO
-from openpyxl import Workbook
-from openpyxl.styles import Font, Border, Side, Alignment
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.page import PageMargins
 from datetime import datetime
 import pytz
-import os
 
-# --- Konstanta Global ---
-KEPALA_SEKOLAH = "Alina Fiftiyani Nurjannah, M.Pd."
-NIP_KEPSEK = "19800105 200903 2 006"
+from speroba.formulir import daftar_siswa_semua_kelas, generate_excel_daftar_siswa
+from speroba.roster import Roster, load_roster, normalize_roster
 
 # --- Daftar Mata Pelajaran Umum (untuk selectbox) ---
 COMMON_SUBJECTS = [
@@ -22,204 +15,6 @@ COMMON_SUBJECTS = [
     "Prakarya", "Bahasa Jawa"
 ]
 
-# =========================================================
-# Fungsi untuk membuat dokumen Excel "Daftar Siswa"
-# =========================================================
-def generate_excel_daftar_siswa(dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = f"Daftar Siswa {kelas}"
-
-    # --- Pengaturan Halaman (Legal, Portrait) ---
-    ws.page_setup.paperSize = ws.PAPERSIZE_LEGAL # Paper size Legal
-    # Margins in inches (1 inch = 25.4 mm)
-    ws.page_margins = PageMargins(left=28/25.4, right=18/25.4, top=24/25.4, bottom=19/25.4)
-    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT # Portrait
-    ws.print_options.horizontalCentered = True # Rata Halaman Horizontal
-    ws.print_options.verticalCentered = False # Rata Halaman Vertikal dinonaktifkan
-
-    # --- Styles ---
-    font_bold_12 = Font(name='Times New Roman', size=12, bold=True)
-    font_normal_12 = Font(name='Times New Roman', size=12)
-    thin_border = Border(left=Side(style='thin'),
-                         right=Side(style='thin'),
-                         top=Side(style='thin'),
-                         bottom=Side(style='thin'))
-    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    left_align = Alignment(horizontal='left', vertical='center', wrap_text=False)
-
-    # --- Header Dokumen Excel ---
-    current_row = 1
-    # Merge cells for main title (spans 7 columns: A-G)
-    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=7)
-    cell_title = ws[f'A{current_row}']
-    cell_title.value = "DAFTAR SISWA"
-    cell_title.font = font_bold_12
-    cell_title.alignment = center_align
-
-    current_row += 1
-    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=7)
-    cell_subtitle = ws[f'A{current_row}']
-    cell_subtitle.value = f"SMP NEGERI 2 BANGUNTAPAN TAHUN PELAJARAN {tahun_pelajaran}"
-    cell_subtitle.font = font_bold_12
-    cell_subtitle.alignment = center_align
-
-    current_row += 2 # Spasi setelah judul
-
-    # Information table
-    # Kelas dan Wali Kelas di kolom A, isi kelas dan isi Nama Wali kelas di kolom D
-    ws[f'A{current_row}'].value = "Kelas"
-    ws[f'D{current_row}'].value = f": {kelas}"
-    # Semester dan Tahun Pelajaran di kolom F, isi Semester dan isi Tahun Pelajaran di kolom G
-    ws[f'F{current_row}'].value = "Semester"
-    ws[f'G{current_row}'].value = f": {semester}"
-    ws[f'F{current_row}'].alignment = Alignment(horizontal='left', vertical='center', indent=5)
-    for col_letter in ['A', 'D', 'F', 'G']:
-        ws[f'{col_letter}{current_row}'].font = font_normal_12
-        ws[f'{col_letter}{current_row}'].alignment = left_align
-
-    current_row += 1
-    ws[f'A{current_row}'].value = "Wali Kelas" # Changed from "Nama Wali Kelas"
-    ws[f'D{current_row}'].value = f": {nama_wali_kelas}"
-    ws[f'F{current_row}'].value = "Tahun Pelajaran"
-    ws[f'G{current_row}'].value = f": {tahun_pelajaran}"
-
-    for col_letter in ['A', 'D', 'F', 'G']:
-        ws[f'{col_letter}{current_row}'].font = font_normal_12
-        ws[f'{col_letter}{current_row}'].alignment = left_align # All info cells left aligned and vertically centered
-
-    current_row += 2 # Spasi sebelum tabel siswa
-
-    # --- Tabel Siswa Header ---
-    header_start_row = current_row
-
-    # Define new column constants for the table based on swapped NIS and Nama Siswa
-    COL_NO_START = 1
-    COL_NO_END = 2 # Merged with COL_NO_START (A:B)
-    COL_NIS_START = 3 # NIS is now column C
-    COL_NIS_END = 4 # Merged with COL_NIS_START (C:D)
-    COL_NAMA_START = 5 # Nama Siswa is now column E
-    COL_NAMA_END = 6 # Merged with COL_NAMA_START (E:F)
-    COL_JK = 7 # Jenis Kelamin is now column G
-    TOTAL_TABLE_COLS = 7 # Total columns in this table
-
-    # Merge headers for No.
-    ws.merge_cells(start_row=header_start_row, start_column=COL_NO_START, end_row=header_start_row, end_column=COL_NO_END)
-    ws.cell(row=header_start_row, column=COL_NO_START, value="No.").font = font_bold_12
-    ws.cell(row=header_start_row, column=COL_NO_START).alignment = center_align
-
-    # Merge headers for NIS
-    ws.merge_cells(start_row=header_start_row, start_column=COL_NIS_START, end_row=header_start_row, end_column=COL_NIS_END)
-    ws.cell(row=header_start_row, column=COL_NIS_START, value="NIS").font = font_bold_12
-    ws.cell(row=header_start_row, column=COL_NIS_START).alignment = center_align
-
-    # Merge headers for Nama Siswa
-    ws.merge_cells(start_row=header_start_row, start_column=COL_NAMA_START, end_row=header_start_row, end_column=COL_NAMA_END)
-    ws.cell(row=header_start_row, column=COL_NAMA_START, value="Nama Siswa").font = font_bold_12
-    ws.cell(row=header_start_row, column=COL_NAMA_START).alignment = left_align # Nama Siswa header should be left aligned
-
-    ws.cell(row=header_start_row, column=COL_JK, value="JK").font = font_bold_12
-    ws.cell(row=header_start_row, column=COL_JK).alignment = center_align
-
-    # Set header row height
-    ws.row_dimensions[header_start_row].height = 21
-
-    # Apply borders and vertical center alignment to header cells
-    for c_idx in range(1, TOTAL_TABLE_COLS + 1):
-        cell = ws.cell(row=header_start_row, column=c_idx)
-        cell.border = thin_border
-        # Alignment already set for each cell above, no need to re-apply
-
-    current_row += 1 # Pindah ke baris untuk entri data
-
-    # --- Isi Data Siswa ---
-    for i, row_data in enumerate(dataframe.itertuples(), 1):
-        data_row_idx = current_row + i - 1
-
-        # Merge cells for No. and NIS for each data row
-        ws.merge_cells(start_row=data_row_idx, start_column=COL_NO_START, end_row=data_row_idx, end_column=COL_NO_END)
-        ws.merge_cells(start_row=data_row_idx, start_column=COL_NIS_START, end_row=data_row_idx, end_column=COL_NIS_END)
-        # Merge cells for Nama Siswa for each data row
-        ws.merge_cells(start_row=data_row_idx, start_column=COL_NAMA_START, end_row=data_row_idx, end_column=COL_NAMA_END)
-
-        ws.cell(row=data_row_idx, column=COL_NO_START, value=i).font = font_normal_12
-        ws.cell(row=data_row_idx, column=COL_NIS_START, value=str(getattr(row_data, "NIS"))).font = font_normal_12
-        ws.cell(row=data_row_idx, column=COL_NAMA_START, value=getattr(row_data, "Nama")).font = font_normal_12
-        ws.cell(row=data_row_idx, column=COL_JK, value=getattr(row_data, "Jenis_Kelamin")).font = font_normal_12
-
-        # Set row height for data rows
-        ws.row_dimensions[data_row_idx].height = 17.25
-
-        # Apply borders and alignment to data cells
-        for col_idx in range(1, TOTAL_TABLE_COLS + 1):
-            cell = ws.cell(row=data_row_idx, column=col_idx)
-            cell.border = thin_border
-            if col_idx == COL_NAMA_START: # Nama Siswa
-                cell.alignment = left_align
-            else:
-                cell.alignment = center_align
-
-    # Atur lebar kolom
-    ws.column_dimensions[get_column_letter(COL_NO_START)].width = 2.29 # No (merged)
-    ws.column_dimensions[get_column_letter(COL_NO_END)].width = 2.14 # Hide the merged part
-    ws.column_dimensions[get_column_letter(COL_NIS_START)].width = 6.14 # NIS (merged)
-    ws.column_dimensions[get_column_letter(COL_NIS_END)].width = 1.71 # Hide the merged part
-    ws.column_dimensions[get_column_letter(COL_NAMA_START)].width = 22.71 # Nama Siswa (merged)
-    ws.column_dimensions[get_column_letter(COL_NAMA_END)].width = 27 # Hide the merged part
-    ws.column_dimensions[get_column_letter(COL_JK)].width = 7.86 # Jenis Kelamin
-
-    current_row += len(dataframe) + 1 # Pindah ke bawah tabel, 1 baris spasi
-
-    # --- Bagian Keterangan ---
-    if 'Jenis_Kelamin' in dataframe.columns:
-        jumlah_L = dataframe[dataframe['Jenis_Kelamin'].astype(str).str.upper() == 'L'].shape[0]
-        jumlah_P = dataframe[dataframe['Jenis_Kelamin'].astype(str).str.upper() == 'P'].shape[0]
-
-        ws.cell(row=current_row, column=1, value="Keterangan:").font = font_bold_12
-        ws.cell(row=current_row, column=1).alignment = left_align
-        current_row += 1
-        ws.cell(row=current_row, column=1, value=f"- Jumlah Laki-laki (L) : {jumlah_L}").font = font_normal_12
-        ws.cell(row=current_row, column=1).alignment = left_align
-        current_row += 1
-        ws.cell(row=current_row, column=1, value=f"- Jumlah Perempuan (P) : {jumlah_P}").font = font_normal_12
-        ws.cell(row=current_row, column=1).alignment = left_align
-        current_row += 1
-
-    current_row += 1 # Tambah 1 baris kosong antara Keterangan dan Mengetahui
-
-    # --- Bagian Tanda Tangan ---
-    #Mengetahui (Kepala Sekolah) di kolom A
-    ws.cell(row=current_row, column=1, value="Mengetahui").font = font_normal_12
-    ws.cell(row=current_row, column=1).alignment = left_align
-    ws.cell(row=current_row + 1, column=1, value="Kepala Sekolah").font = font_normal_12
-    ws.cell(row=current_row + 1, column=1).alignment = left_align
-
-    #Wali Kelas dan Bantul di kolom F (index 7)
-    ws.cell(row=current_row, column=6, value=f"Bantul, ............................... {tahun_pelajaran.split('/')[0]}").font = font_normal_12
-    ws.cell(row=current_row, column=6).alignment = Alignment(horizontal='left', indent=7)
-    #ws.cell(row=current_row, column=6).alignment = left_align
-    ws.cell(row=current_row + 1, column=6, value=f"Wali Kelas {kelas}").font = font_normal_12
-    ws.cell(row=current_row + 1, column=6).alignment = Alignment(horizontal='left', indent=7)
-    #ws.cell(row=current_row + 1, column=6).alignment = left_align
-    current_row += 2
-
-    current_row += 3 # Jarak untuk tanda tangan (3 baris)
-    ws.cell(row=current_row, column=1, value=KEPALA_SEKOLAH).font = font_normal_12
-    ws.cell(row=current_row, column=1).alignment = left_align
-    ws.cell(row=current_row, column=6, value=nama_wali_kelas).font = font_normal_12
-    ws.cell(row=current_row, column=6).alignment = Alignment(horizontal='left', indent=7)
-
-    current_row += 1 # Pindah ke baris berikutnya untuk NIP
-    ws.cell(row=current_row, column=1, value=f"NIP. {NIP_KEPSEK}").font = font_normal_12
-    ws.cell(row=current_row, column=1).alignment = left_align
-    ws.cell(row=current_row, column=6, value=f"NIP. {nip_wali_kelas}").font = font_normal_12
-    ws.cell(row=current_row, column=6).alignment = Alignment(horizontal='left', indent=7)
-
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    return buffer
-
 # ===================== APLIKASI STREAMLIT UTAMA =====================
 st.set_page_config(layout="wide", page_title="Aplikasi Manajemen Data Siswa")
 st.title("Aplikasi Manajemen Data Siswa")
@@ -228,34 +23,35 @@ default_csv_path = "daftar_siswa.csv"
 df = None
 
 # --- Memuat File CSV ---
-# Menggunakan st.session_state untuk menjaga df setelah diunggah/dimuat
-if 'df_loaded' not in st.session_state:
-    st.session_state.df_loaded = None
-
-if st.session_state.df_loaded is None:
-    if os.path.exists(default_csv_path):
+# Roster default dimuat sekali per proses (dibaca ulang bila file berubah).
+# Hasil unggahan manual tetap disimpan di st.session_state.
+if 'roster_loaded' not in st.session_state:
+    st.session_state.roster_loaded = None
+
+roster = None
+try:
+    roster = load_roster(default_csv_path)
+except Exception as e:
+    st.error(f"Gagal memuat '{default_csv_path}': {e}. Coba unggah file manual.")
+
+if roster is None and st.session_state.roster_loaded is None:
+    st.warning(f"File '{default_csv_path}' tidak ditemukan atau gagal dimuat. Harap unggah file siswa.")
+    uploaded_file_obj = st.file_uploader("Unggah file CSV/Excel daftar siswa (Harus punya kolom 'Kelas', 'Nama', 'NIS', 'Jenis_Kelamin')", type=["csv", "xlsx"], key="manual_upload")
+    if uploaded_file_obj is not None:
         try:
-            df = pd.read_csv(default_csv_path)
-            st.session_state.df_loaded = df
-            #st.success(f"File '{default_csv_path}' berhasil dimuat secara otomatis.")
+            if uploaded_file_obj.name.endswith('.csv'):
+                df_upload = pd.read_csv(uploaded_file_obj, dtype={'NIS': str, 'Kelas': str})
+            else:
+                df_upload = pd.read_excel(uploaded_file_obj, dtype={'NIS': str, 'Kelas': str})
+            st.session_state.roster_loaded = Roster(normalize_roster(df_upload))
         except Exception as e:
-            st.error(f"Gagal memuat '{default_csv_path}': {e}. Coba unggah file manual.")
+            st.error(f"Terjadi kesalahan saat membaca file: {e}. Pastikan format file benar.")
+            st.session_state.roster_loaded = None
 
-    if st.session_state.df_loaded is None: # Jika belum dimuat atau ada error
-        st.warning(f"File '{default_csv_path}' tidak ditemukan atau gagal dimuat. Harap unggah file siswa.")
-        uploaded_file_obj = st.file_uploader("Unggah file CSV/Excel daftar siswa (Harus punya kolom 'Kelas', 'Nama', 'NIS', 'Jenis_Kelamin')", type=["csv", "xlsx"], key="manual_upload")
-        if uploaded_file_obj is not None:
-            try:
-                if uploaded_file_obj.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file_obj)
-                else:
-                    df = pd.read_excel(uploaded_file_obj)
-                st.session_state.df_loaded = df
-            except Exception as e:
-                st.error(f"Terjadi kesalahan saat membaca file: {e}. Pastikan format file benar.")
-                st.session_state.df_loaded = None
-else:
-    df = st.session_state.df_loaded # Ambil df dari session_state jika sudah dimuat
+if roster is None:
+    roster = st.session_state.roster_loaded # Ambil roster unggahan dari session_state
+if roster is not None:
+    df = roster.df
 
 # Hentikan aplikasi jika DataFrame belum dimuat
 if df is None:
@@ -274,7 +70,7 @@ st.markdown("---") # Garis pemisah
 
 
 # Opsi kelas yang tersedia
-kelas_options = sorted(df['Kelas'].unique())
+kelas_options = roster.kelas
 if not kelas_options:
     st.error("Tidak ada data kelas yang ditemukan di kolom 'Kelas' file siswa Anda.")
     st.stop()
@@ -287,7 +83,7 @@ kelas_daftar_siswa = st.selectbox(
     kelas_options,
     key="kelas_daftar_siswa_selectbox"
 )
-data_kelas_daftar_siswa = df[df['Kelas'] == kelas_daftar_siswa].reset_index(drop=True)
+data_kelas_daftar_siswa = roster.siswa_kelas(kelas_daftar_siswa)
 
 st.dataframe(data_kelas_daftar_siswa)
 
@@ -332,5 +128,47 @@ if st.button("🔽 Generate Daftar Siswa (Excel)", key="generate_ds_button"):
         )
         st.success("Daftar Siswa berhasil dibuat!")
 
+st.markdown("---")
+
+# --- Bagian 2: Cetak Daftar Siswa Semua Kelas ---
+st.header("🗂️ Cetak Daftar Siswa Semua Kelas")
+
+kelas_massal = st.multiselect(
+    "Pilih Kelas",
+    kelas_options,
+    default=kelas_options,
+    key="kelas_massal_multiselect"
+)
+format_massal = st.radio(
+    "Format File",
+    ["Satu file Excel (sheet per kelas)", "ZIP (file Excel per kelas)"],
+    key="format_massal_radio"
+)
+st.caption(f"Semester dan Tahun Pelajaran mengikuti pilihan di atas ({semester_ds}, {tahun_ds}).")
+# Nama/NIP wali per kelas; baris yang dikosongkan tetap dicetak dengan isian kosong
+wali_massal = st.data_editor(
+    pd.DataFrame({"Kelas": kelas_massal, "Nama Wali Kelas": "", "NIP Wali Kelas": ""}),
+    disabled=["Kelas"],
+    hide_index=True,
+    key="wali_massal_editor"
+)
+
+if kelas_massal:
+    as_zip = format_massal.startswith("ZIP")
+    wali_kelas = {
+        row.Kelas: tuple("" if pd.isna(v) else str(v) for v in (row[2], row[3]))
+        for row in wali_massal.itertuples()
+    }
+    tahun_file = tahun_ds.replace('/', '-')
+    # File dibuat saat tombol diklik, bukan di setiap rerun
+    st.download_button(
+        label=f"Unduh Daftar Siswa {len(kelas_massal)} Kelas ({'ZIP' if as_zip else 'Excel'})",
+        data=lambda: daftar_siswa_semua_kelas(roster, kelas_massal, semester_ds, tahun_ds, wali_kelas, as_zip=as_zip),
+        file_name=f"Daftar_Siswa_Semua_Kelas_{tahun_file}.{'zip' if as_zip else 'xlsx'}",
+        mime="application/zip" if as_zip else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore",
+        key="download_ds_massal_button"
+    )
+
 st.markdown("---")
 st.write(f"Created by Mersi")
@@ -0,0 +1 @@
+"""Logika dokumen Aplikasi Speroba yang bisa dipakai tanpa Streamlit."""
@@ -0,0 +1,7 @@
+"""python -m speroba: generator dokumen semua kelas dari baris perintah (lihat speroba.cli)."""
+import sys
+
+from speroba.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Aset gambar (logo, aksara Jawa, tanda tangan kepala sekolah): dibaca dan didekode sekali per proses,
+lalu dipakai ulang oleh semua dokumen. Ukuran yang dicetak/ditampilkan jauh lebih kecil dari file
+aslinya, jadi gambar diperkecil sekali ke resolusi target (PDF: PDF_DPI, web: 2x lebar tampilan).
+
+Aset wajib yang hilang langsung menjadi error saat pertama dimuat (muat_aset), bukan dilewati diam-diam
+di setiap halaman PDF.
+"""
+import contextlib
+import functools
+import io
+import math
+import os
+import threading
+from typing import Dict, Optional
+
+from PIL import Image
+from reportlab import rl_config
+from reportlab.lib.utils import ImageReader
+
+ASET_DIR = os.environ.get(
+    "SPEROBA_ASET_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+)
+
+# nama aset -> file di ASET_DIR
+ASET_WAJIB = {
+    "logo_kiri": "logo_kiri.png",
+    "logo_kanan": "logo_kanan.png",
+    "aksara_jawa": "aksara_jawa.jpg",
+    "ttd_kepsek": "ttd_kepsek.jpeg",
+}
+# Boleh tidak ada: dokumen dicetak tanpa gambar tersebut
+ASET_OPSIONAL = {
+    "logo_laporan": "logo.jpeg",  # logo kop Laporan Hasil Asesmen (pages/4_Hasil_Ujian.py)
+}
+
+PDF_DPI = 300
+
+
+class Aset:
+    """Satu aset yang sudah dibaca: bytes file asli dan gambar PIL yang sudah didekode (hanya dibaca)."""
+
+    def __init__(self, data: bytes, nama: str):
+        self.nama = nama
+        self.data = data
+        self.gambar = Image.open(io.BytesIO(data))
+        self.gambar.load()
+
+    @property
+    def ukuran(self):
+        return self.gambar.size
+
+
+def _path(berkas: str) -> str:
+    return os.path.join(ASET_DIR, berkas)
+
+
+# Aset dimuat sekali per proses (muat_aset) dan dipakai ulang oleh semua PDF. Stream gambar aset dan
+# halaman sebaiknya ditulis biner (Flate saja), tanpa lapisan ASCII85 yang dikodekan dengan Python murni:
+# dengan ASCII85 render satu PDF kelas ~3x lebih lambat dan PDF ~20% lebih besar.
+#
+# ReportLab tidak punya opsi per Canvas untuk ini (pageCompression sudah aktif secara bawaan; ASCII85
+# adalah lapisan tambahan di atasnya), hanya rl_config.useA85 yang global untuk seluruh proses dan dibaca
+# mulai dari drawImage sampai c.save(). Karena itu useA85 hanya dimatikan selama renderer laporan berjalan
+# (pdf_biner) lalu dikembalikan, juga bila render gagal. Setiap stream menentukan filternya sekali
+# (filter dan isi dibuat bersamaan), jadi PDF lain yang kebetulan dirender bersamaan di thread lain tetap
+# valid; paling jauh sebagian stream-nya ikut ditulis biner.
+_a85_lock = threading.Lock()
+_a85_pemakai = 0
+_a85_awal = None
+
+
+@contextlib.contextmanager
+def pdf_biner():
+    """
+    Matikan rl_config.useA85 selama blok berjalan (buat Canvas sampai c.save() di dalamnya).
+    Aman dipakai bersarang/dari beberapa thread: nilai awal dikembalikan saat blok terakhir selesai.
+    """
+    global _a85_pemakai, _a85_awal
+    with _a85_lock:
+        if _a85_pemakai == 0:
+            _a85_awal = rl_config.useA85
+            rl_config.useA85 = 0
+        _a85_pemakai += 1
+    try:
+        yield
+    finally:
+        with _a85_lock:
+            _a85_pemakai -= 1
+            if _a85_pemakai == 0:
+                rl_config.useA85 = _a85_awal
+
+
+@functools.lru_cache(maxsize=None)
+def muat_aset() -> Dict[str, Aset]:
+    """
+    Baca dan dekode semua aset sekali per proses. FileNotFoundError bila ada aset wajib yang hilang
+    (semua nama yang hilang disebutkan sekaligus).
+    """
+    hilang = [berkas for berkas in ASET_WAJIB.values() if not os.path.isfile(_path(berkas))]
+    if hilang:
+        raise FileNotFoundError(f"Aset gambar tidak ditemukan di {ASET_DIR}: {', '.join(hilang)}")
+    aset = {}
+    for nama, berkas in {**ASET_WAJIB, **ASET_OPSIONAL}.items():
+        if os.path.isfile(_path(berkas)):
+            with open(_path(berkas), "rb") as fh:
+                aset[nama] = Aset(fh.read(), nama)
+    return aset
+
+
+def _perkecil(aset: Aset, lebar_px: int, tinggi_px: int) -> bytes:
+    kecil = aset.gambar.resize((lebar_px, tinggi_px), Image.LANCZOS)
+    buf = io.BytesIO()
+    if aset.gambar.format == "JPEG":
+        kecil.save(buf, format="JPEG", quality=90)
+    else:
+        kecil.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def _data_pdf(nama: str, lebar: float, tinggi: float, pas_rasio: bool) -> Optional[bytes]:
+    aset = muat_aset().get(nama)
+    if aset is None:
+        if nama in ASET_OPSIONAL:
+            return None
+        raise KeyError(f"Aset tidak dikenal: {nama}")
+    w, h = aset.ukuran
+    skala_x = lebar / 72 * PDF_DPI / w
+    skala_y = tinggi / 72 * PDF_DPI / h
+    # pas_rasio: gambar mengikuti sisi yang paling membatasi; tanpa itu tiap sisi direntang sendiri
+    skala = min(skala_x, skala_y) if pas_rasio else max(skala_x, skala_y)
+    if skala >= 1:
+        return aset.data
+    return _perkecil(aset, max(1, math.ceil(w * skala)), max(1, math.ceil(h * skala)))
+
+
+def gambar_pdf(nama: str, lebar: float, tinggi: float, pas_rasio: bool = True) -> Optional[ImageReader]:
+    """
+    Gambar untuk c.drawImage dengan kotak `lebar` x `tinggi` (point), diperkecil agar tidak melebihi PDF_DPI.
+    pas_rasio mengikuti preserveAspectRatio di drawImage. None bila aset opsional tidak ada.
+
+    Hasil perkecilan (bytes JPEG/PNG) di-cache per proses; ImageReader dibuat baru setiap panggilan karena
+    ImageReader JPEG membaca dari satu file handle yang di-seek, jadi tidak aman dibagi antar thread.
+    Dipanggil sekali per dokumen (kop/template direkam sebagai Form XObject).
+    """
+    data = _data_pdf(nama, lebar, tinggi, pas_rasio)
+    return None if data is None else ImageReader(io.BytesIO(data), ident=nama)
+
+
+@functools.lru_cache(maxsize=None)
+def gambar_web(nama: str, lebar_px: int) -> bytes:
+    """PNG/JPEG untuk st.image dengan lebar tampilan `lebar_px` (disimpan 2x untuk layar HiDPI)."""
+    aset = muat_aset()[nama]
+    w, h = aset.ukuran
+    target = 2 * lebar_px
+    if target >= w:
+        return aset.data
+    return _perkecil(aset, target, max(1, round(h * target / w)))
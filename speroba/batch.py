@@ -0,0 +1,115 @@
+"""Helper render paralel: process pool, penggabungan PDF, dan ZIP."""
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import types
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pypdf import PdfWriter, PdfReader
+
+# Pool bisa dibuat dari thread mana pun di server Streamlit (mis. thread tugas speroba.jobs). Dengan fork
+# (bawaan Linux) proses anak mewarisi lock yang sedang dipegang thread lain (logging, tornado, registri
+# tugas) dan bisa macet; forkserver/spawn memulai worker dari proses bersih.
+START_METHOD = os.environ.get("SPEROBA_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_pool_lock = threading.Lock()
+_pool_aktif = 0
+_main_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _tanpa_main_skrip():
+    """
+    Worker forkserver/spawn menjalankan ulang file __main__ proses induk sebelum menerima job. Di server
+    Streamlit, __main__ adalah skrip halaman yang sedang/terakhir dijalankan (dipasang oleh script runner),
+    jadi worker akan ikut menjalankan halaman (st.stop(), baca unggahan, ...) lalu mati. Selama worker
+    dimulai, __main__ diganti modul kosong; fn job selalu diimpor dari modulnya sendiri, bukan dari __main__.
+    """
+    with _main_lock:
+        asli = sys.modules["__main__"]
+        kosong = types.ModuleType("__main__")
+        sys.modules["__main__"] = kosong
+        try:
+            yield
+        finally:
+            # Jangan timpa __main__ baru yang mungkin dipasang thread skrip Streamlit selama blok ini
+            if sys.modules.get("__main__") is kosong:
+                sys.modules["__main__"] = asli
+
+
+def jumlah_worker(max_workers=None, jumlah_job=None):
+    """
+    Jumlah proses worker untuk satu pool. Bawaan (max_workers=None): CPU dibagi rata dengan pool lain
+    yang sedang berjalan di proses ini, jadi beberapa tugas bersamaan tidak masing-masing memakai semua CPU.
+    Tidak pernah lebih dari jumlah_job (bila diberikan) dan minimal 1.
+    """
+    if max_workers is None:
+        with _pool_lock:
+            aktif = _pool_aktif
+        max_workers = (os.cpu_count() or 1) // (aktif + 1)
+    if jumlah_job is not None:
+        max_workers = min(max_workers, jumlah_job)
+    return max(1, max_workers)
+
+
+def render_parallel(fn, jobs, max_workers=None, progress=None):
+    """Jalankan fn(*args) untuk setiap args di jobs pada process pool.
+
+    Urutan hasil sama dengan urutan jobs. Jika hanya ada satu job (atau
+    satu worker, lihat jumlah_worker), dikerjakan langsung di proses ini. Bila diberikan,
+    progress(selesai, total) dipanggil di proses ini setiap satu job selesai.
+    fn dan args harus bisa di-pickle (worker dimulai dengan START_METHOD, bukan fork).
+    """
+    global _pool_aktif
+    jobs = list(jobs)
+    total = len(jobs)
+    max_workers = jumlah_worker(max_workers, total)
+    if max_workers <= 1:
+        results = []
+        for args in jobs:
+            results.append(fn(*args))
+            if progress:
+                progress(len(results), total)
+        return results
+    with _pool_lock:
+        _pool_aktif += 1
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context(START_METHOD)) as pool:
+            # Worker dimulai saat submit (satu per submit sampai max_workers)
+            with _tanpa_main_skrip():
+                futures = [pool.submit(fn, *args) for args in jobs]
+            if progress:
+                for selesai, _ in enumerate(as_completed(futures), 1):
+                    progress(selesai, total)
+            return [f.result() for f in futures]
+    finally:
+        with _pool_lock:
+            _pool_aktif -= 1
+
+
+def merge_pdfs(parts):
+    """Gabungkan beberapa PDF (bytes) menjadi satu PDF sesuai urutan."""
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(io.BytesIO(part)))
+    # Kop/gambar yang sama dari tiap bagian cukup disimpan sekali
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def zip_files(named_parts):
+    """Kemas pasangan (nama_file, bytes) menjadi satu arsip ZIP."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in named_parts:
+            zf.writestr(name, data)
+    return buffer.getvalue()
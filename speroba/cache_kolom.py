@@ -0,0 +1,110 @@
+"""
+Cache kolumnar (Arrow/Feather) untuk frame hasil parse. Roster dan workbook unggahan disimpan per
+hash isi file lalu dimuat dengan memory-map, sehingga setelah server restart atau di sesi lain
+CSV/XLSX tidak perlu diparse ulang.
+
+Lokasi cache: env SPEROBA_CACHE_DIR (default ".speroba_cache"); isi string kosong untuk mematikan.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Callable, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # tanpa pyarrow cache disk dilewati, frame tetap diparse biasa
+    pa = feather = None
+
+CACHE_DIR = os.environ.get("SPEROBA_CACHE_DIR", ".speroba_cache")
+# Naikkan bila cara parse/normalisasi berubah agar file cache lama tidak terpakai lagi
+VERSI_CACHE = "1"
+MAKS_FILE_CACHE = 64
+
+
+def hash_isi(data: bytes) -> str:
+    """Hash isi file (md5), dasar kunci cache."""
+    return hashlib.md5(data).hexdigest()
+
+
+def kunci_cache(*bagian) -> str:
+    """Kunci file cache dari hash isi + parameter parse (kolom, pola, ...)."""
+    return hash_isi("|".join(map(str, (VERSI_CACHE,) + bagian)).encode())
+
+
+def aktif() -> bool:
+    return feather is not None and bool(CACHE_DIR)
+
+
+def _path(jenis: str, kunci: str) -> str:
+    return os.path.join(CACHE_DIR, f"{jenis}-{kunci}.feather")
+
+
+def _hapus(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def muat(jenis: str, kunci: str) -> Optional[pd.DataFrame]:
+    """Frame dari cache (memory-map) atau None bila belum ada / file cache rusak."""
+    if not aktif():
+        return None
+    path = _path(jenis, kunci)
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except FileNotFoundError:
+        return None
+    except (OSError, pa.ArrowException):
+        _hapus(path)
+        return None
+    try:
+        os.utime(path)  # dipakai pemangkasan: file yang lama tak terpakai dibuang lebih dulu
+    except OSError:
+        pass
+    return table.to_pandas()
+
+
+def simpan(jenis: str, kunci: str, df: pd.DataFrame) -> bool:
+    """
+    Simpan frame tanpa kompresi (agar bisa di-memory-map). Kolom object (isi campuran angka/teks)
+    tidak bisa disimpan Arrow tanpa mengubah tipenya, jadi frame seperti itu tidak di-cache.
+    """
+    if not aktif() or (df.dtypes == object).any():
+        return False
+    tmp = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        os.close(fd)
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, _path(jenis, kunci))  # atomik: sesi lain tidak membaca file setengah jadi
+    except (OSError, pa.ArrowException):
+        if tmp:
+            _hapus(tmp)
+        return False
+    _pangkas()
+    return True
+
+
+def _pangkas():
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            files = [e for e in it if e.name.endswith(".feather")]
+        files.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for e in files[MAKS_FILE_CACHE:]:
+        _hapus(e.path)
+
+
+def muat_atau_parse(jenis: str, kunci: str, parse: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Frame dari cache bila ada; jika belum, parse lalu simpan untuk pemuatan berikutnya."""
+    df = muat(jenis, kunci)
+    if df is None:
+        df = parse()
+        simpan(jenis, kunci, df)
+    return df
@@ -0,0 +1,252 @@
+"""
+Generator dokumen akhir semester tanpa Streamlit: semua kelas sekaligus, ditulis ke satu folder.
+
+    python -m speroba --config semester.json --out hasil/
+    python -m speroba --config semester.json --out hasil/ --nilai-asesmen nilai.xlsx --nilai-to nilai_to.xlsx \\
+        --nilai-rapor nilai_rapor.csv --workers 4
+
+Jenis dokumen (subfolder di --out):
+    daftar_siswa      Daftar Siswa per kelas (dari roster)
+    daftar_nilai      Form Nilai Siswa per kelas x mapel (dari roster)
+    absensi           Daftar Hadir per kelas x mapel (dari roster)
+    laporan_asesmen   PDF Laporan Hasil Asesmen per kelas (butuh --nilai-asesmen, template halaman 4)
+    laporan_to        PDF Laporan TKA/TKAD per kelas (butuh --nilai-to, template halaman 5)
+    olah_nilai        Form Nilai Rapor + Laporan TK multi-sheet (butuh --nilai-rapor, CSV NIS/Nama/Kelas/TP1..SAS)
+
+Config semester (JSON); hanya semester dan tahun yang wajib, sisanya punya nilai bawaan:
+    {
+      "semester": "Ganjil",
+      "tahun": "2025/2026",
+      "tgl_ttd": "2025-12-19",
+      "asesmen": "ASESMEN SUMATIF AKHIR SEMESTER GANJIL",
+      "asesmen_to": "TKA/TKAD Dikpora Kab Bantul 1",
+      "tgl_kegiatan_to": "Tanggal 20 - 23 Oktober 2025",
+      "mapel": ["Matematika", "IPA"],
+      "wali_kelas": {"7A": ["Nama Wali", "NIP"]},
+      "guru_mapel": {"Matematika": ["Nama Guru", "NIP"]},
+      "olah_nilai": {"mapel": "Matematika", "guru": "Nama Guru", "nip": "NIP"}
+    }
+
+Jenis dikerjakan berurutan; di dalam satu jenis, kelas dirender paralel di process pool (--workers).
+Keluar dengan kode 1 bila ada jenis yang gagal (jenis lain tetap dikerjakan).
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+from speroba.formulir import (
+    MAPEL_FORMULIR,
+    buat_massal,
+    nama_file_absensi,
+    nama_file_daftar_siswa,
+    nama_file_form_nilai,
+)
+from speroba import laporan_asesmen, laporan_to
+from speroba.kelas import KelasIndex
+from speroba.nilai import normalize_scores
+from speroba.olah_nilai import export_multisheet_form_nilai, export_multisheet_report_tk, hitung_nilai, read_student_csv
+from speroba.peringkat_tkad import JUMLAH_SESI, hitung_peringkat_tkad, kolom_tkad
+from speroba.roster import DEFAULT_ROSTER_PATH, read_roster
+from speroba.unggahan import baca_excel_kolom
+
+
+def baca_konfig(path=None, **timpa):
+    """Config semester dari file JSON (boleh None) ditimpa argumen baris perintah yang diisi."""
+    konfig = {}
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            konfig = json.load(fh)
+    konfig.update({k: v for k, v in timpa.items() if v is not None})
+    hilang = [k for k in ("semester", "tahun") if not konfig.get(k)]
+    if hilang:
+        raise ValueError(f"Config semester belum lengkap: {', '.join(hilang)}")
+    tgl = konfig.get("tgl_ttd")
+    konfig["tgl_ttd"] = datetime.date.fromisoformat(tgl) if tgl else datetime.date.today()
+    return konfig
+
+
+class Progres:
+    """Cetak progres satu jenis dokumen paling sering sekali per detik (dan selalu saat selesai)."""
+
+    def __init__(self, jenis, satuan, keluaran=sys.stderr, jeda=1.0):
+        self.jenis, self.satuan, self.keluaran, self.jeda = jenis, satuan, keluaran, jeda
+        self.mulai = time.perf_counter()
+        self._terakhir = 0.0
+
+    def __call__(self, selesai, total):
+        sekarang = time.perf_counter()
+        if selesai < total and sekarang - self._terakhir < self.jeda:
+            return
+        self._terakhir = sekarang
+        print(f"  {self.jenis}: {selesai}/{total} {self.satuan} ({sekarang - self.mulai:.1f} dtk)",
+              file=self.keluaran, flush=True)
+
+
+def _pasangan(peta, kunci):
+    # (nama, nip) dari config; kunci yang tidak ada diberi isian kosong seperti di halaman
+    nilai = peta.get(kunci) or ("", "")
+    return tuple(str(v) for v in nilai)
+
+
+def _daftar_siswa(roster, konfig, workers, progres):
+    kelas = roster.kelas
+    wali = konfig.get("wali_kelas", {})
+    args = [(roster.siswa_kelas(k), k, konfig["semester"], konfig["tahun"], *_pasangan(wali, k)) for k in kelas]
+    parts = buat_massal("generate_excel_daftar_siswa", args, max_workers=workers, progress=progres)
+    return [(nama_file_daftar_siswa(k, konfig["tahun"]), part) for k, part in zip(kelas, parts)]
+
+
+def _per_kelas_mapel(jenis_generator, nama_file, roster, konfig, workers, progres):
+    guru = konfig.get("guru_mapel", {})
+    jobs = [(k, m) for k in roster.kelas for m in konfig.get("mapel", MAPEL_FORMULIR)]
+    args = [(roster.siswa_kelas(k), m, konfig["semester"], k, konfig["tahun"], *_pasangan(guru, m)) for k, m in jobs]
+    parts = buat_massal(jenis_generator, args, max_workers=workers, progress=progres)
+    return [(os.path.join(k, nama_file(k, m)), part) for (k, m), part in zip(jobs, parts)]
+
+
+def _daftar_nilai(roster, konfig, workers, progres):
+    return _per_kelas_mapel("generate_excel_form_nilai_siswa",
+                            lambda k, m: nama_file_form_nilai(k, m, konfig["semester"]),
+                            roster, konfig, workers, progres)
+
+
+def _absensi(roster, konfig, workers, progres):
+    return _per_kelas_mapel("generate_excel_absensi_panjang",
+                            lambda k, m: nama_file_absensi(m, k, konfig["semester"], konfig["tahun"]),
+                            roster, konfig, workers, progres)
+
+
+def _laporan_asesmen(path, konfig, workers, progres):
+    if not konfig.get("asesmen"):
+        raise ValueError("Config 'asesmen' (jenis asesmen di kop laporan) belum diisi")
+    with open(path, "rb") as fh:
+        df = baca_excel_kolom(fh.read(), laporan_asesmen.KOLOM_IDENTITAS + laporan_asesmen.MAPEL_SEMUA)
+    hilang = [c for c in laporan_asesmen.KOLOM_IDENTITAS if c not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom wajib hilang di {path}: {hilang}")
+    kolom_nilai = [c for c in laporan_asesmen.MAPEL_SEMUA if c in df.columns]
+    df[kolom_nilai], invalid = normalize_scores(df, kolom_nilai)
+    if invalid.to_numpy().any():
+        print(f"  laporan_asesmen: {int(invalid.to_numpy().sum())} sel nilai tidak terbaca, dianggap kosong",
+              file=sys.stderr)
+    hasil = laporan_asesmen.pdf_per_kelas(df, KelasIndex(df["Kelas"]).kelas, laporan_asesmen.MAPEL_KELAS_7_8,
+                                          laporan_asesmen.MAPEL_KELAS_9, konfig["asesmen"], konfig["tahun"],
+                                          konfig["tgl_ttd"], max_workers=workers, progress=progres)
+    return [(laporan_asesmen.nama_file_laporan_asesmen(k), part) for k, part in hasil]
+
+
+def _laporan_to(path, konfig, workers, progres):
+    kolom = ["Kelas", "NIS", "Nama Siswa"] + [c for s in range(1, JUMLAH_SESI + 1) for c in kolom_tkad(laporan_to.MAPEL_TO, s)]
+    with open(path, "rb") as fh:
+        df = baca_excel_kolom(fh.read(), kolom)
+    if "Kelas" not in df.columns:
+        raise ValueError(f"Kolom 'Kelas' tidak ditemukan di {path}")
+    df = df.join(hitung_peringkat_tkad(df, laporan_to.MAPEL_TO))
+    hasil = laporan_to.pdf_per_kelas(df, KelasIndex(df["Kelas"]).kelas,
+                                     konfig.get("asesmen_to", laporan_to.ASESMEN_TO[0]), konfig["tahun"],
+                                     konfig.get("tgl_kegiatan_to", laporan_to.TGL_KEGIATAN_TO[0]), konfig["tgl_ttd"],
+                                     max_workers=workers, progress=progres)
+    return [(laporan_to.nama_file_laporan_to(k), part) for k, part in hasil]
+
+
+def _olah_nilai(path, konfig, workers, progres):
+    df = read_student_csv(path)
+    if df is None:
+        raise ValueError(f"{path} harus memiliki kolom 'NIS', 'Nama', dan 'Kelas'")
+    df = hitung_nilai(df)
+    olah = konfig.get("olah_nilai", {})
+    mapel, semester, tahun = olah.get("mapel", "Matematika"), konfig["semester"], konfig["tahun"]
+    kelas = sorted(df["Kelas"].unique().tolist())
+    # Dua workbook, masing-masing satu file multi-sheet yang ditulis berurutan
+    form = export_multisheet_form_nilai(df, kelas, mapel, semester, tahun, olah.get("guru", ""), olah.get("nip", ""))
+    progres(1, 2)
+    tk = export_multisheet_report_tk(df, kelas, mapel, tahun)
+    progres(2, 2)
+    return [(f"Form_Nilai_Rapor_Multi_{mapel}_{semester}.xlsx", form), (f"Laporan_TK_Multi_{mapel}_{semester}.xlsx", tk)]
+
+
+# jenis -> (fungsi, satuan progres, sumber: "roster" atau atribut argparse file nilai)
+PEMBUAT = {
+    "daftar_siswa": (_daftar_siswa, "berkas", "roster"),
+    "daftar_nilai": (_daftar_nilai, "berkas", "roster"),
+    "absensi": (_absensi, "berkas", "roster"),
+    "laporan_asesmen": (_laporan_asesmen, "kelas", "nilai_asesmen"),
+    "laporan_to": (_laporan_to, "kelas", "nilai_to"),
+    "olah_nilai": (_olah_nilai, "workbook", "nilai_rapor"),
+}
+JENIS = tuple(PEMBUAT)
+
+
+def tulis_berkas(folder, berkas):
+    """Tulis [(nama relatif, bytes)] ke `folder`; mengembalikan total byte."""
+    total = 0
+    for nama, data in berkas:
+        path = os.path.join(folder, nama)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        total += len(data)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m speroba", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="folder keluaran (subfolder per jenis dokumen)")
+    parser.add_argument("--config", help="config semester (JSON)")
+    parser.add_argument("--roster", default=DEFAULT_ROSTER_PATH, help="CSV daftar siswa (bawaan: %(default)s)")
+    parser.add_argument("--nilai-asesmen", help="workbook nilai Laporan Hasil Asesmen (.xlsx)")
+    parser.add_argument("--nilai-to", help="workbook nilai TKA/TKAD (.xlsx)")
+    parser.add_argument("--nilai-rapor", help="CSV nilai Olah Nilai Rapor")
+    parser.add_argument("--jenis", nargs="+", choices=JENIS,
+                        help="jenis dokumen (bawaan: semua yang file sumbernya tersedia)")
+    parser.add_argument("--workers", type=int, default=None, help="proses worker (bawaan: jumlah CPU, lihat speroba.batch.jumlah_worker)")
+    parser.add_argument("--semester", help="menimpa 'semester' di config")
+    parser.add_argument("--tahun", help="menimpa 'tahun' di config, mis. 2025/2026")
+    parser.add_argument("--tgl-ttd", help="menimpa 'tgl_ttd' di config (YYYY-MM-DD)")
+    parser.add_argument("--asesmen", help="menimpa 'asesmen' di config")
+    args = parser.parse_args(argv)
+
+    try:
+        konfig = baca_konfig(args.config, semester=args.semester, tahun=args.tahun, tgl_ttd=args.tgl_ttd,
+                             asesmen=args.asesmen)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    def ada_sumber(jenis):
+        sumber = PEMBUAT[jenis][2]
+        return sumber == "roster" or getattr(args, sumber)
+
+    jenis_list = args.jenis or [j for j in JENIS if ada_sumber(j)]
+    tanpa_berkas = [j for j in jenis_list if not ada_sumber(j)]
+    if tanpa_berkas:
+        parser.error("jenis berikut butuh file nilai: " + ", ".join(
+            f"{j} (--{PEMBUAT[j][2].replace('_', '-')})" for j in tanpa_berkas))
+
+    roster = None
+    if any(PEMBUAT[j][2] == "roster" for j in jenis_list):
+        roster = read_roster(args.roster)
+        if not roster.kelas:
+            parser.error(f"Roster {args.roster} tidak memiliki data kelas")
+        print(f"Roster {args.roster}: {len(roster.df)} siswa, {len(roster.kelas)} kelas", file=sys.stderr)
+
+    mulai = time.perf_counter()
+    gagal = []
+    print(f"{'jenis':<18}{'berkas':>8}{'ukuran MB':>11}{'detik':>9}")
+    for jenis in jenis_list:
+        fn, satuan, sumber = PEMBUAT[jenis]
+        t = time.perf_counter()
+        try:
+            berkas = fn(roster if sumber == "roster" else getattr(args, sumber), konfig, args.workers,
+                        Progres(jenis, satuan))
+            ukuran = tulis_berkas(os.path.join(args.out, jenis), berkas)
+        except Exception as e:  # jenis lain tetap dikerjakan
+            gagal.append(jenis)
+            print(f"{jenis:<18}  GAGAL {type(e).__name__}: {e}")
+            continue
+        print(f"{jenis:<18}{len(berkas):>8}{ukuran / 1e6:>11.1f}{time.perf_counter() - t:>9.2f}", flush=True)
+    print(f"Selesai dalam {time.perf_counter() - mulai:.1f} dtk -> {os.path.abspath(args.out)}")
+    return 1 if gagal else 0
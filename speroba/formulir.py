@@ -0,0 +1,135 @@
+"""
+Formulir cetak Excel (Daftar Siswa, Form Nilai Siswa, Daftar Hadir) dengan backend terpilih.
+
+Backend "xlsxwriter" (bawaan) menulis XML langsung dan jauh lebih ringan; backend "openpyxl"
+adalah implementasi lama. Keduanya menghasilkan tata letak yang sama. Pilih lewat argumen
+`backend` atau variabel lingkungan SPEROBA_EXCEL_BACKEND.
+
+Mode massal (banyak kelas sekaligus) membagi pekerjaan ke process pool lewat speroba.batch.
+"""
+import os
+
+from speroba import formulir_openpyxl, formulir_xlsxwriter
+from speroba.batch import jumlah_worker, render_parallel, zip_files
+
+BACKENDS = {
+    "openpyxl": formulir_openpyxl,
+    "xlsxwriter": formulir_xlsxwriter,
+}
+DEFAULT_BACKEND = os.environ.get("SPEROBA_EXCEL_BACKEND", "xlsxwriter")
+
+# Mata pelajaran pilihan Form Nilai dan Daftar Hadir
+MAPEL_FORMULIR = [
+    "Matematika", "Bahasa Indonesia", "IPA",
+    "IPS", "Bahasa Inggris", "Pendidikan Agama Islam",
+    "PP", "Seni Budaya",
+    "PJOK", "Informatika",
+    "Prakarya", "Bahasa Jawa"
+]
+
+
+def _backend(backend=None):
+    nama = backend or DEFAULT_BACKEND
+    if nama not in BACKENDS:
+        raise ValueError(f"Backend Excel tidak dikenal: {nama!r} (pilihan: {', '.join(BACKENDS)})")
+    return BACKENDS[nama]
+
+
+def generate_excel_daftar_siswa(dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas,
+                                backend=None):
+    return _backend(backend).generate_excel_daftar_siswa(
+        dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas)
+
+
+def generate_excel_form_nilai_siswa(dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru,
+                                    backend=None):
+    return _backend(backend).generate_excel_form_nilai_siswa(
+        dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru)
+
+
+def generate_excel_absensi_panjang(dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru,
+                                   backend=None):
+    return _backend(backend).generate_excel_absensi_panjang(
+        dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru)
+
+
+def generate_excel_daftar_siswa_multi(daftar_kelas, semester, tahun_pelajaran, backend=None):
+    return _backend(backend).generate_excel_daftar_siswa_multi(daftar_kelas, semester, tahun_pelajaran)
+
+
+def _buat_kelompok(jenis, backend, daftar_args):
+    # Dijalankan di proses worker: satu kelompok berkas per proses, hasil dikirim balik sebagai bytes
+    fn = getattr(_backend(backend), jenis)
+    return [fn(*args).getvalue() for args in daftar_args]
+
+
+def buat_massal(jenis, daftar_args, backend=None, max_workers=None, progress=None):
+    """
+    Jalankan generator `jenis` (mis. "generate_excel_daftar_siswa") untuk setiap tuple argumen.
+    Pekerjaan dibagi menjadi kelompok berurutan, satu per worker; urutan hasil (bytes) sama dengan input.
+    progress(selesai, total) dipanggil setiap satu kelompok selesai (dalam satuan berkas).
+    """
+    daftar_args = list(daftar_args)
+    if not daftar_args:
+        return []
+    nama = backend or DEFAULT_BACKEND
+    _backend(nama)  # validasi di proses utama, bukan di worker
+    n = jumlah_worker(max_workers, len(daftar_args))
+    ukuran = -(-len(daftar_args) // n)
+    kelompok = [daftar_args[i:i + ukuran] for i in range(0, len(daftar_args), ukuran)]
+    ukuran_kelompok = [len(k) for k in kelompok]
+    lapor = None
+    if progress:
+        def lapor(selesai, _):
+            progress(sum(ukuran_kelompok[:selesai]), len(daftar_args))
+    hasil = render_parallel(_buat_kelompok, [(jenis, nama, k) for k in kelompok], max_workers=n, progress=lapor)
+    return [part for parts in hasil for part in parts]
+
+
+def daftar_siswa_semua_kelas(roster, kelas_list, semester, tahun_pelajaran, wali_kelas=None,
+                             as_zip=False, backend=None, max_workers=None):
+    """
+    Daftar Siswa banyak kelas sekaligus (bytes): satu workbook dengan sheet per kelas,
+    atau ZIP berisi satu file per kelas (dibuat paralel).
+    wali_kelas: {kelas: (nama, nip)}; kelas yang tidak ada di dict diberi isian kosong.
+    """
+    wali_kelas = wali_kelas or {}
+    daftar = [(roster.siswa_kelas(k), k, *wali_kelas.get(k, ("", ""))) for k in kelas_list]
+    if not as_zip:
+        return generate_excel_daftar_siswa_multi(daftar, semester, tahun_pelajaran, backend=backend).getvalue()
+
+    args = [(df, k, semester, tahun_pelajaran, nama, nip) for df, k, nama, nip in daftar]
+    parts = buat_massal("generate_excel_daftar_siswa", args, backend=backend, max_workers=max_workers)
+    return zip_files([(nama_file_daftar_siswa(k, tahun_pelajaran), part) for (_, k, _, _), part in zip(daftar, parts)])
+
+
+def nama_file_daftar_siswa(kelas, tahun_pelajaran):
+    return f"Daftar_Siswa_{kelas}_{tahun_pelajaran.replace('/', '-')}.xlsx"
+
+
+def nama_file_form_nilai(kelas, mapel, semester):
+    return f"Form_Nilai_Siswa_{kelas}_{mapel}_{semester}.xlsx"
+
+
+def nama_file_absensi(mapel, kelas, semester, tahun_pelajaran):
+    return f"Daftar Hadir Siswa {mapel} {kelas.replace(' ', '_')} Sem {semester} TP {tahun_pelajaran.replace('/', '-')}.xlsx"
+
+
+def absensi_massal(roster, kelas_list, mapel_list, semester, tahun_pelajaran, guru_mapel=None,
+                   backend=None, max_workers=None):
+    """
+    Daftar Hadir untuk setiap kombinasi kelas x mapel, dikemas dalam ZIP (satu folder per kelas).
+    guru_mapel: {mapel: (nama_guru, nip_guru)}; mapel yang tidak ada di dict diberi isian kosong.
+    Pekerjaan diurutkan per kelas agar setiap worker menerima data siswa satu kelas sekali saja.
+    """
+    guru_mapel = guru_mapel or {}
+    jobs = [(kelas, mapel) for kelas in kelas_list for mapel in mapel_list]
+    args = [
+        (roster.siswa_kelas(kelas), mapel, semester, kelas, tahun_pelajaran, *guru_mapel.get(mapel, ("", "")))
+        for kelas, mapel in jobs
+    ]
+    parts = buat_massal("generate_excel_absensi_panjang", args, backend=backend, max_workers=max_workers)
+    return zip_files([
+        (f"{kelas}/{nama_file_absensi(mapel, kelas, semester, tahun_pelajaran)}", part)
+        for (kelas, mapel), part in zip(jobs, parts)
+    ])
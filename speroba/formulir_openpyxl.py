@@ -0,0 +1,616 @@
+"""Backend openpyxl untuk formulir cetak: Daftar Siswa, Form Nilai Siswa, Daftar Hadir."""
+from datetime import datetime
+from io import BytesIO
+
+import pytz
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.page import PageMargins
+
+from speroba.gaya_excel import (
+    FONT_BOLD_12, FONT_NORMAL_12, FONT_BOLD_9, FONT_NORMAL_9, FONT_NORMAL_7,
+    THIN_BORDER, CENTER_ALIGN, LEFT_ALIGN, LEFT_INDENT_5_ALIGN, LEFT_INDENT_7_ALIGN,
+    TABEL_TENGAH, TABEL_KIRI, TABEL_KOSONG_TENGAH, TABEL_GARIS, pasang_gaya, tulis_baris,
+)
+from speroba.sekolah import KEPALA_SEKOLAH, NIP_KEPSEK, NAMA_SEKOLAH
+
+
+def _simpan(wb):
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def _sheet_daftar_siswa(ws, dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas):
+    ws.title = f"Daftar Siswa {kelas}"
+
+    # --- Pengaturan Halaman (Legal, Portrait) ---
+    ws.page_setup.paperSize = ws.PAPERSIZE_LEGAL # Paper size Legal
+    # Margins in inches (1 inch = 25.4 mm)
+    ws.page_margins = PageMargins(left=28/25.4, right=18/25.4, top=24/25.4, bottom=19/25.4)
+    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT # Portrait
+    ws.print_options.horizontalCentered = True # Rata Halaman Horizontal
+    ws.print_options.verticalCentered = False # Rata Halaman Vertikal dinonaktifkan
+
+    # --- Header Dokumen Excel ---
+    current_row = 1
+    # Merge cells for main title (spans 7 columns: A-G)
+    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=7)
+    cell_title = ws[f'A{current_row}']
+    cell_title.value = "DAFTAR SISWA"
+    cell_title.font = FONT_BOLD_12
+    cell_title.alignment = CENTER_ALIGN
+
+    current_row += 1
+    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=7)
+    cell_subtitle = ws[f'A{current_row}']
+    cell_subtitle.value = f"{NAMA_SEKOLAH} TAHUN PELAJARAN {tahun_pelajaran}"
+    cell_subtitle.font = FONT_BOLD_12
+    cell_subtitle.alignment = CENTER_ALIGN
+
+    current_row += 2 # Spasi setelah judul
+
+    # Information table
+    # Kelas dan Wali Kelas di kolom A, isi kelas dan isi Nama Wali kelas di kolom D
+    ws[f'A{current_row}'].value = "Kelas"
+    ws[f'D{current_row}'].value = f": {kelas}"
+    # Semester dan Tahun Pelajaran di kolom F, isi Semester dan isi Tahun Pelajaran di kolom G
+    ws[f'F{current_row}'].value = "Semester"
+    ws[f'G{current_row}'].value = f": {semester}"
+    ws[f'F{current_row}'].alignment = LEFT_INDENT_5_ALIGN
+    for col_letter in ['A', 'D', 'F', 'G']:
+        ws[f'{col_letter}{current_row}'].font = FONT_NORMAL_12
+        ws[f'{col_letter}{current_row}'].alignment = LEFT_ALIGN
+
+    current_row += 1
+    ws[f'A{current_row}'].value = "Wali Kelas" # Changed from "Nama Wali Kelas"
+    ws[f'D{current_row}'].value = f": {nama_wali_kelas}"
+    ws[f'F{current_row}'].value = "Tahun Pelajaran"
+    ws[f'G{current_row}'].value = f": {tahun_pelajaran}"
+
+    for col_letter in ['A', 'D', 'F', 'G']:
+        ws[f'{col_letter}{current_row}'].font = FONT_NORMAL_12
+        ws[f'{col_letter}{current_row}'].alignment = LEFT_ALIGN # All info cells left aligned and vertically centered
+
+    current_row += 2 # Spasi sebelum tabel siswa
+
+    # --- Tabel Siswa Header ---
+    header_start_row = current_row
+
+    # Define new column constants for the table based on swapped NIS and Nama Siswa
+    COL_NO_START = 1
+    COL_NO_END = 2 # Merged with COL_NO_START (A:B)
+    COL_NIS_START = 3 # NIS is now column C
+    COL_NIS_END = 4 # Merged with COL_NIS_START (C:D)
+    COL_NAMA_START = 5 # Nama Siswa is now column E
+    COL_NAMA_END = 6 # Merged with COL_NAMA_START (E:F)
+    COL_JK = 7 # Jenis Kelamin is now column G
+    TOTAL_TABLE_COLS = 7 # Total columns in this table
+
+    # Merge headers for No.
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NO_START, end_row=header_start_row, end_column=COL_NO_END)
+    ws.cell(row=header_start_row, column=COL_NO_START, value="No.").font = FONT_BOLD_12
+    ws.cell(row=header_start_row, column=COL_NO_START).alignment = CENTER_ALIGN
+
+    # Merge headers for NIS
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NIS_START, end_row=header_start_row, end_column=COL_NIS_END)
+    ws.cell(row=header_start_row, column=COL_NIS_START, value="NIS").font = FONT_BOLD_12
+    ws.cell(row=header_start_row, column=COL_NIS_START).alignment = CENTER_ALIGN
+
+    # Merge headers for Nama Siswa
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NAMA_START, end_row=header_start_row, end_column=COL_NAMA_END)
+    ws.cell(row=header_start_row, column=COL_NAMA_START, value="Nama Siswa").font = FONT_BOLD_12
+    ws.cell(row=header_start_row, column=COL_NAMA_START).alignment = LEFT_ALIGN # Nama Siswa header should be left aligned
+
+    ws.cell(row=header_start_row, column=COL_JK, value="JK").font = FONT_BOLD_12
+    ws.cell(row=header_start_row, column=COL_JK).alignment = CENTER_ALIGN
+
+    # Set header row height
+    ws.row_dimensions[header_start_row].height = 21
+
+    # Apply borders and vertical center alignment to header cells
+    for c_idx in range(1, TOTAL_TABLE_COLS + 1):
+        cell = ws.cell(row=header_start_row, column=c_idx)
+        cell.border = THIN_BORDER
+        # Alignment already set for each cell above, no need to re-apply
+
+    current_row += 1 # Pindah ke baris untuk entri data
+
+    # --- Isi Data Siswa ---
+    # Gaya setiap kolom satu baris data (A:B No, C:D NIS, E:F Nama, G JK)
+    gaya_baris_siswa = [TABEL_TENGAH, TABEL_KOSONG_TENGAH, TABEL_TENGAH, TABEL_KOSONG_TENGAH,
+                        TABEL_KIRI, TABEL_KOSONG_TENGAH, TABEL_TENGAH]
+    for i, row_data in enumerate(dataframe.itertuples(), 1):
+        data_row_idx = current_row + i - 1
+
+        # Merge cells for No. and NIS for each data row
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NO_START, end_row=data_row_idx, end_column=COL_NO_END)
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NIS_START, end_row=data_row_idx, end_column=COL_NIS_END)
+        # Merge cells for Nama Siswa for each data row
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NAMA_START, end_row=data_row_idx, end_column=COL_NAMA_END)
+
+        # Nilai + font/border/alignment seluruh baris dalam satu lintasan
+        tulis_baris(ws, data_row_idx, gaya_baris_siswa, {
+            COL_NO_START: i,
+            COL_NIS_START: str(getattr(row_data, "NIS")),
+            COL_NAMA_START: getattr(row_data, "Nama"),
+            COL_JK: getattr(row_data, "Jenis_Kelamin"),
+        })
+
+        # Set row height for data rows
+        ws.row_dimensions[data_row_idx].height = 17.25
+
+    # Atur lebar kolom
+    ws.column_dimensions[get_column_letter(COL_NO_START)].width = 2.29 # No (merged)
+    ws.column_dimensions[get_column_letter(COL_NO_END)].width = 2.14 # Hide the merged part
+    ws.column_dimensions[get_column_letter(COL_NIS_START)].width = 6.14 # NIS (merged)
+    ws.column_dimensions[get_column_letter(COL_NIS_END)].width = 1.71 # Hide the merged part
+    ws.column_dimensions[get_column_letter(COL_NAMA_START)].width = 22.71 # Nama Siswa (merged)
+    ws.column_dimensions[get_column_letter(COL_NAMA_END)].width = 27 # Hide the merged part
+    ws.column_dimensions[get_column_letter(COL_JK)].width = 7.86 # Jenis Kelamin
+
+    current_row += len(dataframe) + 1 # Pindah ke bawah tabel, 1 baris spasi
+
+    # --- Bagian Keterangan ---
+    if 'Jenis_Kelamin' in dataframe.columns:
+        jumlah_L = dataframe[dataframe['Jenis_Kelamin'].astype(str).str.upper() == 'L'].shape[0]
+        jumlah_P = dataframe[dataframe['Jenis_Kelamin'].astype(str).str.upper() == 'P'].shape[0]
+
+        ws.cell(row=current_row, column=1, value="Keterangan:").font = FONT_BOLD_12
+        ws.cell(row=current_row, column=1).alignment = LEFT_ALIGN
+        current_row += 1
+        ws.cell(row=current_row, column=1, value=f"- Jumlah Laki-laki (L) : {jumlah_L}").font = FONT_NORMAL_12
+        ws.cell(row=current_row, column=1).alignment = LEFT_ALIGN
+        current_row += 1
+        ws.cell(row=current_row, column=1, value=f"- Jumlah Perempuan (P) : {jumlah_P}").font = FONT_NORMAL_12
+        ws.cell(row=current_row, column=1).alignment = LEFT_ALIGN
+        current_row += 1
+
+    current_row += 1 # Tambah 1 baris kosong antara Keterangan dan Mengetahui
+
+    # --- Bagian Tanda Tangan ---
+    #Mengetahui (Kepala Sekolah) di kolom A
+    ws.cell(row=current_row, column=1, value="Mengetahui").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=1).alignment = LEFT_ALIGN
+    ws.cell(row=current_row + 1, column=1, value="Kepala Sekolah").font = FONT_NORMAL_12
+    ws.cell(row=current_row + 1, column=1).alignment = LEFT_ALIGN
+
+    #Wali Kelas dan Bantul di kolom F (index 7)
+    ws.cell(row=current_row, column=6, value=f"Bantul, ............................... {tahun_pelajaran.split('/')[0]}").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=6).alignment = LEFT_INDENT_7_ALIGN
+    #ws.cell(row=current_row, column=6).alignment = LEFT_ALIGN
+    ws.cell(row=current_row + 1, column=6, value=f"Wali Kelas {kelas}").font = FONT_NORMAL_12
+    ws.cell(row=current_row + 1, column=6).alignment = LEFT_INDENT_7_ALIGN
+    #ws.cell(row=current_row + 1, column=6).alignment = LEFT_ALIGN
+    current_row += 2
+
+    current_row += 3 # Jarak untuk tanda tangan (3 baris)
+    ws.cell(row=current_row, column=1, value=KEPALA_SEKOLAH).font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=1).alignment = LEFT_ALIGN
+    ws.cell(row=current_row, column=6, value=nama_wali_kelas).font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=6).alignment = LEFT_INDENT_7_ALIGN
+
+    current_row += 1 # Pindah ke baris berikutnya untuk NIP
+    ws.cell(row=current_row, column=1, value=f"NIP. {NIP_KEPSEK}").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=1).alignment = LEFT_ALIGN
+    ws.cell(row=current_row, column=6, value=f"NIP. {nip_wali_kelas}").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=6).alignment = LEFT_INDENT_7_ALIGN
+
+
+def generate_excel_daftar_siswa(dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas):
+    wb = Workbook()
+    # Gaya tabel (NamedStyle) didaftarkan sekali per workbook
+    pasang_gaya(wb)
+    _sheet_daftar_siswa(wb.active, dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas)
+    return _simpan(wb)
+
+
+def generate_excel_daftar_siswa_multi(daftar_kelas, semester, tahun_pelajaran):
+    """Satu workbook, satu sheet per kelas. daftar_kelas: [(dataframe, kelas, nama_wali_kelas, nip_wali_kelas), ...]"""
+    wb = Workbook()
+    pasang_gaya(wb)
+    for i, (dataframe, kelas, nama_wali_kelas, nip_wali_kelas) in enumerate(daftar_kelas):
+        ws = wb.active if i == 0 else wb.create_sheet()
+        _sheet_daftar_siswa(ws, dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas)
+    return _simpan(wb)
+
+
+def generate_excel_form_nilai_siswa(dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru):
+    wb = Workbook()
+    ws = wb.active
+    # Menggunakan kelas tanpa spasi untuk judul sheet
+    ws.title = f"Form Nilai {kelas}"
+
+    # --- Pengaturan Halaman (Legal, Portrait) ---
+    ws.page_setup.paperSize = ws.PAPERSIZE_LEGAL
+    ws.page_margins = PageMargins(
+        left=1.8/2.54, right=1.8/2.54, top=1.9/2.54, bottom=1.9/2.54
+    )
+    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT
+    ws.print_options.horizontalCentered = True
+    ws.print_options.verticalCentered = False
+
+    # Gaya tabel (NamedStyle) didaftarkan sekali per workbook
+    pasang_gaya(wb)
+
+    # --- Header Informasi (Baris atas) ---
+    current_row = 1
+    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=20)
+    cell_title = ws[f'A{current_row}']
+    cell_title.value = "FORM NILAI SISWA"
+    cell_title.font = FONT_BOLD_12
+    cell_title.alignment = CENTER_ALIGN
+
+    current_row += 1
+    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=20)
+    cell_subtitle = ws[f'A{current_row}']
+    cell_subtitle.value = f"{NAMA_SEKOLAH} TAHUN PELAJARAN {tahun_pelajaran}"
+    cell_subtitle.font = FONT_BOLD_12
+    cell_subtitle.alignment = CENTER_ALIGN
+
+    current_row += 2
+
+    # Information table
+    ws[f'A{current_row}'].value = "Mata Pelajaran"
+    ws[f'G{current_row}'].value = f": {mapel}"
+    ws[f'J{current_row}'].value = "Kelas"
+    ws[f'N{current_row}'].value = f": {kelas}" # Kelas tanpa spasi
+
+    for col in ['A', 'G', 'J', 'N']:
+        ws[f'{col}{current_row}'].font = FONT_NORMAL_12
+        ws[f'{col}{current_row}'].alignment = LEFT_ALIGN
+
+    current_row += 1
+    ws[f'A{current_row}'].value = "Semester"
+    ws[f'G{current_row}'].value = f": {semester}"
+    ws[f'J{current_row}'].value = "Nama Guru"
+    ws[f'N{current_row}'].value = f": {guru}"
+
+    for col in ['A', 'G', 'J', 'N']:
+        ws[f'{col}{current_row}'].font = FONT_NORMAL_12
+        ws[f'{col}{current_row}'].alignment = LEFT_ALIGN
+
+    current_row += 2
+
+    # --- Tabel Utama Header ---
+    header_start_row = current_row
+
+    # Column Constants for Form Nilai Siswa
+    COL_NO_START = 1; COL_NO_END = 2
+    COL_NIS_START = 3; COL_NIS_END = 5
+    COL_NAMA_START = 6; COL_NAMA_END = 7
+    COL_FORMATIF_START = 8; COL_FORMATIF_END = 12
+    COL_SUMATIF_START = 13; COL_SUMATIF_END = 17
+    COL_PTS = 18
+    COL_SAS_SAT = 19
+    COL_NR = 20
+    TOTAL_EFFECTIVE_COLS_NILAI = COL_NR
+
+    # Row 1 Headers (Merged across 3 rows)
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NO_START, end_row=header_start_row + 2, end_column=COL_NO_END)
+    ws.cell(row=header_start_row, column=COL_NO_START, value="No.").font = FONT_BOLD_12; ws.cell(row=header_start_row, column=COL_NO_START).alignment = CENTER_ALIGN
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NIS_START, end_row=header_start_row + 2, end_column=COL_NIS_END)
+    ws.cell(row=header_start_row, column=COL_NIS_START, value="NIS").font = FONT_BOLD_12; ws.cell(row=header_start_row, column=COL_NIS_START).alignment = CENTER_ALIGN
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NAMA_START, end_row=header_start_row + 2, end_column=COL_NAMA_END)
+    ws.cell(row=header_start_row, column=COL_NAMA_START, value="Nama Siswa").font = FONT_BOLD_12; ws.cell(row=header_start_row, column=COL_NAMA_START).alignment = CENTER_ALIGN
+    ws.merge_cells(start_row=header_start_row, start_column=COL_PTS, end_row=header_start_row + 2, end_column=COL_PTS)
+    ws.cell(row=header_start_row, column=COL_PTS, value="PTS").font = FONT_BOLD_9; ws.cell(row=header_start_row, column=COL_PTS).alignment = CENTER_ALIGN
+    ws.merge_cells(start_row=header_start_row, start_column=COL_SAS_SAT, end_row=header_start_row + 2, end_column=COL_SAS_SAT)
+    ws.cell(row=header_start_row, column=COL_SAS_SAT, value="SAS/SAT").font = FONT_BOLD_9; ws.cell(row=header_start_row, column=COL_SAS_SAT).alignment = CENTER_ALIGN
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NR, end_row=header_start_row + 2, end_column=COL_NR)
+    ws.cell(row=header_start_row, column=COL_NR, value="NR").font = FONT_BOLD_9; ws.cell(row=header_start_row, column=COL_NR).alignment = CENTER_ALIGN
+
+    # Formatif/Tugas & Sumatif Lingkup Materi (Merged across 1 row)
+    ws.merge_cells(start_row=header_start_row, start_column=COL_FORMATIF_START, end_row=header_start_row, end_column=COL_FORMATIF_END)
+    ws.cell(row=header_start_row, column=COL_FORMATIF_START, value="Formatif / Tugas").font = FONT_BOLD_9; ws.cell(row=header_start_row, column=COL_FORMATIF_START).alignment = CENTER_ALIGN
+    ws.merge_cells(start_row=header_start_row, start_column=COL_SUMATIF_START, end_row=header_start_row, end_column=COL_SUMATIF_END)
+    ws.cell(row=header_start_row, column=COL_SUMATIF_START, value="Sumatif Lingkup Materi").font = FONT_BOLD_9; ws.cell(row=header_start_row, column=COL_SUMATIF_START).alignment = CENTER_ALIGN
+
+    # Row 2 & 3 Headers (TP and LM)
+    for i in range(5):
+        col_idx_f = COL_FORMATIF_START + i
+        ws.cell(row=header_start_row + 1, column=col_idx_f, value=f"TP{i+1}").font = FONT_NORMAL_9; ws.cell(row=header_start_row + 1, column=col_idx_f).alignment = CENTER_ALIGN
+        ws.merge_cells(start_row=header_start_row + 1, start_column=col_idx_f, end_row=header_start_row + 2, end_column=col_idx_f)
+
+        col_idx_s = COL_SUMATIF_START + i
+        ws.cell(row=header_start_row + 1, column=col_idx_s, value=f"LM{i+1}").font = FONT_NORMAL_9; ws.cell(row=header_start_row + 1, column=col_idx_s).alignment = CENTER_ALIGN
+        ws.merge_cells(start_row=header_start_row + 1, start_column=col_idx_s, end_row=header_start_row + 2, end_column=col_idx_s)
+
+
+    # Apply borders and set column width
+    for r_idx in range(header_start_row, header_start_row + 3):
+        for c_idx in range(1, TOTAL_EFFECTIVE_COLS_NILAI + 1):
+            ws.cell(row=r_idx, column=c_idx).border = THIN_BORDER
+
+    ws.row_dimensions[header_start_row].height = 20; ws.row_dimensions[header_start_row + 1].height = 20; ws.row_dimensions[header_start_row + 2].height = 20
+    ws.column_dimensions[get_column_letter(COL_NO_START)].width = 2.57; ws.column_dimensions[get_column_letter(COL_NO_END)].width = 2.14
+    ws.column_dimensions[get_column_letter(COL_NIS_START)].width = 2; ws.column_dimensions[get_column_letter(COL_NIS_START + 1)].width = 2; ws.column_dimensions[get_column_letter(COL_NIS_END)].width = 2
+    ws.column_dimensions[get_column_letter(COL_NAMA_START)].width = 8.43; ws.column_dimensions[get_column_letter(COL_NAMA_END)].width = 23
+    for i in range(COL_FORMATIF_START, COL_FORMATIF_END + 1): ws.column_dimensions[get_column_letter(i)].width = 3
+    for i in range(COL_SUMATIF_START, COL_SUMATIF_END + 1): ws.column_dimensions[get_column_letter(i)].width = 3
+    ws.column_dimensions[get_column_letter(COL_PTS)].width = 4; ws.column_dimensions[get_column_letter(COL_SAS_SAT)].width = 5; ws.column_dimensions[get_column_letter(COL_NR)].width = 4
+
+    current_row += 3
+
+    # --- Isi Data Siswa (dengan border di semua kolom) ---
+    # Gaya setiap kolom satu baris data: A:B No, C:E NIS, F:G Nama, H:T kolom isian nilai
+    gaya_baris_siswa = [TABEL_TENGAH, TABEL_GARIS, TABEL_TENGAH, TABEL_GARIS, TABEL_GARIS,
+                        TABEL_KIRI, TABEL_GARIS] + \
+                       [TABEL_KOSONG_TENGAH] * (TOTAL_EFFECTIVE_COLS_NILAI - COL_FORMATIF_START + 1)
+    for i, row_data in enumerate(dataframe.itertuples(), 1):
+        data_row_idx = current_row + i - 1
+
+        # Merge cells for No., NIS, Nama
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NO_START, end_row=data_row_idx, end_column=COL_NO_END)
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NIS_START, end_row=data_row_idx, end_column=COL_NIS_END)
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NAMA_START, end_row=data_row_idx, end_column=COL_NAMA_END)
+
+        # Menggunakan kolom 'NIS' dan 'Nama' dari DataFrame yang sudah difilter
+        tulis_baris(ws, data_row_idx, gaya_baris_siswa, {
+            COL_NO_START: i,
+            COL_NIS_START: str(getattr(row_data, "NIS")),
+            COL_NAMA_START: getattr(row_data, "Nama"),
+        })
+
+        ws.row_dimensions[data_row_idx].height = 20
+
+    current_row += len(dataframe) + 1 # Pindah ke bawah tabel, 1 baris spasi
+
+    # --- Bagian Tanda Tangan ---
+
+    # 1. Mengetahui (Kepala Sekolah) di kolom C (start_column=3)
+    ws.merge_cells(start_row=current_row, start_column=3, end_row=current_row, end_column=7)
+    ws.cell(row=current_row, column=3, value="Mengetahui").font = FONT_NORMAL_12; ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+
+    # Guru Mapel - Tanggal (di kolom L/12)
+    tz_jakarta = pytz.timezone('Asia/Jakarta')
+    now = datetime.now(tz_jakarta)
+    tanggal_formatted = f"Bantul, ............................... {now.year}"
+    ws.merge_cells(start_row=current_row, start_column=12, end_row=current_row, end_column=20)
+    # PERBAIKAN: Menulis nilai di sel awal (kolom 12), bukan kolom 14
+    ws.cell(row=current_row, column=12, value=tanggal_formatted).font = FONT_NORMAL_12; ws.cell(row=current_row, column=12).alignment = LEFT_ALIGN
+
+    current_row += 1
+
+    # 2. Kepala Sekolah di kolom C (start_column=3)
+    ws.merge_cells(start_row=current_row, start_column=3, end_row=current_row, end_column=7)
+    ws.cell(row=current_row, column=3, value="Kepala Sekolah").font = FONT_NORMAL_12; ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+
+    # Guru Mapel (di kolom L/12)
+    ws.merge_cells(start_row=current_row, start_column=12, end_row=current_row, end_column=20)
+    # PERBAIKAN: Menulis nilai di sel awal (kolom 12), bukan kolom 14
+    ws.cell(row=current_row, column=12, value=f"Guru {mapel}").font = FONT_NORMAL_12; ws.cell(row=current_row, column=12).alignment = LEFT_ALIGN
+
+    current_row += 4 # Jarak untuk tanda tangan
+
+    # 3. Nama Kepala Sekolah di kolom C (start_column=3)
+    ws.merge_cells(start_row=current_row, start_column=3, end_row=current_row, end_column=7)
+    ws.cell(row=current_row, column=3, value=KEPALA_SEKOLAH).font = FONT_NORMAL_12; ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+
+    # Nama Guru (di kolom L/12)
+    ws.merge_cells(start_row=current_row, start_column=12, end_row=current_row, end_column=20)
+    # PERBAIKAN: Menulis nilai di sel awal (kolom 12), bukan kolom 14
+    ws.cell(row=current_row, column=12, value=guru).font = FONT_NORMAL_12; ws.cell(row=current_row, column=12).alignment = LEFT_ALIGN
+
+    current_row += 1
+
+    # 4. NIP Kepala Sekolah di kolom C (start_column=3)
+    ws.merge_cells(start_row=current_row, start_column=3, end_row=current_row, end_column=7)
+    ws.cell(row=current_row, column=3, value=f"NIP. {NIP_KEPSEK}").font = FONT_NORMAL_12; ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+
+    # NIP Guru (di kolom L/12)
+    ws.merge_cells(start_row=current_row, start_column=12, end_row=current_row, end_column=20)
+    # PERBAIKAN: Menulis nilai di sel awal (kolom 12), bukan kolom 14
+    ws.cell(row=current_row, column=12, value=f"NIP. {nip_guru}").font = FONT_NORMAL_12; ws.cell(row=current_row, column=12).alignment = LEFT_ALIGN
+
+    return _simpan(wb)
+
+
+def generate_excel_absensi_panjang(dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = f"Daftar Hadir {kelas}"
+
+    # --- Pengaturan Halaman (Legal, Portrait) ---
+    ws.page_setup.paperSize = ws.PAPERSIZE_LEGAL
+    ws.page_margins = PageMargins(
+        left=18/25.4,
+        right=0.8/25.4,
+        top=19/25.4,
+        bottom=24/25.4
+    )
+    ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT
+    ws.print_options.horizontalCentered = True
+    ws.print_options.verticalCentered = False
+
+    # Gaya tabel (NamedStyle) didaftarkan sekali per workbook
+    pasang_gaya(wb)
+
+    # --- Header Informasi (Baris atas) ---
+    current_row = 1
+
+    COL_NO_START = 1
+    COL_NO_END = 2
+    COL_NAMA_START = 3
+    COL_NAMA_END = 4
+    COL_PERTEMUAN_START = 5
+    COL_PERTEMUAN_END = 24
+    COL_JUMLAH_START = 25
+    COL_JUMLAH_END = 27
+    TOTAL_EFFECTIVE_COLS = 27
+
+    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=TOTAL_EFFECTIVE_COLS)
+    cell_title = ws[f'A{current_row}']
+    cell_title.value = "DAFTAR HADIR SISWA"
+    cell_title.font = FONT_BOLD_12
+    cell_title.alignment = CENTER_ALIGN
+
+    current_row += 1
+    ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=TOTAL_EFFECTIVE_COLS)
+    cell_subtitle = ws[f'A{current_row}']
+    cell_subtitle.value = f"{NAMA_SEKOLAH} TAHUN PELAJARAN {tahun_pelajaran}"
+    cell_subtitle.font = FONT_BOLD_12
+    cell_subtitle.alignment = CENTER_ALIGN
+
+    current_row += 2
+
+    # Information table (Mata Pelajaran, Kelas, Semester, Tahun Pelajaran)
+    ws[f'A{current_row}'].value = "Mata Pelajaran"
+    ws[f'D{current_row}'].value = f": {mapel}"
+    ws[f'K{current_row}'].value = "Semester"
+    ws[f'T{current_row}'].value = f": {semester}"
+
+    for col_letter in ['A', 'D', 'K', 'T']:
+        ws[f'{col_letter}{current_row}'].font = FONT_NORMAL_12
+        ws[f'{col_letter}{current_row}'].alignment = LEFT_ALIGN
+
+    current_row += 1
+    ws[f'A{current_row}'].value = "Kelas"
+    ws[f'D{current_row}'].value = f": {kelas}"
+    ws[f'K{current_row}'].value = "Tahun Pelajaran"
+    ws[f'T{current_row}'].value = f": {tahun_pelajaran}"
+
+    for col_letter in ['A', 'D', 'K', 'T']:
+        ws[f'{col_letter}{current_row}'].font = FONT_NORMAL_12
+        ws[f'{col_letter}{current_row}'].alignment = LEFT_ALIGN
+
+    current_row += 2
+
+    # --- Tabel Utama Header ---
+    header_start_row = current_row
+
+    # --- Header "No." ---
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NO_START, end_row=header_start_row + 2, end_column=COL_NO_END)
+    cell_no_header = ws.cell(row=header_start_row, column=COL_NO_START)
+    cell_no_header.value = "No."
+    cell_no_header.font = FONT_BOLD_12
+    cell_no_header.alignment = CENTER_ALIGN
+
+    # --- Header "Nama" ---
+    ws.merge_cells(start_row=header_start_row, start_column=COL_NAMA_START, end_row=header_start_row + 2, end_column=COL_NAMA_END)
+    cell_nama_header = ws.cell(row=header_start_row, column=COL_NAMA_START)
+    cell_nama_header.value = "Nama"
+    cell_nama_header.font = FONT_BOLD_12
+    cell_nama_header.alignment = CENTER_ALIGN
+
+    # --- Header "Pertemuan ke..... Tanggal..." ---
+    ws.merge_cells(start_row=header_start_row, start_column=COL_PERTEMUAN_START, end_row=header_start_row, end_column=COL_PERTEMUAN_END)
+    cell_pertemuan_header = ws.cell(row=header_start_row, column=COL_PERTEMUAN_START)
+    cell_pertemuan_header.value = "Pertemuan ke... Tanggal..."
+    cell_pertemuan_header.font = FONT_BOLD_12
+    cell_pertemuan_header.alignment = CENTER_ALIGN
+
+    # --- Header "Jumlah" ---
+    ws.merge_cells(start_row=header_start_row, start_column=COL_JUMLAH_START, end_row=header_start_row, end_column=COL_JUMLAH_END)
+    cell_jumlah_header = ws.cell(row=header_start_row, column=COL_JUMLAH_START)
+    cell_jumlah_header.value = "Jumlah"
+    cell_jumlah_header.font = FONT_BOLD_9
+    cell_jumlah_header.alignment = CENTER_ALIGN
+
+    # --- Sub-headers (Row 2 and 3 relative to header_start_row) ---
+    for i in range(20):
+        col_idx = COL_PERTEMUAN_START + i
+        cell = ws.cell(row=header_start_row + 1, column=col_idx)
+        cell.value = str(i + 1)
+        cell.font = FONT_NORMAL_7
+        cell.alignment = CENTER_ALIGN
+
+        cell_empty = ws.cell(row=header_start_row + 2, column=col_idx)
+        cell_empty.value = ""
+        cell_empty.font = FONT_NORMAL_7
+        cell_empty.alignment = CENTER_ALIGN
+
+    # A, I, S headers
+    ws.merge_cells(start_row=header_start_row + 1, start_column=COL_JUMLAH_START, end_row=header_start_row + 2, end_column=COL_JUMLAH_START)
+    cell_a_header = ws.cell(row=header_start_row + 1, column=COL_JUMLAH_START)
+    cell_a_header.value = "A"
+    cell_a_header.font = FONT_BOLD_9
+    cell_a_header.alignment = CENTER_ALIGN
+
+    ws.merge_cells(start_row=header_start_row + 1, start_column=COL_JUMLAH_START + 1, end_row=header_start_row + 2, end_column=COL_JUMLAH_START + 1)
+    cell_i_header = ws.cell(row=header_start_row + 1, column=COL_JUMLAH_START + 1)
+    cell_i_header.value = "I"
+    cell_i_header.font = FONT_BOLD_9
+    cell_i_header.alignment = CENTER_ALIGN
+
+    ws.merge_cells(start_row=header_start_row + 1, start_column=COL_JUMLAH_START + 2, end_row=header_start_row + 2, end_column=COL_JUMLAH_START + 2)
+    cell_s_header = ws.cell(row=header_start_row + 1, column=COL_JUMLAH_START + 2)
+    cell_s_header.value = "S"
+    cell_s_header.font = FONT_BOLD_9
+    cell_s_header.alignment = CENTER_ALIGN
+
+    # Apply borders
+    for r_idx in range(header_start_row, header_start_row + 3):
+        for c_idx in range(1, TOTAL_EFFECTIVE_COLS + 1):
+            cell = ws.cell(row=r_idx, column=c_idx)
+            cell.border = THIN_BORDER
+
+    # Set dimensions
+    ws.row_dimensions[header_start_row].height = 20
+    ws.row_dimensions[header_start_row + 1].height = 20
+    ws.row_dimensions[header_start_row + 2].height = 20
+
+    ws.column_dimensions[get_column_letter(COL_NO_START)].width = 2.57
+    ws.column_dimensions[get_column_letter(COL_NO_END)].width = 3.43
+    ws.column_dimensions[get_column_letter(COL_NAMA_START)].width = 8.14
+    ws.column_dimensions[get_column_letter(COL_NAMA_END)].width = 26.86
+    for i in range(COL_PERTEMUAN_START, COL_PERTEMUAN_END + 1):
+        ws.column_dimensions[get_column_letter(i)].width = 2.3
+    for i in range(COL_JUMLAH_START, COL_JUMLAH_END + 1):
+        ws.column_dimensions[get_column_letter(i)].width = 2.7
+
+    current_row += 3
+
+    # --- Isi Data Siswa (yang sudah difilter) ---
+    # Gaya setiap kolom satu baris data: A:B No, C:D Nama, 20 pertemuan + A/I/S (hanya garis)
+    gaya_baris_siswa = [TABEL_TENGAH, TABEL_GARIS, TABEL_KIRI] + \
+                       [TABEL_GARIS] * (TOTAL_EFFECTIVE_COLS - COL_NAMA_START)
+    for i, row_data in enumerate(dataframe.itertuples(), 1):
+        data_row_idx = current_row + i - 1
+
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NO_START, end_row=data_row_idx, end_column=COL_NO_END)
+        ws.merge_cells(start_row=data_row_idx, start_column=COL_NAMA_START, end_row=data_row_idx, end_column=COL_NAMA_END)
+
+        # Nilai + font/border/alignment seluruh baris dalam satu lintasan
+        tulis_baris(ws, data_row_idx, gaya_baris_siswa, {
+            COL_NO_START: i,
+            COL_NAMA_START: getattr(row_data, "Nama"),
+        })
+
+        ws.row_dimensions[data_row_idx].height = 20
+
+    current_row += len(dataframe) + 1
+
+    # --- Bagian Tanda Tangan ---
+    ws.cell(row=current_row, column=3, value="Mengetahui").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+    current_row += 1
+    ws.cell(row=current_row, column=3, value="Kepala Sekolah").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+
+    tz_jakarta = pytz.timezone('Asia/Jakarta')
+    # Menggunakan tahun yang dipilih untuk tanggal Bantul jika lebih masuk akal, tapi karena ini adalah file template,
+    # menggunakan tahun saat ini (now.year) sudah cukup.
+    now = datetime.now(tz_jakarta)
+    tanggal_formatted = f"Bantul, .................................... {now.year}"
+
+    ws.cell(row=current_row - 1, column=12, value=tanggal_formatted).font = FONT_NORMAL_12
+    ws.cell(row=current_row - 1, column=12).alignment = LEFT_ALIGN
+    ws.cell(row=current_row, column=12, value=f"Guru {mapel}").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=12).alignment = LEFT_ALIGN
+
+    current_row += 3
+
+    ws.cell(row=current_row, column=3, value=KEPALA_SEKOLAH).font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+    ws.cell(row=current_row, column=12, value=guru).font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=12).alignment = LEFT_ALIGN
+
+    current_row += 1
+    ws.cell(row=current_row, column=3, value=f"NIP. {NIP_KEPSEK}").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=3).alignment = LEFT_ALIGN
+    ws.cell(row=current_row, column=12, value=f"NIP. {nip_guru}").font = FONT_NORMAL_12
+    ws.cell(row=current_row, column=12).alignment = LEFT_ALIGN
+
+    return _simpan(wb)
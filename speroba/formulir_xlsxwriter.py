@@ -0,0 +1,335 @@
+"""
+Backend xlsxwriter untuk formulir cetak: Daftar Siswa, Form Nilai Siswa, Daftar Hadir.
+
+Tata letak (merge, ukuran kertas Legal, margin, tinggi baris, lebar kolom, blok tanda tangan)
+disamakan sel demi sel dengan backend openpyxl di formulir_openpyxl.py.
+
+Header, baris siswa, dan footer tiap formulir direkam sekali sebagai TemplatXlsx (di-cache per proses)
+lalu diterapkan ke setiap sheet; yang berubah per kelas hanya isian teksnya.
+"""
+import functools
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+import pytz
+import xlsxwriter
+
+from speroba.sekolah import KEPALA_SEKOLAH, NIP_KEPSEK, NAMA_SEKOLAH
+from speroba.templat_excel import Isian, Nilai, TemplatXlsx
+
+PAPER_LEGAL = 5
+
+_FONT = {
+    'b12': {'font_name': 'Times New Roman', 'font_size': 12, 'bold': True},
+    'n12': {'font_name': 'Times New Roman', 'font_size': 12},
+    'b9': {'font_name': 'Times New Roman', 'font_size': 9, 'bold': True},
+    'n9': {'font_name': 'Times New Roman', 'font_size': 9},
+    'n7': {'font_name': 'Times New Roman', 'font_size': 7},
+}
+_ALIGN = {
+    'center': {'align': 'center', 'valign': 'vcenter', 'text_wrap': True},
+    'left': {'align': 'left', 'valign': 'vcenter'},
+    'indent7': {'align': 'left', 'indent': 7},
+}
+
+# Kunci gaya (font, garis, alignment) yang disimpan di template
+POLOS = (None, False, None)
+JUDUL = ('b12', False, 'center')
+KETERANGAN = ('b12', False, 'left')
+TEKS_KIRI = ('n12', False, 'left')
+TEKS_INDENT = ('n12', False, 'indent7')
+GARIS = (None, True, None)
+ISIAN = (None, True, 'center')
+KEPALA_TENGAH = ('b12', True, 'center')
+KEPALA_KIRI = ('b12', True, 'left')
+KEPALA_KECIL = ('b9', True, 'center')
+SUB_KEPALA = ('n9', True, 'center')
+NOMOR_PERTEMUAN = ('n7', True, 'center')
+SEL_TENGAH = ('n12', True, 'center')
+SEL_KIRI = ('n12', True, 'left')
+
+
+class _Gaya:
+    """Format xlsxwriter per kunci (font, garis, alignment), dibuat sekali per workbook."""
+
+    def __init__(self, wb):
+        self.wb = wb
+        self._cache = {}
+
+    def __call__(self, kunci):
+        fmt = self._cache.get(kunci)
+        if fmt is None:
+            font, garis, align = kunci
+            props = {}
+            if font:
+                props.update(_FONT[font])
+            if garis:
+                props['border'] = 1
+            if align:
+                props.update(_ALIGN[align])
+            fmt = self._cache[kunci] = self.wb.add_format(props)
+        return fmt
+
+
+def _lebar_px(width):
+    """Lebar kolom openpyxl (satuan file) -> piksel, sesuai rumus Excel, agar hasil render sama."""
+    return int(((256 * width + int(128 / 7)) / 256) * 7)
+
+
+def _atur_halaman(ws, left, right, top, bottom):
+    ws.set_paper(PAPER_LEGAL)
+    ws.set_margins(left=left, right=right, top=top, bottom=bottom)
+    # Margin header/footer bawaan openpyxl PageMargins adalah 0.5"
+    ws.set_header('', {'margin': 0.5})
+    ws.set_footer('', {'margin': 0.5})
+    ws.set_portrait()
+    ws.center_horizontally()
+
+
+def _nilai(v):
+    # NaN tidak bisa ditulis xlsxwriter sebagai angka; sel dibiarkan kosong
+    return None if not isinstance(v, str) and pd.isna(v) else v
+
+
+def _judul(t, teks, lebar):
+    """Dua baris judul (baris 1-2) yang di-merge selebar tabel."""
+    t.merge(0, 0, 0, lebar - 1, teks, JUDUL, POLOS)
+    t.merge(1, 0, 1, lebar - 1, Isian(f"{NAMA_SEKOLAH} TAHUN PELAJARAN {{tahun_pelajaran}}"), JUDUL, POLOS)
+
+
+def _info(t, kolom, baris_info):
+    """Baris informasi (baris 4-5): label/isian di kolom tetap, rata kiri."""
+    for r, teks in baris_info:
+        for col, value in zip(kolom, teks):
+            t.tulis(r, col, value, TEKS_KIRI)
+
+
+def _simpan(wb, buffer):
+    wb.close()
+    buffer.seek(0)
+    return buffer
+
+
+def _tahun_sekarang():
+    return datetime.now(pytz.timezone('Asia/Jakarta')).year
+
+
+# =========================================================
+# Daftar Siswa
+# =========================================================
+@functools.lru_cache(maxsize=None)
+def _templat_daftar_siswa():
+    header = TemplatXlsx()
+    _judul(header, "DAFTAR SISWA", 7)
+    _info(header, (0, 3, 5, 6), [
+        (3, ("Kelas", Isian(": {kelas}"), "Semester", Isian(": {semester}"))),
+        (4, ("Wali Kelas", Isian(": {nama_wali_kelas}"), "Tahun Pelajaran", Isian(": {tahun_pelajaran}"))),
+    ])
+    hr = 6
+    header.merge(hr, 0, hr, 1, "No.", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 2, hr, 3, "NIS", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 4, hr, 5, "Nama Siswa", KEPALA_KIRI, GARIS)
+    header.tulis(hr, 6, "JK", KEPALA_TENGAH)
+    header.tinggi(hr, 21)
+    for col, width in enumerate([2.29, 2.14, 6.14, 1.71, 22.71, 27, 7.86]):
+        header.lebar_px(col, _lebar_px(width))
+
+    baris = TemplatXlsx()
+    baris.merge(0, 0, 0, 1, Nilai("no"), SEL_TENGAH, ISIAN)
+    baris.merge(0, 2, 0, 3, Nilai("nis"), SEL_TENGAH, ISIAN)
+    baris.merge(0, 4, 0, 5, Nilai("nama"), SEL_KIRI, ISIAN)
+    baris.tulis(0, 6, Nilai("jk"), SEL_TENGAH)
+    baris.tinggi(0, 17.25)
+
+    keterangan = TemplatXlsx()
+    keterangan.tulis(0, 0, "Keterangan:", KETERANGAN)
+    keterangan.tulis(1, 0, Isian("- Jumlah Laki-laki (L) : {jumlah_l}"), TEKS_KIRI)
+    keterangan.tulis(2, 0, Isian("- Jumlah Perempuan (P) : {jumlah_p}"), TEKS_KIRI)
+
+    ttd = TemplatXlsx()
+    ttd.tulis(0, 0, "Mengetahui", TEKS_KIRI)
+    ttd.tulis(1, 0, "Kepala Sekolah", TEKS_KIRI)
+    ttd.tulis(0, 5, Isian("Bantul, ............................... {tahun}"), TEKS_INDENT)
+    ttd.tulis(1, 5, Isian("Wali Kelas {kelas}"), TEKS_INDENT)
+    ttd.tulis(5, 0, KEPALA_SEKOLAH, TEKS_KIRI)
+    ttd.tulis(5, 5, Nilai("nama_wali_kelas"), TEKS_INDENT)
+    ttd.tulis(6, 0, f"NIP. {NIP_KEPSEK}", TEKS_KIRI)
+    ttd.tulis(6, 5, Isian("NIP. {nip_wali_kelas}"), TEKS_INDENT)
+    return header, baris, keterangan, ttd
+
+
+def _sheet_daftar_siswa(wb, g, dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas):
+    ws = wb.add_worksheet(f"Daftar Siswa {kelas}")
+    header, baris, keterangan, ttd = _templat_daftar_siswa()
+    _atur_halaman(ws, left=28/25.4, right=18/25.4, top=24/25.4, bottom=19/25.4)
+
+    r = header.terapkan(ws, g, kelas=kelas, semester=semester, tahun_pelajaran=tahun_pelajaran,
+                        nama_wali_kelas=nama_wali_kelas)
+    baris = baris.ikat(g)
+    for i, row_data in enumerate(dataframe.itertuples(), 1):
+        r = baris.terapkan(ws, r, no=i, nis=str(getattr(row_data, "NIS")),
+                           nama=_nilai(getattr(row_data, "Nama")), jk=_nilai(getattr(row_data, "Jenis_Kelamin")))
+
+    r += 1  # 1 baris spasi di bawah tabel
+    if 'Jenis_Kelamin' in dataframe.columns:
+        jk = dataframe['Jenis_Kelamin'].astype(str).str.upper()
+        r = keterangan.terapkan(ws, g, r, jumlah_l=int((jk == 'L').sum()), jumlah_p=int((jk == 'P').sum()))
+    r += 1
+
+    ttd.terapkan(ws, g, r, tahun=tahun_pelajaran.split('/')[0], kelas=kelas,
+                 nama_wali_kelas=nama_wali_kelas, nip_wali_kelas=nip_wali_kelas)
+
+
+def generate_excel_daftar_siswa(dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas):
+    buffer = BytesIO()
+    wb = xlsxwriter.Workbook(buffer, {'in_memory': True})
+    _sheet_daftar_siswa(wb, _Gaya(wb), dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas)
+    return _simpan(wb, buffer)
+
+
+def generate_excel_daftar_siswa_multi(daftar_kelas, semester, tahun_pelajaran):
+    """Satu workbook, satu sheet per kelas. daftar_kelas: [(dataframe, kelas, nama_wali_kelas, nip_wali_kelas), ...]"""
+    buffer = BytesIO()
+    wb = xlsxwriter.Workbook(buffer, {'in_memory': True})
+    g = _Gaya(wb)  # format dipakai bersama oleh semua sheet
+    for dataframe, kelas, nama_wali_kelas, nip_wali_kelas in daftar_kelas:
+        _sheet_daftar_siswa(wb, g, dataframe, kelas, semester, tahun_pelajaran, nama_wali_kelas, nip_wali_kelas)
+    return _simpan(wb, buffer)
+
+
+# =========================================================
+# Form Nilai Siswa
+# =========================================================
+@functools.lru_cache(maxsize=None)
+def _templat_form_nilai():
+    header = TemplatXlsx()
+    _judul(header, "FORM NILAI SISWA", 20)
+    _info(header, (0, 6, 9, 13), [
+        (3, ("Mata Pelajaran", Isian(": {mapel}"), "Kelas", Isian(": {kelas}"))),
+        (4, ("Semester", Isian(": {semester}"), "Nama Guru", Isian(": {guru}"))),
+    ])
+    # Tabel utama (baris 7-9)
+    hr = 6
+    header.merge(hr, 0, hr + 2, 1, "No.", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 2, hr + 2, 4, "NIS", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 5, hr + 2, 6, "Nama Siswa", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 17, hr + 2, 17, "PTS", KEPALA_KECIL, GARIS)
+    header.merge(hr, 18, hr + 2, 18, "SAS/SAT", KEPALA_KECIL, GARIS)
+    header.merge(hr, 19, hr + 2, 19, "NR", KEPALA_KECIL, GARIS)
+    header.merge(hr, 7, hr, 11, "Formatif / Tugas", KEPALA_KECIL, GARIS)
+    header.merge(hr, 12, hr, 16, "Sumatif Lingkup Materi", KEPALA_KECIL, GARIS)
+    for i in range(5):
+        header.merge(hr + 1, 7 + i, hr + 2, 7 + i, f"TP{i+1}", SUB_KEPALA, GARIS)
+        header.merge(hr + 1, 12 + i, hr + 2, 12 + i, f"LM{i+1}", SUB_KEPALA, GARIS)
+    for r in range(hr, hr + 3):
+        header.tinggi(r, 20)
+    widths = [2.57, 2.14, 2, 2, 2, 8.43, 23] + [3] * 10 + [4, 5, 4]
+    for col, width in enumerate(widths):
+        header.lebar_px(col, _lebar_px(width))
+
+    baris = TemplatXlsx()
+    baris.merge(0, 0, 0, 1, Nilai("no"), SEL_TENGAH, GARIS)
+    baris.merge(0, 2, 0, 4, Nilai("nis"), SEL_TENGAH, GARIS)
+    baris.merge(0, 5, 0, 6, Nilai("nama"), SEL_KIRI, GARIS)
+    for c in range(7, 20):
+        baris.kosong(0, c, ISIAN)
+    baris.tinggi(0, 20)
+
+    # Tanda tangan: C:G (kepala sekolah) dan L:T (guru)
+    ttd = TemplatXlsx()
+    for offset, kiri, kanan in [
+        (0, "Mengetahui", Isian("Bantul, ............................... {tahun}")),
+        (1, "Kepala Sekolah", Isian("Guru {mapel}")),
+        (5, KEPALA_SEKOLAH, Nilai("guru")),
+        (6, f"NIP. {NIP_KEPSEK}", Isian("NIP. {nip_guru}")),
+    ]:
+        ttd.merge(offset, 2, offset, 6, kiri, TEKS_KIRI, POLOS)
+        ttd.merge(offset, 11, offset, 19, kanan, TEKS_KIRI, POLOS)
+    return header, baris, ttd
+
+
+def generate_excel_form_nilai_siswa(dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru):
+    buffer = BytesIO()
+    wb = xlsxwriter.Workbook(buffer, {'in_memory': True})
+    ws = wb.add_worksheet(f"Form Nilai {kelas}")
+    g = _Gaya(wb)
+    header, baris, ttd = _templat_form_nilai()
+    _atur_halaman(ws, left=1.8/2.54, right=1.8/2.54, top=1.9/2.54, bottom=1.9/2.54)
+
+    r = header.terapkan(ws, g, mapel=mapel, kelas=kelas, semester=semester, guru=guru,
+                        tahun_pelajaran=tahun_pelajaran)
+    baris = baris.ikat(g)
+    for i, row_data in enumerate(dataframe.itertuples(), 1):
+        r = baris.terapkan(ws, r, no=i, nis=str(getattr(row_data, "NIS")), nama=_nilai(getattr(row_data, "Nama")))
+
+    ttd.terapkan(ws, g, r + 1, tahun=_tahun_sekarang(), mapel=mapel, guru=guru, nip_guru=nip_guru)
+    return _simpan(wb, buffer)
+
+
+# =========================================================
+# Daftar Hadir
+# =========================================================
+TOTAL_EFFECTIVE_COLS = 27
+
+
+@functools.lru_cache(maxsize=None)
+def _templat_absensi():
+    header = TemplatXlsx()
+    _judul(header, "DAFTAR HADIR SISWA", TOTAL_EFFECTIVE_COLS)
+    _info(header, (0, 3, 10, 19), [
+        (3, ("Mata Pelajaran", Isian(": {mapel}"), "Semester", Isian(": {semester}"))),
+        (4, ("Kelas", Isian(": {kelas}"), "Tahun Pelajaran", Isian(": {tahun_pelajaran}"))),
+    ])
+    # Tabel utama (baris 7-9): grid 20 pertemuan + jumlah A/I/S
+    hr = 6
+    header.merge(hr, 0, hr + 2, 1, "No.", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 2, hr + 2, 3, "Nama", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 4, hr, 23, "Pertemuan ke... Tanggal...", KEPALA_TENGAH, GARIS)
+    header.merge(hr, 24, hr, 26, "Jumlah", KEPALA_KECIL, GARIS)
+    for i in range(20):
+        header.tulis(hr + 1, 4 + i, str(i + 1), NOMOR_PERTEMUAN)
+        header.kosong(hr + 2, 4 + i, NOMOR_PERTEMUAN)
+    for i, label in enumerate(["A", "I", "S"]):
+        header.merge(hr + 1, 24 + i, hr + 2, 24 + i, label, KEPALA_KECIL, GARIS)
+    for r in range(hr, hr + 3):
+        header.tinggi(r, 20)
+    widths = [2.57, 3.43, 8.14, 26.86] + [2.3] * 20 + [2.7] * 3
+    for col, width in enumerate(widths):
+        header.lebar_px(col, _lebar_px(width))
+
+    baris = TemplatXlsx()
+    baris.merge(0, 0, 0, 1, Nilai("no"), SEL_TENGAH, GARIS)
+    baris.merge(0, 2, 0, 3, Nilai("nama"), SEL_KIRI, GARIS)
+    for c in range(4, TOTAL_EFFECTIVE_COLS):
+        baris.kosong(0, c, GARIS)
+    baris.tinggi(0, 20)
+
+    # Tanda tangan: kolom C (kepala sekolah) dan L (guru)
+    ttd = TemplatXlsx()
+    ttd.tulis(0, 2, "Mengetahui", TEKS_KIRI)
+    ttd.tulis(1, 2, "Kepala Sekolah", TEKS_KIRI)
+    ttd.tulis(0, 11, Isian("Bantul, .................................... {tahun}"), TEKS_KIRI)
+    ttd.tulis(1, 11, Isian("Guru {mapel}"), TEKS_KIRI)
+    ttd.tulis(4, 2, KEPALA_SEKOLAH, TEKS_KIRI)
+    ttd.tulis(4, 11, Nilai("guru"), TEKS_KIRI)
+    ttd.tulis(5, 2, f"NIP. {NIP_KEPSEK}", TEKS_KIRI)
+    ttd.tulis(5, 11, Isian("NIP. {nip_guru}"), TEKS_KIRI)
+    return header, baris, ttd
+
+
+def generate_excel_absensi_panjang(dataframe, mapel, semester, kelas, tahun_pelajaran, guru, nip_guru):
+    buffer = BytesIO()
+    wb = xlsxwriter.Workbook(buffer, {'in_memory': True})
+    ws = wb.add_worksheet(f"Daftar Hadir {kelas}")
+    g = _Gaya(wb)
+    header, baris, ttd = _templat_absensi()
+    _atur_halaman(ws, left=18/25.4, right=0.8/25.4, top=19/25.4, bottom=24/25.4)
+
+    r = header.terapkan(ws, g, mapel=mapel, semester=semester, kelas=kelas, tahun_pelajaran=tahun_pelajaran)
+    baris = baris.ikat(g)
+    for i, row_data in enumerate(dataframe.itertuples(), 1):
+        r = baris.terapkan(ws, r, no=i, nama=_nilai(getattr(row_data, "Nama")))
+
+    ttd.terapkan(ws, g, r + 1, tahun=_tahun_sekarang(), mapel=mapel, guru=guru, nip_guru=nip_guru)
+    return _simpan(wb, buffer)
@@ -0,0 +1,58 @@
+"""Gaya sel openpyxl bersama untuk formulir cetak (Daftar Siswa, Form Nilai, Daftar Hadir)."""
+from typing import Dict, Optional, Sequence
+
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+# Objek gaya dibuat sekali per proses, bukan setiap kali generator dipanggil
+FONT_BOLD_12 = Font(name='Times New Roman', size=12, bold=True)
+FONT_NORMAL_12 = Font(name='Times New Roman', size=12)
+FONT_BOLD_9 = Font(name='Times New Roman', size=9, bold=True)
+FONT_NORMAL_9 = Font(name='Times New Roman', size=9)
+FONT_NORMAL_7 = Font(name='Times New Roman', size=7)
+
+THIN_BORDER = Border(left=Side(style='thin'),
+                     right=Side(style='thin'),
+                     top=Side(style='thin'),
+                     bottom=Side(style='thin'))
+
+CENTER_ALIGN = Alignment(horizontal='center', vertical='center', wrap_text=True)
+LEFT_ALIGN = Alignment(horizontal='left', vertical='center', wrap_text=False)
+LEFT_INDENT_5_ALIGN = Alignment(horizontal='left', vertical='center', indent=5)
+LEFT_INDENT_7_ALIGN = Alignment(horizontal='left', indent=7)
+
+# Gaya sel tabel (font, border, alignment). Nama yang sama dipakai ketiga formulir.
+# Sel hasil merge tidak diberi font, jadi tetap memakai font bawaan workbook.
+TABEL_TENGAH = "Speroba Tabel Tengah"            # No./NIS siswa
+TABEL_KIRI = "Speroba Tabel Kiri"                # Nama siswa
+TABEL_KOSONG_TENGAH = "Speroba Tabel Isian"      # kolom isian nilai/bagian merge rata tengah
+TABEL_GARIS = "Speroba Tabel Garis"              # hanya garis tepi
+
+GAYA_TABEL = {
+    TABEL_TENGAH: (FONT_NORMAL_12, THIN_BORDER, CENTER_ALIGN),
+    TABEL_KIRI: (FONT_NORMAL_12, THIN_BORDER, LEFT_ALIGN),
+    TABEL_KOSONG_TENGAH: (DEFAULT_FONT, THIN_BORDER, CENTER_ALIGN),
+    TABEL_GARIS: (DEFAULT_FONT, THIN_BORDER, Alignment()),
+}
+
+
+def pasang_gaya(wb) -> None:
+    """Daftarkan NamedStyle tabel ke workbook (sekali per workbook, sebelum baris ditulis)."""
+    for nama, (font, border, alignment) in GAYA_TABEL.items():
+        if nama not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=nama, font=font, border=border, alignment=alignment))
+
+
+def tulis_baris(ws, row: int, gaya_kolom: Sequence[str], nilai: Optional[Dict[int, object]] = None,
+                start_col: int = 1) -> None:
+    """
+    Tulis satu baris tabel: nilai (per nomor kolom) lalu NamedStyle untuk setiap kolom sekaligus.
+    Kolom yang ikut merge cukup diberi gaya; nilainya hanya ditulis di sel awal merge.
+    """
+    nilai = nilai or {}
+    for offset, nama_gaya in enumerate(gaya_kolom):
+        col = start_col + offset
+        cell = ws.cell(row=row, column=col)
+        if col in nilai:
+            cell.value = nilai[col]
+        cell.style = nama_gaya
@@ -0,0 +1,144 @@
+"""
+Antrean tugas latar belakang untuk ekspor besar (PDF semua kelas, workbook multi-sheet).
+
+Tugas dijalankan di thread executor terpisah dari thread skrip Streamlit, jadi interaksi widget
+(rerun) tidak mengulang pekerjaan dari awal. Render per kelas di dalam tugas tetap memakai process
+pool speroba.batch (dibatasi POOL_WORKERS per tugas); thread ini hanya mengatur dan menerima progres.
+
+Setiap tugas punya kunci dari semua inputnya (lihat kunci_tugas). Tugas dengan kunci yang sama
+tidak dijalankan dua kali: pengiriman ulang mengembalikan tugas yang sedang antre/berjalan atau
+hasil yang sudah selesai. Hasil disimpan sampai batas jumlah/ukuran, yang tertua dibuang dulu.
+Modul ini tidak bergantung pada Streamlit (registri bersama ada di speroba.jobs_ui).
+"""
+import hashlib
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+ANTRE, BERJALAN, SELESAI, GAGAL = "antre", "berjalan", "selesai", "gagal"
+
+JOB_WORKERS = int(os.environ.get("SPEROBA_JOB_WORKERS", "1"))
+MAKS_HASIL = int(os.environ.get("SPEROBA_JOB_MAKS_HASIL", "16"))
+MAKS_MB = float(os.environ.get("SPEROBA_JOB_MAKS_MB", "512"))
+# Batas worker process pool per tugas (max_workers untuk render_parallel): tugas yang berjalan bersamaan
+# (JOB_WORKERS) berbagi CPU, bukan masing-masing membuat pool seukuran os.cpu_count()
+POOL_WORKERS = int(os.environ.get("SPEROBA_JOB_POOL_WORKERS", "0")) or max(
+    1, (os.cpu_count() or 1) // max(1, JOB_WORKERS)
+)
+
+
+def kunci_tugas(*bagian) -> str:
+    """Kunci dedup dari input tugas (hash file unggahan, pilihan halaman, daftar kelas, ...)."""
+    return hashlib.sha1(repr(bagian).encode("utf-8")).hexdigest()
+
+
+class Job:
+    """Satu tugas ekspor: status, progres (selesai/total), lalu hasil bytes atau pesan error."""
+
+    def __init__(self, kunci: str, label: str):
+        self.kunci = kunci
+        self.label = label
+        self.status = ANTRE
+        self.selesai = 0
+        self.total = 0
+        self.hasil: Optional[bytes] = None
+        self.error: Optional[str] = None
+        self.dibuat = time.time()
+        self.mulai: Optional[float] = None
+        self.beres: Optional[float] = None
+
+    def progress(self, selesai, total):
+        """Callback progress(selesai, total) untuk fungsi render (dipanggil dari thread tugas)."""
+        self.selesai, self.total = selesai, total
+
+    @property
+    def aktif(self) -> bool:
+        return self.status in (ANTRE, BERJALAN)
+
+    @property
+    def durasi(self) -> Optional[float]:
+        if self.mulai is None:
+            return None
+        return (self.beres or time.time()) - self.mulai
+
+    @property
+    def ukuran(self) -> int:
+        return len(self.hasil) if self.hasil is not None else 0
+
+
+class JobRegistry:
+    """
+    Registri tugas + executor. Aman dipakai dari banyak sesi/thread sekaligus.
+    fn yang dikirim dipanggil sebagai fn(*args, progress=job.progress, **kwargs) dan harus mengembalikan bytes.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, maks_hasil: int = MAKS_HASIL, maks_mb: float = MAKS_MB):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="speroba-job")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.maks_hasil = maks_hasil
+        self.maks_bytes = maks_mb * 1024 * 1024
+
+    def submit(self, kunci: str, label: str, fn: Callable[..., bytes], *args, **kwargs) -> Job:
+        """Antrekan tugas; bila kunci sudah ada (antre/berjalan/selesai) tugas lama yang dikembalikan."""
+        with self._lock:
+            job = self._jobs.get(kunci)
+            if job is not None and job.status != GAGAL:
+                self._jobs.move_to_end(kunci)
+                return job
+            # Tugas baru, atau tugas gagal yang dicoba lagi
+            job = Job(kunci, label)
+            self._jobs[kunci] = job
+            self._jobs.move_to_end(kunci)
+        self._executor.submit(self._jalankan, job, fn, args, kwargs)
+        return job
+
+    def _jalankan(self, job: Job, fn, args, kwargs):
+        job.mulai = time.time()
+        job.status = BERJALAN
+        try:
+            job.hasil = fn(*args, progress=job.progress, **kwargs)
+            job.status = SELESAI
+        except Exception as e:  # ditampilkan di halaman; traceback tetap tercatat di log server
+            traceback.print_exc()
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = GAGAL
+        finally:
+            job.beres = time.time()
+            with self._lock:
+                self._pangkas()
+
+    def _pangkas(self):
+        # Buang hasil selesai/gagal yang paling lama tidak diminta sampai di bawah batas;
+        # tugas yang masih antre/berjalan dan hasil terbaru tidak pernah dibuang.
+        def lewat_batas():
+            tersimpan = [j for j in self._jobs.values() if not j.aktif]
+            return len(tersimpan) > self.maks_hasil or sum(j.ukuran for j in tersimpan) > self.maks_bytes
+
+        while lewat_batas():
+            tua = [k for k, j in self._jobs.items() if not j.aktif]
+            if len(tua) <= 1:
+                break
+            del self._jobs[tua[0]]
+
+    def get(self, kunci: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(kunci)
+
+    def daftar(self) -> List[Job]:
+        """Semua tugas yang masih tercatat, terbaru di akhir."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def hapus(self, kunci: str) -> bool:
+        """Lupakan tugas yang sudah selesai/gagal (tugas aktif tidak bisa dihapus)."""
+        with self._lock:
+            job = self._jobs.get(kunci)
+            if job is None or job.aktif:
+                return False
+            del self._jobs[kunci]
+            return True
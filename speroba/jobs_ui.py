@@ -0,0 +1,46 @@
+"""
+Bagian Streamlit dari antrean tugas (speroba.jobs): registri bersama antar sesi di st.cache_resource
+dan panel status per tugas (progres yang diperbarui sendiri, lalu tombol unduh).
+"""
+import streamlit as st
+
+from speroba.jobs import ANTRE, SELESAI, JobRegistry
+
+# Selama tugas berjalan hanya panel progres yang dijalankan ulang, bukan seluruh halaman
+INTERVAL_PROGRES = 1.0
+
+
+@st.cache_resource
+def registry() -> JobRegistry:
+    return JobRegistry()
+
+
+@st.fragment(run_every=INTERVAL_PROGRES)
+def _progres(kunci, satuan):
+    job = registry().get(kunci)
+    if job is None or not job.aktif:
+        # Selesai/gagal: jalankan ulang halaman agar panel berganti ke tombol unduh atau pesan error
+        st.rerun()
+    if job.status == ANTRE:
+        st.progress(0.0, text="Menunggu tugas lain selesai...")
+    else:
+        teks = f"{job.selesai}/{job.total} {satuan} selesai" if job.total else "Menyiapkan..."
+        st.progress(job.selesai / job.total if job.total else 0.0, text=f"{teks} ({job.durasi:.0f} dtk)")
+
+
+def panel_job(kunci, label_unduh, file_name, mime, satuan="kelas"):
+    """
+    Status tugas `kunci` di halaman: progres selama antre/berjalan, tombol unduh bila selesai,
+    pesan error bila gagal. Tidak menampilkan apa pun bila tugas belum pernah dikirim.
+    """
+    job = registry().get(kunci)
+    if job is None:
+        return None
+    if job.aktif:
+        _progres(kunci, satuan)
+    elif job.status == SELESAI:
+        st.download_button(label_unduh, data=job.hasil, file_name=file_name, mime=mime, on_click="ignore")
+        st.caption(f"Selesai dalam {job.durasi:.1f} dtk ({job.ukuran / 1e6:.1f} MB).")
+    else:
+        st.error(f"Gagal membuat berkas: {job.error}")
+    return job
@@ -0,0 +1,55 @@
+"""Indeks kelas: posisi baris per kelas dan per jenjang, dibangun sekali per DataFrame."""
+import re
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+_EMPTY = np.empty(0, dtype=np.intp)
+_ROMAWI = {"VII": "7", "VIII": "8", "IX": "9"}
+
+
+def jenjang_kelas(kelas) -> str:
+    """
+    Jenjang (7/8/9) dari nama kelas: '9A' -> '9', 'IX-B' -> '9', 'VIII A' -> '8'.
+    Bila tidak dikenali, pakai karakter pertama seperti logika prefix lama.
+    """
+    teks = str(kelas).strip().upper()
+    angka = re.match(r"\d+", teks)
+    if angka:
+        return angka.group(0)
+    romawi = re.match(r"(VIII|VII|IX)(?=$|[^A-Z]|[A-Z]$)", teks)
+    if romawi:
+        return _ROMAWI[romawi.group(1)]
+    return teks[:1]
+
+
+class KelasIndex:
+    """
+    Pemetaan Kelas -> posisi baris (groupby indices) plus indeks jenjang.
+    Dibangun sekali; setiap lookup kelas/jenjang hanya akses dict, tanpa scan mask ulang.
+    Posisi berlaku selama urutan baris DataFrame sumber tidak berubah (kolom boleh ditambah/dibuang).
+    """
+
+    def __init__(self, kelas: pd.Series):
+        kunci = kelas.astype(str)
+        self.posisi: Dict[str, np.ndarray] = dict(kunci.groupby(kunci, sort=True).indices)
+        self.kelas: List[str] = sorted(self.posisi)
+        per_jenjang: Dict[str, List[np.ndarray]] = {}
+        for k in self.kelas:
+            per_jenjang.setdefault(jenjang_kelas(k), []).append(self.posisi[k])
+        self.jenjang: Dict[str, np.ndarray] = {
+            j: np.sort(np.concatenate(parts)) for j, parts in per_jenjang.items()
+        }
+
+    def rows(self, kelas) -> np.ndarray:
+        """Posisi baris satu kelas (kosong bila tidak ada)."""
+        return self.posisi.get(str(kelas), _EMPTY)
+
+    def rows_jenjang(self, kelas) -> np.ndarray:
+        """Posisi baris seluruh kelas paralel yang sejenjang dengan `kelas`."""
+        return self.jenjang.get(jenjang_kelas(kelas), _EMPTY)
+
+    def take(self, df: pd.DataFrame, kelas, paralel: bool = False) -> pd.DataFrame:
+        """Potong `df` (urutan baris sama dengan saat indeks dibuat) untuk satu kelas atau satu jenjang."""
+        return df.iloc[self.rows_jenjang(kelas) if paralel else self.rows(kelas)]
@@ -0,0 +1,376 @@
+"""Renderer PDF Laporan Hasil Asesmen (dipakai oleh pages/4_Hasil_Ujian.py).
+
+Modul ini tidak bergantung pada Streamlit sehingga fungsinya bisa dijalankan
+di proses worker (lihat speroba.batch).
+"""
+import io
+
+import pandas as pd
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.lib.colors import blue, black, lightgrey
+
+from speroba import aset
+from speroba.batch import render_parallel, merge_pdfs, zip_files
+from speroba.kelas import KelasIndex
+from speroba.nilai import prepare_report_rows
+
+# Mapping bulan Indonesia
+bulan_id = {
+    "January": "Januari", "February": "Februari", "March": "Maret",
+    "April": "April", "May": "Mei", "June": "Juni",
+    "July": "Juli", "August": "Agustus", "September": "September",
+    "October": "Oktober", "November": "November", "December": "Desember"
+}
+
+# === Mapel per jenjang ===
+# Kelas 7 dan 8 (Seni Budaya)
+MAPEL_KELAS_7_8 = [
+    "Pend. Agama dan Budi Pekerti",
+    "Pendidikan Pancasila",
+    "Bahasa Indonesia",
+    "Matematika",
+    "Ilmu Pengetahuan Alam",
+    "Ilmu Pengetahuan Sosial",
+    "Bahasa Inggris",
+    "PJOK",
+    "Informatika",
+    "Seni Budaya", # Khusus Kelas 7 & 8
+    "Bahasa Jawa"
+]
+
+# Kelas 9 (Prakarya)
+MAPEL_KELAS_9 = [
+    "Pend. Agama dan Budi Pekerti",
+    "Pendidikan Pancasila",
+    "Bahasa Indonesia",
+    "Matematika",
+    "Ilmu Pengetahuan Alam",
+    "Ilmu Pengetahuan Sosial",
+    "Bahasa Inggris",
+    "PJOK",
+    "Informatika",
+    "Prakarya", # Khusus Kelas 9
+    "Bahasa Jawa"
+]
+
+# Gabungan semua mapel (untuk template Excel)
+MAPEL_SEMUA = sorted(set(MAPEL_KELAS_7_8) | set(MAPEL_KELAS_9))
+
+KOLOM_IDENTITAS = ["Kelas", "NIS", "Nama Siswa"]
+
+ASESMEN_OPSI = [
+    "ASESMEN SUMATIF TENGAH SEMESTER GENAP",
+    "ASESMEN SUMATIF AKHIR SEMESTER GANJIL",
+    "ASESMEN SUMATIF TENGAH SEMESTER GANJIL",
+    "ASESMEN SUMATIF AKHIR TAHUN SEMESTER GENAP"
+]
+
+# Nama Form XObject untuk kop, judul, dan tanda tangan (sama untuk semua halaman dalam satu dokumen)
+KOP_FORM = "KopLaporanAsesmen"
+
+# Bagian statis halaman DENGAN MARGIN: kop, judul, dan tanda tangan
+def draw_letterhead(c, sel_asesmen, sel_tahun, sel_tgl_ttd):
+    """Menggambar kop, judul, dan blok tanda tangan. Mengembalikan posisi y untuk identitas siswa."""
+    width, height = A4
+
+    # === PENGATURAN MARGIN ===
+    margin_left   = 30 * mm
+    margin_right  = 20 * mm
+    margin_top    = 20 * mm
+    margin_bottom = 20 * mm
+
+    # Titik awal Y (di dalam margin atas)
+    y = height - margin_top
+
+    # (Optional) logo kiri atas
+    logo_w = 30*mm
+    logo_h = 30*mm
+    logo = aset.gambar_pdf("logo_laporan", logo_w, logo_h)
+    if logo is not None:
+        # Posisikan logo di margin_left
+        x_logo = margin_left - 10*mm
+        # Posisi Y disesuaikan agar naik (penyesuaian dari -10*mm menjadi -5*mm)
+        y_logo = height - margin_top - (-10*mm) - logo_h
+        c.drawImage(logo, x_logo, y_logo, width=logo_w, height=logo_h, preserveAspectRatio=True, mask='auto')
+
+    # KOP sederhana (CentredString tidak dipengaruhi margin kiri/kanan)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawCentredString(width/2, y, "PEMERINTAH KABUPATEN BANTUL")
+    y -= 5*mm
+    c.drawCentredString(width/2, y, "DINAS PENDIDIKAN, KEPEMUDAAN, DAN OLAHRAGA")
+    y -= 5*mm
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(width/2, y, "SMP NEGERI 2 BANGUNTAPAN")
+    y -= 1*mm
+
+    # aksara jawa
+    aksara_w = 100*mm
+    aksara_h = 10*mm
+    x_aksara = (width - aksara_w) / 2
+    y_aksara = y - aksara_h
+    c.drawImage(aset.gambar_pdf("aksara_jawa", aksara_w, aksara_h), x_aksara, y_aksara,
+                width=aksara_w, height=aksara_h, preserveAspectRatio=True, mask='auto')
+    y = y_aksara - 2*mm
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.drawCentredString(width/2, y, "Jalan Karangsari, Banguntapan, Kabupaten Bantul, Yogyakarta 55198 Telp. 382754")
+    y -= 5*mm
+    c.setFont("Helvetica", 10)
+    c.setFillColor(blue)
+    c.drawCentredString(width/2, y, "Website : www.smpn2banguntapan.sch.id Email : smp2banguntapan@yahoo.com")
+    c.setFillColor(black)
+    y -= 3*mm
+
+    # Garis separator (double)
+    c.setLineWidth(1)
+    c.line(margin_left, y, width - margin_right, y)
+    y -= 1.5*mm
+    c.setLineWidth(0.5)
+    c.line(margin_left, y, width - margin_right, y)
+    y -= 10*mm
+
+    # Judul
+    c.setFont("Helvetica-Bold", 12)
+    c.drawCentredString(width/2, y, f"LAPORAN HASIL {sel_asesmen}")
+    y -= 6*mm
+    c.drawCentredString(width/2, y, f"TAHUN PELAJARAN {sel_tahun}")
+    y -= 12*mm
+
+    # tanda tangan
+    # GUNAKAN TANGGAL PILIHAN DARI STREAMLIT (sel_tgl_ttd)
+    ttd_date = sel_tgl_ttd
+    bulan_eng = ttd_date.strftime('%B')
+    tgl = f"{ttd_date.day} {bulan_id[bulan_eng]} {ttd_date.year}"
+
+    # Posisikan tanda tangan berdasarkan margin_right dan margin_bottom
+    x_ttd = width - margin_right - 70*mm
+    y_ttd_start = margin_bottom + 67*mm
+
+    c.setFont("Helvetica", 12)
+    c.drawString(x_ttd, y_ttd_start, f"Banguntapan, {tgl}")
+    y_ttd_start -= 8*mm
+    c.drawString(x_ttd, y_ttd_start, "Mengetahui,")
+    y_ttd_start -= 5*mm
+    c.drawString(x_ttd, y_ttd_start, "Kepala Sekolah,")
+    y_ttd_start -= -1*mm
+    # Tambah gambar tanda tangan
+    c.drawImage(aset.gambar_pdf("ttd_kepsek", 40*mm, 20*mm, pas_rasio=False), x_ttd, y_ttd_start - 22*mm,
+                width=40*mm, height=20*mm, mask="auto")
+
+    # Nama & NIP (tetap ditampilkan)
+    y_ttd_after = y_ttd_start - 25*mm
+    c.drawString(x_ttd, y_ttd_after, "Alina Fiftiyani Nurjannah, M.Pd.")
+    y_ttd_after -= 6*mm
+    c.drawString(x_ttd, y_ttd_after, "NIP 198001052009032006")
+
+    return y
+
+def draw_letterhead_form(c, sel_asesmen, sel_tahun, sel_tgl_ttd):
+    """
+    Kop & tanda tangan direkam sekali per dokumen sebagai Form XObject KOP_FORM; setiap halaman
+    cukup menempelkannya (draw_student_page). Mengembalikan posisi y untuk identitas siswa.
+    """
+    c.beginForm(KOP_FORM)
+    y_kop = draw_letterhead(c, sel_asesmen, sel_tahun, sel_tgl_ttd)
+    c.endForm()
+    return y_kop
+
+# Fungsi gambar halaman siswa DENGAN MARGIN
+# `siswa` adalah satu baris hasil prepare_report_rows (nilai sudah berupa string siap cetak),
+# `y_kop` hasil draw_letterhead_form untuk canvas yang sama
+def draw_student_page(c, siswa, mapel_urut, y_kop):
+    width, height = A4
+
+    # === PENGATURAN MARGIN ===
+    margin_left   = 30 * mm
+    margin_right  = 20 * mm
+
+    # Hitung area kerja
+    content_width  = width - (margin_left + margin_right)
+
+    # Kop & tanda tangan: Form XObject yang sudah direkam sekali per dokumen
+    c.doForm(KOP_FORM)
+    y = y_kop
+
+    # Identitas siswa (titik dua rata)
+    id_margin_left = margin_left + 10*mm
+    label_w = 20*mm
+    colon_x = id_margin_left + label_w
+    value_x = colon_x + 5
+    c.setFont("Helvetica", 12)
+    # Nama
+    c.drawString(id_margin_left, y, "Nama")
+    c.drawString(colon_x, y, ":")
+    c.drawString(value_x, y, " " + siswa["Nama Siswa"])
+    y -= 6*mm
+    # NIS
+    c.drawString(id_margin_left, y, "NIS")
+    c.drawString(colon_x, y, ":")
+    c.drawString(value_x, y, " " + siswa["NIS"])
+    y -= 6*mm
+    # Kelas
+    c.drawString(id_margin_left, y, "Kelas")
+    c.drawString(colon_x, y, ":")
+    c.drawString(value_x, y, " " + siswa["Kelas"])
+    y -= 10*mm
+
+    # TABEL
+    row_height = 7*mm
+    font_size = 11
+    col_no_w = 15*mm
+    col_mapel_w = 90*mm
+    col_nilai_w = 25*mm
+    table_width = col_no_w + col_mapel_w + col_nilai_w
+    # Posisikan tabel di tengah area konten
+    x0 = margin_left + (content_width - table_width) / 2
+    y0 = y
+    nrows = len(mapel_urut) + 2 + 1  # header + mapel + jumlah + rata2
+
+    # header background (gambar dulu)
+    header_y_bottom = y0 - row_height
+    c.setFillColor(lightgrey)
+    c.rect(x0, header_y_bottom, table_width, row_height, stroke=0, fill=1)
+    c.setFillColor(black)
+
+    # gambar grid
+    for r in range(nrows+1):
+        c.setLineWidth(0.5)
+        c.line(x0, y0 - r*row_height, x0 + table_width, y0 - r*row_height)
+    c.line(x0, y0, x0, y0 - nrows*row_height)
+    c.line(x0 + col_no_w, y0, x0 + col_no_w, y0 - nrows*row_height)
+    c.line(x0 + col_no_w + col_mapel_w, y0, x0 + col_no_w + col_mapel_w, y0 - nrows*row_height)
+    c.line(x0 + table_width, y0, x0 + table_width, y0 - nrows*row_height)
+
+    # header teks (vertical center correction)
+    c.setFont("Helvetica-Bold", font_size)
+    header_center = y0 - row_height/2
+    adj_y = header_center - (font_size/3.5)
+    c.drawCentredString(x0 + col_no_w/2, adj_y, "No")
+    c.drawCentredString(x0 + col_no_w + col_mapel_w/2, adj_y, "Mata Pelajaran")
+    c.drawCentredString(x0 + col_no_w + col_mapel_w + col_nilai_w/2, adj_y, "Nilai")
+
+    # isi tabel
+    c.setFont("Helvetica", font_size)
+    y_text = y0 - row_height
+    for i, subj in enumerate(mapel_urut, start=1):
+        cell_middle = y_text - row_height/2
+        adj_y = cell_middle - (font_size/3.5)
+        val_str = siswa["nilai"][i-1]
+        c.drawCentredString(x0 + col_no_w/2, adj_y, str(i))
+        c.drawString(x0 + col_no_w + 2*mm, adj_y, subj)
+        c.drawCentredString(x0 + col_no_w + col_mapel_w + col_nilai_w/2, adj_y, val_str)
+        y_text -= row_height
+
+    # Jumlah & Rata-rata (rata kiri teks label)
+    cell_middle = y_text - row_height/2
+    adj_y = cell_middle - (font_size/3.5)
+    c.setFont("Helvetica-Bold", font_size)
+    c.drawString(x0 + col_no_w + 2*mm, adj_y, "Jumlah")
+    c.drawCentredString(x0 + col_no_w + col_mapel_w + col_nilai_w/2, adj_y, siswa["jumlah"])
+    y_text -= row_height
+
+    cell_middle = y_text - row_height/2
+    adj_y = cell_middle - (font_size/3.5)
+    c.drawString(x0 + col_no_w + 2*mm, adj_y, "Rata-rata")
+    c.drawCentredString(x0 + col_no_w + col_mapel_w + col_nilai_w/2, adj_y, siswa["rata2"])
+    y_text -= row_height
+
+# === Template Excel ===
+def generate_template(mapel=MAPEL_SEMUA):
+    """Workbook kosong (sheet "Nilai") berkolom identitas + mapel, untuk diisi guru lalu diunggah."""
+    df_template = pd.DataFrame(columns=KOLOM_IDENTITAS + list(mapel))
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        df_template.to_excel(writer, index=False, sheet_name="Nilai")
+    buffer.seek(0)
+    return buffer
+
+# PDF generator
+def make_pdf_for_student(row, mapel_urut, sel_asesmen, sel_tahun, sel_tgl_ttd):
+    buffer = io.BytesIO()
+    with aset.pdf_biner():
+        c = canvas.Canvas(buffer, pagesize=A4)
+        y_kop = draw_letterhead_form(c, sel_asesmen, sel_tahun, sel_tgl_ttd)
+        siswa = prepare_report_rows(pd.DataFrame([row]), mapel_urut)[0]
+        draw_student_page(c, siswa, mapel_urut, y_kop)
+        c.showPage()
+        c.save()
+    buffer.seek(0)
+    return buffer
+
+def make_pdf_for_class(df_kelas, mapel_urut, sel_asesmen, sel_tahun, sel_tgl_ttd):
+    buffer = io.BytesIO()
+    with aset.pdf_biner():
+        c = canvas.Canvas(buffer, pagesize=A4)
+        y_kop = draw_letterhead_form(c, sel_asesmen, sel_tahun, sel_tgl_ttd)
+        for siswa in prepare_report_rows(df_kelas, mapel_urut):
+            draw_student_page(c, siswa, mapel_urut, y_kop)
+            c.showPage()
+        c.save()
+    buffer.seek(0)
+    return buffer
+
+def mapel_for_kelas(kelas, columns, mapel_kelas_7_8=MAPEL_KELAS_7_8, mapel_kelas_9=MAPEL_KELAS_9):
+    """Mapel kelas 9 (IX/9...) atau kelas 7/8, hanya yang ada di `columns`, sesuai urutan rapor."""
+    kelas_upper = str(kelas).upper().strip()
+    if kelas_upper.startswith("IX") or kelas_upper.startswith("9"):
+        return [m for m in mapel_kelas_9 if m in columns]
+    return [m for m in mapel_kelas_7_8 if m in columns]
+
+# Tambahan: fungsi untuk semua kelas paralel (jika ingin semua kelas di file)
+def make_pdf_for_all_classes(df_all, kelas_list_all, mapel_kelas_7_8, mapel_kelas_9, sel_asesmen, sel_tahun, sel_tgl_ttd):
+    buffer = io.BytesIO()
+    with aset.pdf_biner():
+        c = canvas.Canvas(buffer, pagesize=A4)
+        y_kop = draw_letterhead_form(c, sel_asesmen, sel_tahun, sel_tgl_ttd)
+        index = KelasIndex(df_all["Kelas"])
+        for kelas in kelas_list_all:
+            mapel_u = mapel_for_kelas(kelas, df_all.columns, mapel_kelas_7_8, mapel_kelas_9)
+            df_sel = index.take(df_all, kelas)
+            for siswa in prepare_report_rows(df_sel, mapel_u):
+                draw_student_page(c, siswa, mapel_u, y_kop)
+                c.showPage()
+        c.save()
+    buffer.seek(0)
+    return buffer
+
+def _render_class_chunk(df_sel, mapel_u, sel_asesmen, sel_tahun, sel_tgl_ttd):
+    """Worker: render satu kelas menjadi bytes PDF."""
+    return make_pdf_for_class(df_sel, mapel_u, sel_asesmen, sel_tahun, sel_tgl_ttd).getvalue()
+
+def pdf_per_kelas(df_all, kelas_list_all, mapel_kelas_7_8, mapel_kelas_9, sel_asesmen, sel_tahun, sel_tgl_ttd,
+                  max_workers=None, progress=None):
+    """Render setiap kelas di process pool (satu tugas per kelas) menjadi [(kelas, bytes PDF)].
+
+    Kelas tanpa siswa dilewati. progress(selesai, total) dipanggil setiap satu kelas selesai.
+    """
+    jobs = []
+    index = KelasIndex(df_all["Kelas"])
+    for kelas in kelas_list_all:
+        df_sel = index.take(df_all, kelas)
+        if df_sel.empty:
+            continue
+        mapel_u = mapel_for_kelas(kelas, df_all.columns, mapel_kelas_7_8, mapel_kelas_9)
+        jobs.append((str(kelas), (df_sel, mapel_u, sel_asesmen, sel_tahun, sel_tgl_ttd)))
+
+    parts = render_parallel(_render_class_chunk, [args for _, args in jobs], max_workers=max_workers, progress=progress)
+    return [(kelas, part) for (kelas, _), part in zip(jobs, parts)]
+
+def nama_file_laporan_asesmen(kelas):
+    return f"Laporan_{kelas}.pdf"
+
+def make_pdf_for_all_classes_parallel(df_all, kelas_list_all, mapel_kelas_7_8, mapel_kelas_9,
+                                      sel_asesmen, sel_tahun, sel_tgl_ttd, as_zip=False, max_workers=None,
+                                      progress=None):
+    """Render semua kelas lewat pdf_per_kelas.
+
+    Hasil digabung sesuai urutan kelas menjadi satu PDF, atau dikemas
+    sebagai ZIP berisi satu PDF per kelas jika as_zip=True.
+    """
+    hasil = pdf_per_kelas(df_all, kelas_list_all, mapel_kelas_7_8, mapel_kelas_9, sel_asesmen, sel_tahun,
+                          sel_tgl_ttd, max_workers=max_workers, progress=progress)
+    if as_zip:
+        return zip_files([(nama_file_laporan_asesmen(kelas), part) for kelas, part in hasil])
+    return merge_pdfs([part for _, part in hasil])
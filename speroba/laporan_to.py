@@ -0,0 +1,320 @@
+"""Renderer PDF Laporan Hasil Persiapan dan Pemantapan TKA/TKAD (dipakai oleh pages/5_Hasil_TO.py).
+
+Seluruh isi tabel satu kelas (string nilai, jumlah, rata-rata, peringkat) disiapkan dulu
+secara vektor; menggambar halaman tinggal memanggil canvas. Modul ini tidak bergantung
+pada Streamlit.
+"""
+import io
+
+import numpy as np
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.colors import blue, black, lightgrey
+from reportlab.pdfgen import canvas
+
+from speroba import aset
+from speroba.batch import render_parallel, merge_pdfs, zip_files
+from speroba.kelas import KelasIndex
+from speroba.laporan_asesmen import bulan_id
+from speroba.peringkat_tkad import JUMLAH_SESI, blok_tkad
+
+MAPEL_TO = ["Bahasa Indonesia", "Matematika", "Bahasa Inggris", "Ilmu Pengetahuan Alam"]
+
+ASESMEN_TO = [
+    "TKA/TKAD Dikpora Kab Bantul 1", "TKA/TKAD MKKS SMP Kab Bantul 1",
+    "TKA/TKAD MKKS SMP Kab Bantul 2", "TKA/TKAD Forum MKKS SMP D.I.Yogyakarta",
+    "TKA/TKAD Dikpora Kab Bantul 2"
+]
+
+TGL_KEGIATAN_TO = [
+    "Tanggal 20 - 23 Oktober 2025", "Tanggal 3 - 6 November 2025",
+    "Tanggal 19 - 22 Januari 2026", "Tanggal 2 - 5 Februari 2026", "Tanggal 9 - 12 Maret 2026"
+]
+
+# Nama Form XObject untuk bagian statis halaman (sama untuk semua siswa dalam satu dokumen)
+TEMPLATE_FORM = "TemplateLaporanTO"
+
+# Tata letak tabel (dipakai kerangka template dan isi per siswa)
+ML, MR, MT = 30*mm, 15*mm, 25*mm
+ROW_H, COL_NO, COL_M, COL_S = 7*mm, 12*mm, 65*mm, 17*mm
+TW = COL_NO + COL_M + (COL_S * JUMLAH_SESI)
+XS = ML + ((A4[0] - ML - MR) - TW)/2
+# Titik tengah kolom nilai sesi 1..5
+X_SESI = [XS+COL_NO+COL_M+(j*COL_S)+COL_S/2 for j in range(JUMLAH_SESI)]
+
+
+def format_nilai(values):
+    """
+    Versi vektor dari format_val lama: NaN -> '', bilangan bulat tanpa desimal, selain itu 2 desimal.
+    """
+    values = np.asarray(values, dtype="float64")
+    out = np.empty(values.shape, dtype=object)
+    kosong = np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        bulat = ~kosong & (values % 1 == 0)
+    pecahan = ~kosong & ~bulat
+    out[kosong] = ""
+    out[bulat] = [str(int(v)) for v in values[bulat]]
+    out[pecahan] = [f"{v:.2f}" for v in values[pecahan]]
+    return out
+
+
+def prepare_to_rows(df_kelas, mapel_urut=MAPEL_TO):
+    """Hitung seluruh isi laporan TO untuk sekelompok siswa sekaligus.
+
+    Mengembalikan list dict per siswa: teks identitas, string nilai per mapel x sesi,
+    serta string Jumlah, Rata-rata, dan Peringkat per sesi. Nilai yang bukan angka dianggap kosong.
+    """
+    n = len(df_kelas)
+    blok = blok_tkad(df_kelas, mapel_urut)  # (siswa, sesi, mapel)
+    ada = ~np.isnan(blok)
+    count = ada.sum(axis=2)
+    # Dijumlahkan berurutan per mapel (sama dengan sum() atas list nilai per sesi)
+    jumlah = np.zeros((n, JUMLAH_SESI))
+    for k in range(len(mapel_urut)):
+        jumlah += np.where(ada[:, :, k], blok[:, :, k], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rata2 = jumlah / count
+    jumlah[count == 0] = np.nan
+    peringkat = np.column_stack([
+        df_kelas[f"Peringkat_TKAD{j+1}"].to_numpy(dtype="float64") if f"Peringkat_TKAD{j+1}" in df_kelas.columns
+        else np.full(n, np.nan)
+        for j in range(JUMLAH_SESI)
+    ])
+
+    nilai_str = format_nilai(blok.transpose(0, 2, 1))  # (siswa, mapel, sesi) = urutan baris tabel
+    footer_str = format_nilai(np.stack([jumlah, rata2, peringkat], axis=1))  # (siswa, 3, sesi)
+
+    identitas = {
+        k: [f": {v}" for v in df_kelas[k].tolist()] if k in df_kelas.columns else [": "] * n
+        for k in ["Nama Siswa", "NIS", "Kelas"]
+    }
+    return [
+        {
+            "identitas": [identitas["Nama Siswa"][i], identitas["NIS"][i], identitas["Kelas"][i]],
+            "nilai": nilai_str[i],
+            "footer": footer_str[i],
+        }
+        for i in range(n)
+    ]
+
+
+def draw_page_template(c, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd, mapel_urut=MAPEL_TO):
+    """Menggambar bagian statis halaman: kop, judul, kerangka tabel, keterangan, dan tanda tangan.
+    Mengembalikan posisi y untuk identitas siswa dan posisi y atas tabel."""
+    width, height = A4
+    ml, mr, mt = ML, MR, MT
+    y = height - mt
+
+    # --- 1. KOP SURAT ---
+    c.drawImage(aset.gambar_pdf("logo_kiri", 28*mm, 28*mm), ml - 10*mm, y - 18*mm, width=28*mm, height=28*mm,
+                preserveAspectRatio=True, mask='auto')
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawCentredString(width/2, y, "PEMERINTAH KABUPATEN BANTUL")
+    y -= 5*mm
+    c.drawCentredString(width/2, y, "DINAS PENDIDIKAN, KEPEMUDAAN, DAN OLAHRAGA")
+    y -= 5*mm
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(width/2, y, "SMP NEGERI 2 BANGUNTAPAN")
+    y -= 1*mm
+
+    # Aksara Jawa (Tetap Ukuran Besar)
+    c.drawImage(aset.gambar_pdf("aksara_jawa", 125*mm, 12*mm), (width-125*mm)/2, y - 13*mm, width=125*mm, height=12*mm,
+                preserveAspectRatio=True, mask='auto')
+    y -= 14*mm
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.drawCentredString(width/2, y, "Jalan Karangsari, Banguntapan, Bantul, Yogyakarta 55198 Telp. 382754")
+    y -= 5*mm
+    c.setFont("Helvetica", 10); c.setFillColor(blue)
+    c.drawCentredString(width/2, y, "Website : www.smpn2banguntapan.sch.id Email : smp2banguntapan@yahoo.com")
+    c.setFillColor(black); y -= 3*mm
+
+    c.setLineWidth(1.2); c.line(ml, y, width-mr, y)
+    y -= 10*mm
+
+    # --- 2. JUDUL ---
+    c.setFont("Helvetica-Bold", 11)
+    c.drawCentredString(width/2, y, "LAPORAN HASIL PERSIAPAN DAN PEMANTAPAN")
+    y -= 6*mm
+    c.drawCentredString(width/2, y, sel_asesmen.upper())
+    y -= 6*mm
+    c.drawCentredString(width/2, y, f"TAHUN PELAJARAN {sel_tahun}")
+    y -= 6*mm
+    c.drawCentredString(width/2, y, sel_tgl_kegiatan)
+    y -= 12*mm
+
+    # --- 3. IDENTITAS (diisi per siswa di draw_student_page) ---
+    y_identitas = y
+    y -= 3 * 6*mm
+    y -= 5*mm
+
+    # --- 4. TABEL (kerangka saja) ---
+    row_h, col_no, col_m, col_s, tw, xs = ROW_H, COL_NO, COL_M, COL_S, TW, XS
+
+    # Background Header
+    c.setFillColor(lightgrey); c.rect(xs, y-2*row_h, tw, 2*row_h, fill=1); c.setFillColor(black)
+
+    c.setFont("Helvetica-Bold", 10)
+    c.drawCentredString(xs+col_no/2, y-row_h-2*mm, "No")
+    c.drawCentredString(xs+col_no+col_m/2, y-row_h-2*mm, "Mata Pelajaran")
+    c.drawCentredString(xs+col_no+col_m+(col_s*5)/2, y-row_h/2-2*mm, "Nilai TKA/TKAD")
+    for i in range(5):
+        c.drawCentredString(xs+col_no+col_m+(i*col_s)+col_s/2, y-1.5*row_h-2*mm, str(i+1))
+
+    # Label baris mapel
+    y_row = y - 2*row_h
+    c.setFont("Helvetica", 10)
+    for i, m in enumerate(mapel_urut, 1):
+        c.drawCentredString(xs+col_no/2, y_row-row_h/2-2*mm, str(i))
+        c.drawString(xs+col_no+2*mm, y_row-row_h/2-2*mm, m)
+        y_row -= row_h
+
+    # Label footer
+    c.setFont("Helvetica-Bold", 10)
+    for lbl in ["Jumlah", "Rata-rata", "Peringkat Kelas ke -"]:
+        c.drawString(xs+col_no+2*mm, y_row-row_h/2-2*mm, lbl)
+        y_row -= row_h
+
+    # --- GRID TABEL (Garis Tengah Header Tetap Muncul) ---
+    c.setLineWidth(0.5)
+    num_grid_rows = len(mapel_urut) + 2 + 3
+    for i in range(num_grid_rows + 1):
+        if i == 1:
+            c.line(xs+col_no+col_m, y-row_h, xs+tw, y-row_h)
+        else:
+            c.line(xs, y - i*row_h, xs + tw, y - i*row_h)
+
+    c.line(xs, y, xs, y_row)
+    c.line(xs+col_no, y, xs+col_no, y_row)
+    c.line(xs+col_no+col_m, y, xs+col_no+col_m, y_row)
+    for i in range(1, 6):
+        c.line(xs+col_no+col_m+i*col_s, y-row_h, xs+col_no+col_m+i*col_s, y_row)
+    c.line(xs+tw, y, xs+tw, y_row)
+
+    # --- 5. KETERANGAN ---
+    y_ket = y_row - 8*mm
+    c.setFont("Helvetica-Bold", 9); c.drawString(ml, y_ket, "Keterangan:")
+    c.setFont("Helvetica", 8)
+    for i, item in enumerate(ASESMEN_TO, 1):
+        y_ket -= 4*mm
+        tgl_item = TGL_KEGIATAN_TO[i-1] if i-1 < len(TGL_KEGIATAN_TO) else "-"
+        c.drawString(ml+5*mm, y_ket, f"{i}. {item} ({tgl_item})")
+
+    # --- 6. TANDA TANGAN & NIP ---
+    y_sign = y_ket - 10*mm
+    tgl_str = f"{sel_tgl_ttd.day} {bulan_id[sel_tgl_ttd.strftime('%B')]} {sel_tgl_ttd.year}"
+    x_ttd = width - mr - 65*mm
+
+    c.setFont("Helvetica", 10)
+    c.drawString(x_ttd, y_sign, f"Banguntapan, {tgl_str}")
+    y_sign -= 5*mm
+    c.drawString(x_ttd, y_sign, "Mengetahui,")
+    y_sign -= 5*mm
+    c.drawString(x_ttd, y_sign, "Kepala Sekolah,")
+
+    # Gambar Tanda Tangan
+    c.drawImage(aset.gambar_pdf("ttd_kepsek", 35*mm, 15*mm, pas_rasio=False), x_ttd, y_sign - 18*mm,
+                width=35*mm, height=15*mm, mask='auto')
+
+    # Nama & NIP
+    y_name = y_sign - 25*mm
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(x_ttd, y_name, "Alina Fiftiyani Nurjannah, M.Pd.")
+    y_name -= 5*mm
+    c.setFont("Helvetica", 10)
+    c.drawString(x_ttd, y_name, "NIP 198001052009032006")
+
+    return y_identitas, y
+
+def draw_template_form(c, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd, mapel_urut=MAPEL_TO):
+    """
+    Bagian statis halaman direkam sekali per dokumen sebagai Form XObject TEMPLATE_FORM; setiap halaman
+    cukup menempelkannya (draw_student_page). Mengembalikan (y identitas, y atas tabel).
+    """
+    c.beginForm(TEMPLATE_FORM)
+    posisi = draw_page_template(c, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd, mapel_urut)
+    c.endForm()
+    return posisi
+
+# `siswa` adalah satu baris hasil prepare_to_rows (semua isi sel sudah berupa string siap cetak),
+# `posisi` hasil draw_template_form untuk canvas yang sama
+def draw_student_page(c, siswa, posisi):
+    # Template statis: Form XObject yang sudah direkam sekali per dokumen
+    c.doForm(TEMPLATE_FORM)
+    y, y_tabel = posisi
+
+    # --- 3. IDENTITAS ---
+    c.setFont("Helvetica-Bold", 10)
+    for lbl, teks in zip(("Nama", "NIS", "Kelas"), siswa["identitas"]):
+        c.drawString(ML+10*mm, y, lbl)
+        c.drawString(ML+35*mm, y, teks)
+        y -= 6*mm
+
+    # --- 4. ISI TABEL ---
+    y_row = y_tabel - 2*ROW_H
+    c.setFont("Helvetica", 10)
+    for baris in siswa["nilai"]:
+        y_teks = y_row-ROW_H/2-2*mm
+        for x, teks in zip(X_SESI, baris):
+            c.drawCentredString(x, y_teks, teks)
+        y_row -= ROW_H
+
+    # Footer: Jumlah, Rata-rata, Peringkat
+    c.setFont("Helvetica-Bold", 10)
+    for baris in siswa["footer"]:
+        y_teks = y_row-ROW_H/2-2*mm
+        for x, teks in zip(X_SESI, baris):
+            c.drawCentredString(x, y_teks, teks)
+        y_row -= ROW_H
+
+def make_pdf(data_rows, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd, mapel_urut=MAPEL_TO):
+    """PDF satu halaman per siswa untuk baris `data_rows` (sudah berisi kolom Peringkat_TKAD{i})."""
+    buf = io.BytesIO()
+    with aset.pdf_biner():
+        c = canvas.Canvas(buf, pagesize=A4)
+        posisi = draw_template_form(c, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd, mapel_urut)
+        for siswa in prepare_to_rows(data_rows, mapel_urut):
+            draw_student_page(c, siswa, posisi)
+            c.showPage()
+        c.save()
+    buf.seek(0)
+    return buf
+
+def _render_class_chunk(df_sel, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd):
+    """Worker: render satu kelas menjadi bytes PDF."""
+    return make_pdf(df_sel, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd).getvalue()
+
+def pdf_per_kelas(df_all, kelas_list_all, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd,
+                  max_workers=None, progress=None):
+    """Render setiap kelas di process pool (satu tugas per kelas) menjadi [(kelas, bytes PDF)].
+
+    `df_all` sudah berisi kolom Peringkat_TKAD{i}; kelas tanpa siswa dilewati.
+    progress(selesai, total) dipanggil setiap satu kelas selesai.
+    """
+    jobs = []
+    index = KelasIndex(df_all["Kelas"])
+    for kelas in kelas_list_all:
+        df_sel = index.take(df_all, kelas)
+        if df_sel.empty:
+            continue
+        jobs.append((str(kelas), (df_sel, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd)))
+
+    parts = render_parallel(_render_class_chunk, [args for _, args in jobs], max_workers=max_workers, progress=progress)
+    return [(kelas, part) for (kelas, _), part in zip(jobs, parts)]
+
+def nama_file_laporan_to(kelas):
+    return f"Laporan_Kelas_{kelas}.pdf"
+
+def make_pdf_for_all_classes_parallel(df_all, kelas_list_all, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd,
+                                      as_zip=False, max_workers=None, progress=None):
+    """Render banyak kelas (satu jenjang atau satu sekolah) lewat pdf_per_kelas.
+
+    Hasil digabung sesuai urutan kelas menjadi satu PDF, atau ZIP berisi satu PDF per kelas jika as_zip=True.
+    """
+    hasil = pdf_per_kelas(df_all, kelas_list_all, sel_asesmen, sel_tahun, sel_tgl_kegiatan, sel_tgl_ttd,
+                          max_workers=max_workers, progress=progress)
+    if as_zip:
+        return zip_files([(nama_file_laporan_to(kelas), part) for kelas, part in hasil])
+    return merge_pdfs([part for _, part in hasil])
@@ -0,0 +1,76 @@
+"""Normalisasi dan format nilai secara vektor (satu kali untuk seluruh tabel)."""
+import numpy as np
+import pandas as pd
+
+
+def normalize_scores(df, columns):
+    """Bersihkan semua kolom nilai sekaligus menjadi blok float64.
+
+    Aturan pembersihan sama dengan versi per kolom sebelumnya: koma menjadi
+    titik, karakter selain angka/titik/minus dibuang, string kosong menjadi
+    NaN, lalu pd.to_numeric(errors="coerce").
+
+    Mengembalikan (scores, invalid): scores adalah DataFrame float64 dengan
+    index & kolom yang sama, invalid adalah mask sel yang terisi tetapi
+    tidak bisa dibaca sebagai angka.
+    """
+    raw = df[columns].to_numpy(dtype=object)
+    flat = pd.Series(raw.ravel())
+    cleaned = (
+        flat.astype(str)
+        .str.replace(",", ".", regex=False)
+        .str.replace(r"[^0-9.\-]", "", regex=True)
+        .str.strip()
+    )
+    values = pd.to_numeric(cleaned.where(cleaned != ""), errors="coerce").to_numpy(dtype="float64")
+    values = values.reshape(raw.shape)
+
+    filled = ~(flat.isna() | (flat.astype(str).str.strip() == "")).to_numpy().reshape(raw.shape)
+    scores = pd.DataFrame(values, index=df.index, columns=columns)
+    invalid = pd.DataFrame(filled & np.isnan(values), index=df.index, columns=columns)
+    return scores, invalid
+
+
+def format_scores(values):
+    """Format array nilai menjadi string 2 desimal; NaN menjadi ''."""
+    values = np.asarray(values, dtype="float64")
+    out = np.char.mod("%.2f", np.nan_to_num(values)).astype(object)
+    out[np.isnan(values)] = ""
+    return out
+
+
+def prepare_report_rows(df_kelas, mapel_urut):
+    """Hitung seluruh isi tabel laporan untuk satu kelas sekaligus.
+
+    Nilai mapel harus sudah dinormalisasi (lihat normalize_scores).
+    Mengembalikan list dict per siswa berisi identitas, string nilai per
+    mapel, serta string Jumlah dan Rata-rata.
+    """
+    block = df_kelas.reindex(columns=mapel_urut).to_numpy(dtype="float64")
+    count = (~np.isnan(block)).sum(axis=1)
+    filled = np.where(np.isnan(block), 0.0, block)
+    # Dijumlahkan per baris 1-D (urutan penjumlahan sama dengan Series.sum),
+    # karena reduksi axis=1 bisa berbeda di digit terakhir dan menggeser pembulatan 2 desimal.
+    jumlah = np.array([r.sum() for r in filled], dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rata2 = np.where(count > 0, jumlah / count, 0.0)
+
+    nilai_str = format_scores(block)
+    jumlah_str = format_scores(jumlah)
+    rata2_str = format_scores(rata2)
+
+    identitas = {
+        k: [str(v) for v in df_kelas[k]] if k in df_kelas.columns else [""] * len(df_kelas)
+        for k in ["Nama Siswa", "NIS", "Kelas"]
+    }
+    return [
+        {
+            "Nama Siswa": identitas["Nama Siswa"][i],
+            "NIS": identitas["NIS"][i],
+            "Kelas": identitas["Kelas"][i],
+            "nilai": list(nilai_str[i]),
+            "jumlah": jumlah_str[i],
+            "rata2": rata2_str[i],
+        }
+        for i in range(len(df_kelas))
+    ]
@@ -0,0 +1,619 @@
+"""
+Olah Nilai Rapor (pages/6_Olah_Nilai_TP.py) tanpa Streamlit: data siswa, perhitungan NR/TK/deskripsi,
+frame editor, serta ekspor Excel Form Nilai dan Laporan TK. Semua parameter eksplisit sehingga bisa
+dipanggil dari proses worker, CLI, atau benchmark.
+"""
+import functools
+import hashlib
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from speroba.roster import DEFAULT_ROSTER_PATH, load_roster, normalize_roster
+from speroba.templat_excel import Isian, TemplatXlsx
+
+# =========================================================
+# KONFIGURASI DAN DATA SISWA
+# =========================================================
+
+# Kolom-kolom nilai yang akan diinput/dihitung
+SCORE_COLUMNS = ['TP1', 'TP2', 'TP3', 'TP4', 'TP5', 'LM_1', 'LM_2', 'LM_3', 'LM_4', 'LM_5', 'PTS', 'SAS', 'NR']
+INPUT_SCORE_COLS = [c for c in SCORE_COLUMNS if c != 'NR']
+
+# Peta untuk nama tampilan kolom
+COLUMN_DISPLAY_MAP = {
+    'TP1': 'TP-1', 'TP2': 'TP-2', 'TP3': 'TP-3', 'TP4': 'TP-4', 'TP5': 'TP-5',
+    'LM_1': 'LM-1', 'LM_2': 'LM-2', 'LM_3': 'LM-3', 'LM_4': 'LM-4', 'LM_5': 'LM-5',
+    'PTS': 'PTS', 'SAS': 'SAS/SAT', 'NR': 'NR',
+    'Avg_TP': 'Rata-rata TP',
+    'Avg_LM': 'Rata-rata LM',
+    'Avg_PSA': 'Rata-rata PSA',
+    'Deskripsi_NR': 'Deskripsi Rapor'
+}
+# Threshold KKM/Batas Ketuntasan untuk menentukan Tingkat Ketercapaian (TK)
+KKM = 80
+
+REQUIRED_COLS = ['NIS', 'Nama', 'Kelas']
+
+def data_siswa_dummy() -> pd.DataFrame:
+    """Membuat DataFrame dummy untuk semua siswa (sebagai fallback)."""
+    data = {
+        'NIS': [1001, 1002, 1003, 1004, 1005, 1006, 1007, 1008],
+        'Nama': ['Budi Santoso', 'Citra Dewi', 'Doni Pratama', 'Eka Fitriani', 'Fajar Nur', 'Gita Cahyani', 'Hendra Wijaya', 'Irma Suryani'],
+        'Kelas': ['7A', '7A', '7A', '7A', '7B', '7B', '7C', '7C'],
+    }
+    df = pd.DataFrame(data)
+    # Inisialisasi kolom nilai input dengan angka acak yang realistis (sekarang FLOAT)
+    for col in INPUT_SCORE_COLS:
+        df[col] = np.random.uniform(65.0, 95.0, size=len(df)).round(1)
+    df['NR'] = 0 # Initialize NR as integer (hasil akhir)
+    df['NIS'] = df['NIS'].astype(str) # Pastikan NIS adalah string
+    return df
+
+def prepare_score_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Salinan roster ternormalisasi yang dilengkapi kolom nilai input (FLOAT, kosong = 0.0)."""
+    df = df.copy()
+    for col in INPUT_SCORE_COLS:
+        if col not in df.columns:
+            df[col] = 0.0
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+    return df.drop(columns=['Nilai Rata-rata'], errors='ignore')
+
+def load_base_student_data(path: str = DEFAULT_ROSTER_PATH) -> Optional[pd.DataFrame]:
+    """
+    Data siswa dari roster bersama (daftar_siswa.csv) beserta kolom nilai, atau None bila file tidak ada
+    atau kolom wajib tidak lengkap. Roster sudah di-cache per proses; yang ditambah kolom nilai adalah salinannya.
+    """
+    roster = load_roster(path)
+    if roster is None or not all(col in roster.df.columns for col in REQUIRED_COLS):
+        return None
+    return prepare_score_frame(roster.df)
+
+def read_student_csv(file) -> Optional[pd.DataFrame]:
+    """CSV siswa unggahan (path atau file-like) siap diolah, atau None bila kolom NIS/Nama/Kelas tidak lengkap."""
+    df = normalize_roster(pd.read_csv(file, dtype={'NIS': str, 'Kelas': str}))
+    if not all(col in df.columns for col in REQUIRED_COLS):
+        return None
+    return prepare_score_frame(df)
+
+# =========================================================
+# FUNGSI PERHITUNGAN DAN DESKRIPSI
+# =========================================================
+
+def calculate_nr(df_input: pd.DataFrame) -> pd.DataFrame:
+    """
+    Menghitung Nilai Rapor (NR) dan nilai perantara (Avg_TP, Avg_LM, Avg_PSA).
+    """
+    df = df_input.copy()
+
+    # 1. Hitung Rata-rata TP
+    tp_cols = [c for c in df.columns if c.startswith('TP') and len(c) == 3]
+    df['Avg_TP'] = df[tp_cols].replace(0.0, np.nan).mean(axis=1).round(2)
+
+    # 2. Hitung Rata-rata LM
+    lm_cols = [c for c in df.columns if c.startswith('LM_') and len(c) == 4]
+    df['Avg_LM'] = df[lm_cols].replace(0.0, np.nan).mean(axis=1).round(2)
+
+    # 3. Hitung Rata-rata Penilaian Sumatif Akhir (PSA)
+    df['Avg_PSA'] = np.where(
+        (df['PTS'] + df['SAS']) > 0.0,
+        (df['PTS'] + df['SAS']) / 2,
+        0.0
+    ).round(2)
+
+    # 4. Hitung NR (Nilai Rapor): bobot TP=1, LM=2, PSA=1, hanya komponen yang terisi (> 0) yang dihitung
+    avg_tp = df['Avg_TP'].to_numpy(dtype='float64')
+    avg_lm = df['Avg_LM'].to_numpy(dtype='float64')
+    avg_psa = df['Avg_PSA'].to_numpy(dtype='float64')
+    sum_components = np.nan_to_num(avg_tp) * 1 + np.nan_to_num(avg_lm) * 2 + np.nan_to_num(avg_psa) * 1
+    # NaN > 0 bernilai False, jadi komponen kosong otomatis tidak dihitung
+    count_components = (avg_tp > 0.0) * 1 + (avg_lm > 0.0) * 2 + (avg_psa > 0.0) * 1
+
+    nr_float = np.divide(sum_components, count_components,
+                         out=np.zeros_like(sum_components), where=count_components > 0)
+    nr_float = np.where(avg_psa > 0.0, nr_float, 0.0)
+    df['NR'] = np.round(nr_float, 0).astype(int)
+
+    return df
+
+def calculate_tk_status(df_input: pd.DataFrame) -> pd.DataFrame:
+    """Menentukan Status TP1–TP5 (T/R) termasuk validasi tambahan."""
+    df = df_input.copy()
+    tp_cols = ['TP1', 'TP2', 'TP3', 'TP4', 'TP5']
+    tk_cols = [f'TK_{tp}' for tp in tp_cols]
+    threshold = float(KKM)
+
+    scores = df[tp_cols].to_numpy(dtype='float64')
+    # TP dianggap terisi jika > 0 (NaN dan 0 = belum diisi)
+    filled = scores > 0.0
+    tuntas = scores >= threshold
+    status = np.where(filled, np.where(tuntas, "T", "R"), "").astype(object)
+
+    # Validasi: jika minimal 2 TP terisi dan semuanya T, TP dengan nilai terkecil menjadi R
+    # (argmin mengambil TP pertama jika ada nilai terkecil yang sama)
+    all_t = (filled.sum(axis=1) >= 2) & np.all(tuntas | ~filled, axis=1)
+    smallest_tp = np.argmin(np.where(filled, scores, np.inf), axis=1)
+    rows = np.flatnonzero(all_t)
+    status[rows, smallest_tp[rows]] = 'R'
+
+    for j, tk in enumerate(tk_cols):
+        df[tk] = status[:, j]
+
+    return df
+
+def _format_remidi_description(remidi_tps: List[int]) -> str:
+    tp_list = [f"TP-{i}" for i in remidi_tps]
+    if len(tp_list) > 1:
+        tp_list_str = f"{', '.join(tp_list[:-1])}, dan {tp_list[-1]}"
+    else:
+        tp_list_str = tp_list[0]
+    return f"Ananda perlu meningkatkan pemahaman dan penguasaan pada materi di {tp_list_str}."
+
+def generate_nr_description(df_input: pd.DataFrame) -> pd.DataFrame:
+    """Membuat Deskripsi Naratif Nilai Rapor (Deskripsi_NR)."""
+    df = df_input.copy()
+    tp_cols_prefix = [c for c in df.columns if c.startswith('TP') and len(c) == 3]
+    tk_cols = [f'TK_{col}' for col in tp_cols_prefix]
+
+    remidi = np.zeros((len(df), len(tk_cols)), dtype=bool)
+    for j, col in enumerate(tk_cols):
+        if col in df.columns:
+            remidi[:, j] = df[col].eq('R').fillna(False).to_numpy(dtype=bool)
+    tp_scores_sum = df[tp_cols_prefix].sum(axis=1).to_numpy()
+
+    # Setiap kombinasi TP remidi diberi kode bit, deskripsinya cukup dibuat sekali per kombinasi
+    codes = remidi.astype(np.int64) @ (1 << np.arange(len(tk_cols), dtype=np.int64))
+    remidi_text = {
+        code: _format_remidi_description([i + 1 for i in range(len(tk_cols)) if code >> i & 1])
+        for code in np.unique(codes[codes > 0]).tolist()
+    }
+
+    descriptions = np.where(
+        tp_scores_sum == 0.0,
+        "Nilai Tujuan Pembelajaran belum diinput.",
+        "Ananda telah menunjukkan penguasaan materi yang sangat baik dan tuntas pada seluruh Tujuan Pembelajaran."
+    ).astype(object)
+    for code, text in remidi_text.items():
+        descriptions[codes == code] = text
+
+    df['Deskripsi_NR'] = descriptions
+    return df
+
+# =========================================================
+# HELPERS UNTUK EXCEL
+# =========================================================
+
+def col_idx_to_excel(col_idx):
+    """Convert 0-based column index to Excel column letters (0->A)."""
+    col_idx += 1
+    letters = ""
+    while col_idx:
+        col_idx, remainder = divmod(col_idx - 1, 26)
+        letters = chr(65 + remainder) + letters
+        col_idx = int(col_idx)
+    return letters
+
+# Properti format sel Form Nilai; Format xlsxwriter dibuat per workbook saat sheet ditulis
+FORM_NILAI_FORMATS = {
+    # Menggunakan format numerik 1 desimal untuk nilai input
+    'float': {'border': 1, 'align': 'center', 'valign': 'vcenter', 'num_format': '0.0'},
+    'header': {'border': 1, 'align': 'center', 'valign': 'vcenter',
+               'bold': True, 'fg_color': '#D9E1F2', 'text_wrap': True},
+    'text': {'border': 1, 'align': 'left', 'valign': 'vcenter'},
+    'status_tp': {'bg_color': '#FFF2CC', 'border': 1, 'align': 'center', 'valign': 'vcenter', 'locked': True},
+    'formula_float': {'bg_color': '#FFF2CC', 'border': 1, 'align': 'center', 'valign': 'vcenter', 'locked': True,
+                      'num_format': '0.0'},
+    'formula_int': {'bg_color': '#FFF2CC', 'border': 1, 'align': 'center', 'valign': 'vcenter', 'locked': True,
+                    'num_format': '0'},
+    'info': {'align': 'left', 'valign': 'vcenter'},
+}
+
+FORM_NILAI_START_ROW_DATA = 6
+
+
+@functools.lru_cache(maxsize=None)
+def templat_info_form_nilai():
+    """Blok informasi (baris 1-4) beserta lebar kolomnya; per kelas hanya isian teks yang berubah."""
+    templat = TemplatXlsx()
+    INFO_COL_START = 6
+    info_rows = [
+        ('Mata Pelajaran', Isian(': {mapel}'), 'Tahun Pelajaran', Isian(': {tp}')),
+        ('Kelas', Isian(': {kelas}'), 'Guru Mata Pelelajaran', Isian(': {guru}')),
+        ('Semester', Isian(': {semester}'), 'NIP Guru', Isian(': {nip}')),
+        ('KKTP', ': ' + str(KKM), None, None),
+    ]
+    for r_off, (label_kiri, isi_kiri, label_kanan, isi_kanan) in enumerate(info_rows):
+        templat.tulis(r_off, 0, label_kiri, 'info')
+        templat.tulis(r_off, 2, isi_kiri, 'info')
+        if label_kanan is not None:
+            templat.tulis(r_off, INFO_COL_START, label_kanan, 'info')
+            templat.tulis(r_off, INFO_COL_START + 2, isi_kanan, 'info')
+
+    templat.lebar(0, 20)
+    templat.lebar(2, 30)
+    templat.lebar(INFO_COL_START, 20)
+    templat.lebar(INFO_COL_START + 2, 30)
+    return templat
+
+
+@functools.lru_cache(maxsize=32)
+def rencana_form_nilai(columns):
+    """
+    Rencana kolom Form Nilai untuk satu susunan kolom frame (tuple), dihitung sekali per ekspor:
+    urutan kolom data, judul header, segmen write_row, template rumus {r}, dan lebar kolom.
+    Format disimpan sebagai kunci FORM_NILAI_FORMATS.
+    """
+    LM_COLS_EXPORT = ['LM_1', 'LM_2', 'LM_3', 'LM_4', 'LM_5']
+    TK_COLS_EXPORT = [c for c in columns if c.startswith('TK_TP') and len(c) == 6]
+    TP_SCORE_COLS = ['TP1', 'TP2', 'TP3', 'TP4', 'TP5']
+    CORE_SCORE_COLS = TP_SCORE_COLS + LM_COLS_EXPORT + ['PTS', 'SAS', 'Avg_TP', 'Avg_LM', 'Avg_PSA', 'NR']
+    FINAL_COLS_ORDER_DATA = ['NIS', 'Nama', 'Kelas'] + \
+                            [c for c in CORE_SCORE_COLS if c in columns] + \
+                            ['Deskripsi_NR']
+
+    tk_display_map = {c: c.replace('TK_', 'Status ') for c in TK_COLS_EXPORT}
+    HEADER_COLS_ORDER = ['NIS', 'NAMA SISWA', 'KELAS'] + \
+                  [COLUMN_DISPLAY_MAP.get(c, c) for c in CORE_SCORE_COLS if c in columns] + \
+                  [tk_display_map.get(c, c) for c in TK_COLS_EXPORT] + \
+                  [COLUMN_DISPLAY_MAP.get('Deskripsi_NR', 'Deskripsi Rapor')]
+
+    COL_OFFSET = 0
+    cols = list(HEADER_COLS_ORDER)
+    def idx_of(title): return cols.index(title) if title in cols else None
+    idx_avg_tp = idx_of('Rata-rata TP')
+    idx_avg_lm = idx_of('Rata-rata LM')
+    idx_avg_psa = idx_of('Rata-rata PSA')
+    idx_nr = idx_of('NR')
+    status_tp_map = {f'Status TP{i}': f'TP-{i}' for i in range(1, 6)}
+    status_tp_indices = {
+        idx_of(status_name): idx_of(tp_score_name)
+        for status_name, tp_score_name in status_tp_map.items()
+        if idx_of(status_name) is not None and idx_of(tp_score_name) is not None
+    }
+    tp_score_display_titles = ['TP-1','TP-2','TP-3','TP-4','TP-5']
+    lm_display_titles = ['LM-1','LM-2','LM-3','LM-4','LM-5']
+    tp_score_indices = [cols.index(t) for t in tp_score_display_titles if t in cols]
+    lm_indices = [cols.index(t) for t in lm_display_titles if t in cols]
+    idx_pts = cols.index('PTS') if 'PTS' in cols else None
+    idx_sas = cols.index('SAS/SAT') if 'SAS/SAT' in cols else None
+
+    REVERSE_COLUMN_MAP = {v: k for k, v in COLUMN_DISPLAY_MAP.items()}
+    REVERSE_COLUMN_MAP['NAMA SISWA'] = 'Nama'
+    REVERSE_COLUMN_MAP['KELAS'] = 'Kelas'
+
+    # Kolom data yang bersebelahan dengan format sama digabung menjadi satu segmen write_row,
+    # kolom rumus disimpan sebagai template {r}.
+    data_segments = []  # [kolom awal, [nama kolom data], kunci format]
+    formula_plan = []   # (kolom, template rumus, kunci format)
+    for col_num, column_name in enumerate(HEADER_COLS_ORDER):
+        if column_name.startswith('Status TP'):
+            tp_score_idx = status_tp_indices.get(col_num)
+            if tp_score_idx is not None:
+                col_tp_score = col_idx_to_excel(tp_score_idx + COL_OFFSET)
+                formula_plan.append((
+                    col_num + COL_OFFSET,
+                    f'=IF({col_tp_score}{{r}}=0,"",IF({col_tp_score}{{r}}>={KKM},"T","R"))',
+                    'status_tp',
+                ))
+            continue
+
+        if column_name in ['Rata-rata TP', 'Rata-rata LM', 'Rata-rata PSA', 'NR']:
+            continue
+
+        data_column_name = REVERSE_COLUMN_MAP.get(column_name, column_name)
+        if data_column_name not in FINAL_COLS_ORDER_DATA:
+            continue
+
+        if data_column_name in ['NIS', 'Nama', 'Kelas', 'Deskripsi_NR']:
+            current_format = 'text'
+        else:
+            current_format = 'float'
+
+        last = data_segments[-1] if data_segments else None
+        if last is not None and last[2] == current_format and last[0] + len(last[1]) == col_num + COL_OFFSET:
+            last[1].append(data_column_name)
+        else:
+            data_segments.append([col_num + COL_OFFSET, [data_column_name], current_format])
+
+    # TEMPLATE RUMUS AVG dan NR
+    if idx_avg_tp is not None and tp_score_indices:
+        first_tp_col = col_idx_to_excel(tp_score_indices[0] + COL_OFFSET)
+        last_tp_col = col_idx_to_excel(tp_score_indices[-1] + COL_OFFSET)
+        formula_plan.append((
+            idx_avg_tp + COL_OFFSET,
+            f'=AVERAGEIF({first_tp_col}{{r}}:{last_tp_col}{{r}},">0")',
+            'formula_float',
+        ))
+
+    if idx_avg_lm is not None and lm_indices:
+        first_lm_col = col_idx_to_excel(lm_indices[0] + COL_OFFSET)
+        last_lm_col = col_idx_to_excel(lm_indices[-1] + COL_OFFSET)
+        formula_plan.append((
+            idx_avg_lm + COL_OFFSET,
+            f'=AVERAGEIF({first_lm_col}{{r}}:{last_lm_col}{{r}},">0")',
+            'formula_float',
+        ))
+
+    if idx_avg_psa is not None and idx_pts is not None and idx_sas is not None:
+        col_pts = col_idx_to_excel(idx_pts + COL_OFFSET)
+        col_sas = col_idx_to_excel(idx_sas + COL_OFFSET)
+        formula_plan.append((
+            idx_avg_psa + COL_OFFSET,
+            f"=IF({col_pts}{{r}}+{col_sas}{{r}}>0, ({col_pts}{{r}}+{col_sas}{{r}})/2, 0)",
+            'formula_float',
+        ))
+
+    if idx_nr is not None and idx_avg_tp is not None and idx_avg_lm is not None and idx_avg_psa is not None:
+        col_avg_tp = col_idx_to_excel(idx_avg_tp + COL_OFFSET)
+        col_avg_lm = col_idx_to_excel(idx_avg_lm + COL_OFFSET)
+        col_avg_psa = col_idx_to_excel(idx_avg_psa + COL_OFFSET)
+
+        calculation_denominator = (
+            f"(({col_avg_tp}{{r}}>0)*1+({col_avg_lm}{{r}}>0)*2+({col_avg_psa}{{r}}>0)*1)"
+        )
+        calculation_core = (
+            f"({col_avg_tp}{{r}}+2*{col_avg_lm}{{r}}+{col_avg_psa}{{r}})/"
+            f"IF({calculation_denominator}=0,1,{calculation_denominator})"
+        )
+        formula_plan.append((
+            idx_nr + COL_OFFSET,
+            f"=IF({col_avg_psa}{{r}}>0, IFERROR(ROUND({calculation_core},0),0),0)",
+            'formula_int',
+        ))
+
+    # Lebar kolom tabel (first_col, last_col, lebar)
+    idx_desc = idx_of('Deskripsi Rapor')
+    end_col_numeric = idx_desc - 1 + COL_OFFSET if idx_desc is not None else len(HEADER_COLS_ORDER) - 1 + COL_OFFSET
+    column_widths = [
+        (0 + COL_OFFSET, 0 + COL_OFFSET, 5),
+        (1 + COL_OFFSET, 1 + COL_OFFSET, 25),
+        (2 + COL_OFFSET, 2 + COL_OFFSET, 7),
+        (3 + COL_OFFSET, end_col_numeric, 8),
+    ]
+    if idx_desc is not None:
+        column_widths.append((idx_desc + COL_OFFSET, idx_desc + COL_OFFSET, 60))
+
+    return FINAL_COLS_ORDER_DATA, HEADER_COLS_ORDER, data_segments, formula_plan, column_widths
+
+
+def write_form_nilai_sheet(df, mapel, semester, kelas, tp, guru, nip, writer, sheet_name):
+    """Menulis satu sheet Form Nilai Siswa (Laporan Lengkap) ke writer yang sudah ada."""
+    workbook = writer.book
+    worksheet = workbook.add_worksheet(sheet_name)
+    formats = {nama: workbook.add_format(props) for nama, props in FORM_NILAI_FORMATS.items()}
+
+    INPUT_SCORE_COLS_ALL = ['TP1', 'TP2', 'TP3', 'TP4', 'TP5', 'LM_1', 'LM_2', 'LM_3', 'LM_4', 'LM_5', 'PTS', 'SAS']
+    FINAL_COLS_ORDER_DATA, HEADER_COLS_ORDER, data_segments, formula_plan, column_widths = \
+        rencana_form_nilai(tuple(df.columns))
+
+    df_export = df[FINAL_COLS_ORDER_DATA].copy()
+
+    for col in INPUT_SCORE_COLS_ALL:
+        if col in df_export.columns:
+            df_export[col] = pd.to_numeric(df_export[col], errors='coerce').fillna(0.0)
+    if 'NR' in df_export.columns:
+        df_export['NR'] = df_export['NR'].fillna(0).astype(int)
+
+    # 2. MENULIS HEADER INFORMASI
+    # Template ditulis baris demi baris (urut) agar aman untuk mode constant_memory xlsxwriter.
+    templat_info_form_nilai().terapkan(worksheet, formats.__getitem__, 0,
+                                       mapel=mapel, tp=tp, kelas=kelas, guru=guru, semester=semester, nip=nip)
+
+    # 3. MENULIS DATA NILAI SISWA
+    START_ROW_DATA = FORM_NILAI_START_ROW_DATA
+    worksheet.write_row(START_ROW_DATA, 0, HEADER_COLS_ORDER, formats['header'])
+
+    # Konversi isi frame ke list Python sekali saja (tanpa iloc per sel)
+    def column_values(data_column_name):
+        values = df_export[data_column_name].tolist()
+        if data_column_name in INPUT_SCORE_COLS_ALL:
+            return ["" if v == 0.0 else v for v in values]
+        if data_column_name in ['NIS', 'Nama', 'Kelas', 'Deskripsi_NR']:
+            return [str(v) if isinstance(v, (int, float)) else v for v in values]
+        return values
+
+    segment_rows = [
+        (start_col, list(zip(*[column_values(c) for c in seg_cols])), formats[seg_format])
+        for start_col, seg_cols, seg_format in data_segments
+    ]
+    formula_rows = [(col_num, template, formats[fmt]) for col_num, template, fmt in formula_plan]
+
+    for r_i in range(len(df_export)):
+        row_num = START_ROW_DATA + 1 + r_i
+        excel_row = row_num + 1
+        for start_col, rows, seg_format in segment_rows:
+            worksheet.write_row(row_num, start_col, rows[r_i], seg_format)
+        for col_num, template, formula_format in formula_rows:
+            worksheet.write_formula(row_num, col_num, template.format(r=excel_row), formula_format)
+
+    for first_col, last_col, width in column_widths:
+        worksheet.set_column(first_col, last_col, width)
+    worksheet.freeze_panes(START_ROW_DATA + 2, 2)
+
+
+def write_report_tk_sheet(df, mapel, kelas, tp, writer, sheet_name):
+    """Menulis satu sheet Laporan TK ke writer yang sudah ada."""
+    workbook = writer.book
+    worksheet = workbook.add_worksheet(sheet_name)
+
+    border_format = workbook.add_format({
+        'border': 1, 'align': 'center', 'valign': 'vcenter'
+    })
+    header_format = workbook.add_format({
+        'border': 1, 'align': 'center', 'valign': 'vcenter',
+        'bold': True, 'fg_color': '#D9E1F2'
+    })
+    text_format = workbook.add_format({
+        'border': 1, 'align': 'left', 'valign': 'vcenter'
+    })
+    header_info_format = workbook.add_format({
+        'align': 'left', 'valign': 'vcenter'
+    })
+
+    tk_cols = [c for c in df.columns if c.startswith('TK_TP') and len(c) == 6]
+    df_export = df[['NIS', 'Nama', 'Kelas', 'NR'] + tk_cols].copy()
+
+    tk_headers_short = [f'KTP-{i}' for i in range(1, len(tk_cols) + 1)]
+    df_export.columns = ['NIS', 'NAMA SISWA', 'KELAS', 'NR'] + tk_headers_short
+
+    df_export['NR'] = df_export['NR'].fillna(0).astype(int)
+    for col in [c for c in df_export.columns if c.startswith('KTP-')]:
+        df_export[col] = df_export[col].astype(str).replace('nan', '')
+
+    df_export['NR'] = df_export['NR'].apply(lambda x: '' if x == 0 else x)
+
+
+    KKTP = KKM
+    header_data = {
+        'Keterangan': [
+            'Mata Pelajaran', 'Kelas', 'Tahun Pelajaran', 'Batas Ketuntasan (KKTP)'
+        ],
+        'Nilai_Isian': [
+            ': ' + str(mapel),
+            ': ' + str(kelas),
+            ': ' + str(tp),
+            ': ' + str(KKTP)
+        ]
+    }
+    combined_header_df = pd.DataFrame(header_data)
+
+    for r_idx, row in combined_header_df.iterrows():
+        worksheet.write(r_idx, 0, row['Keterangan'], header_info_format)
+        worksheet.write(r_idx, 2, row['Nilai_Isian'], header_info_format)
+
+    START_ROW_DATA = 6
+    for col_num, value in enumerate(df_export.columns.values):
+        worksheet.write(START_ROW_DATA, col_num, value, header_format)
+
+    num_rows = len(df_export)
+    num_cols = len(df_export.columns)
+    for row_num in range(START_ROW_DATA + 1, START_ROW_DATA + num_rows + 1):
+        for col_num in range(num_cols):
+            cell_value = df_export.iloc[row_num - (START_ROW_DATA + 1), col_num]
+            column_name = df_export.columns[col_num]
+            if column_name in ['NIS', 'NAMA SISWA', 'KELAS']:
+                if isinstance(cell_value, (int, float)):
+                    cell_value = str(cell_value)
+                worksheet.write(row_num, col_num, cell_value, text_format)
+            elif column_name.startswith('KTP-'):
+                worksheet.write_string(row_num, col_num, str(cell_value), border_format)
+            else:
+                worksheet.write(row_num, col_num, cell_value, border_format)
+
+    worksheet.set_column(1, 1, 25)
+    worksheet.set_column(0, num_cols-1, 8)
+    worksheet.freeze_panes(START_ROW_DATA + 1, 2)
+
+
+def export_multisheet_form_nilai(df_all: pd.DataFrame, classes: List[str], mapel, semester, tp, guru, nip,
+                                 progress=None):
+    """Menghasilkan file Excel multisheet untuk Form Nilai. progress(selesai, total) dipanggil per kelas."""
+    output = BytesIO()
+    # constant_memory: setiap baris langsung di-flush ke disk, memori tetap datar
+    # berapa pun jumlah kelas. Syaratnya baris ditulis berurutan (lihat write_form_nilai_sheet).
+    with pd.ExcelWriter(output, engine='xlsxwriter', engine_kwargs={'options': {'constant_memory': True}}) as writer:
+        for i, kelas in enumerate(classes, start=1):
+            df_kelas = df_all[df_all['Kelas'] == kelas].reset_index(drop=True)
+            if not df_kelas.empty:
+                sheet_name = f"{kelas} - Form Nilai"
+                write_form_nilai_sheet(df_kelas, mapel, semester, kelas, tp, guru, nip, writer, sheet_name)
+            if progress is not None:
+                progress(i, len(classes))
+    return output.getvalue()
+
+def export_multisheet_report_tk(df_all: pd.DataFrame, classes: List[str], mapel, tp, progress=None):
+    """Menghasilkan file Excel multisheet untuk Laporan TK. progress(selesai, total) dipanggil per kelas."""
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        for i, kelas in enumerate(classes, start=1):
+            df_kelas = df_all[df_all['Kelas'] == kelas].reset_index(drop=True)
+            if not df_kelas.empty:
+                sheet_name = f"{kelas} - Laporan TK"
+                write_report_tk_sheet(df_kelas, mapel, kelas, tp, writer, sheet_name)
+            if progress is not None:
+                progress(i, len(classes))
+    return output.getvalue()
+
+# =========================================================
+# PERHITUNGAN DAN EDITOR
+# =========================================================
+
+def hitung_nilai(df: pd.DataFrame) -> pd.DataFrame:
+    """Pipeline lengkap: NR & rata-rata, Status TK, lalu Deskripsi NR."""
+    df = calculate_nr(df)
+    df = calculate_tk_status(df)
+    return generate_nr_description(df)
+
+def hash_dataframe(df: pd.DataFrame) -> str:
+    """Hash isi DataFrame (nilai + index) untuk kunci cache."""
+    return hashlib.md5(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()
+
+def editor_frames(df_selected: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Hitung nilai awal dan siapkan frame tampilan untuk st.data_editor."""
+    df_calculated = hitung_nilai(df_selected)
+
+    DISPLAY_COLS = ['NIS', 'Nama', 'Kelas'] + INPUT_SCORE_COLS
+    editor_display_cols = DISPLAY_COLS + [
+        'Avg_TP', 'Avg_LM', 'Avg_PSA', 'NR', 'Deskripsi_NR'
+    ] + [c for c in df_calculated.columns if c.startswith('TK_TP')]
+
+    df_display = df_calculated[editor_display_cols].rename(columns=COLUMN_DISPLAY_MAP)
+
+    float_display_cols = ['Rata-rata TP', 'Rata-rata LM', 'Rata-rata PSA'] + [COLUMN_DISPLAY_MAP.get(c, c) for c in INPUT_SCORE_COLS]
+    for col in float_display_cols:
+        if col in df_display.columns:
+            # Nilai output di editor ditampilkan sebagai string 1 desimal
+            df_display[col] = df_display[col].apply(lambda x: '' if x == 0.0 else f"{x:.1f}")
+
+    return df_calculated, df_display
+
+def parse_editor_frame(edited: pd.DataFrame) -> pd.DataFrame:
+    """Kembalikan nama kolom asli dan ubah input nilai editor menjadi float."""
+    df_export_edited = edited.rename(columns={v: k for k, v in COLUMN_DISPLAY_MAP.items()})
+
+    # Konversi kolom input kembali ke float, DENGAN MENGGANTI KOMA (,) MENJADI TITIK (.)
+    for col in INPUT_SCORE_COLS:
+        if col in df_export_edited.columns:
+            # 1. Pastikan data adalah string, dan ganti koma dengan titik
+            temp_series = df_export_edited[col].astype(str).str.replace(',', '.', regex=False)
+
+            # 2. Konversi ke float, mengabaikan error (diisi 0.0)
+            df_export_edited[col] = pd.to_numeric(temp_series, errors='coerce').fillna(0.0)
+    return df_export_edited
+
+def recalculate_incremental(edited_df: pd.DataFrame, df_display: pd.DataFrame,
+                            editor_state: Optional[Dict[str, Any]], cache: Optional[Dict[str, Any]]):
+    """
+    Hitung ulang hasil editor secara inkremental.
+
+    `cache` adalah hasil panggilan sebelumnya (atau None): hash data dasar editor, salinan
+    `edited_rows` terakhir, dan frame hasil. Hanya baris yang delta editnya berubah yang dihitung
+    ulang lalu ditambal ke frame hasil. Perhitungan penuh dilakukan jika data dasar editor berubah
+    atau ada baris yang ditambah/dihapus. Mengembalikan (frame hasil, cache baru).
+    """
+    edited_rows = editor_state.get("edited_rows", {}) if editor_state else {}
+    structural = bool(editor_state and (editor_state.get("added_rows") or editor_state.get("deleted_rows")))
+    base_sig = hash_dataframe(df_display)
+
+    if structural or cache is None or cache["sig"] != base_sig or len(cache["df"]) != len(edited_df):
+        df_result = hitung_nilai(parse_editor_frame(edited_df))
+    else:
+        # Tambal salinan: frame di cache lama bisa masih dipakai pemanggil (mis. tugas ekspor latar belakang)
+        df_result = cache["df"].copy()
+        prev_rows = cache["edited_rows"]
+        dirty = sorted(
+            int(r) for r in set(prev_rows) | set(edited_rows)
+            if prev_rows.get(r) != edited_rows.get(r)
+        )
+        if dirty:
+            patch = hitung_nilai(parse_editor_frame(edited_df.iloc[dirty]))
+            for col in patch.columns:
+                df_result.loc[patch.index, col] = patch[col]
+
+    return df_result, {
+        "sig": base_sig,
+        "edited_rows": {r: dict(v) for r, v in edited_rows.items()},
+        "df": df_result,
+    }
@@ -0,0 +1,74 @@
+"""
+Peringkat TKA/TKAD (pages/5_Hasil_TO.py): kolom `{mapel}_TKAD{sesi}` dibentuk menjadi satu blok
+3-D (siswa x sesi x mapel), lalu total, validitas, dan peringkat semua sesi dihitung sekaligus.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from speroba.kelas import jenjang_kelas
+
+JUMLAH_SESI = 5
+
+
+def kolom_tkad(mapel: List[str], sesi: int) -> List[str]:
+    return [f"{m}_TKAD{sesi}" for m in mapel]
+
+
+def blok_tkad(df: pd.DataFrame, mapel: List[str]) -> np.ndarray:
+    """
+    Nilai TKAD sebagai array float64 (siswa, sesi, mapel). Kolom yang tidak ada di `df` bernilai NaN,
+    isi yang bukan angka juga NaN.
+    """
+    semua = [c for s in range(1, JUMLAH_SESI + 1) for c in kolom_tkad(mapel, s)]
+    ada = [c for c in semua if c in df.columns]
+    blok = np.full((len(df), len(semua)), np.nan)
+    if ada:
+        nilai = df[ada].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+        blok[:, [semua.index(c) for c in ada]] = nilai
+    return blok.reshape(len(df), JUMLAH_SESI, len(mapel))
+
+
+def _peringkat_kelompok(total: np.ndarray, kelompok: np.ndarray) -> np.ndarray:
+    """
+    Peringkat "min" menurun per (kelompok, sesi) untuk semua sesi dalam satu groupby.
+    `total` (siswa, sesi) berisi NaN untuk sesi yang tidak valid; kelompok -1 tidak diberi peringkat.
+    """
+    n, jumlah_sesi = total.shape
+    kunci = kelompok[:, None] * jumlah_sesi + np.arange(jumlah_sesi)
+    nilai = np.where(kelompok[:, None] >= 0, total, np.nan)
+    rank = pd.Series(nilai.ravel()).groupby(kunci.ravel()).rank(ascending=False, method="min")
+    return rank.to_numpy(dtype="float64").reshape(n, jumlah_sesi)
+
+
+def hitung_peringkat_tkad(df: pd.DataFrame, mapel: List[str], paralel: bool = False, sekolah: bool = False) -> pd.DataFrame:
+    """
+    Kolom hasil (index sama dengan `df`): Total_Sesi_{i}, Peringkat_TKAD{i} (dalam kelas), dan bila diminta
+    Peringkat_Paralel_TKAD{i} (kelas sejenjang) serta Peringkat_Sekolah_TKAD{i}.
+    Siswa yang tidak punya nilai sama sekali di suatu sesi tidak diberi peringkat di sesi itu;
+    sesi tanpa kolom nilai di file tidak punya total maupun peringkat.
+    """
+    blok = blok_tkad(df, mapel)
+    ada_sesi = np.array([any(c in df.columns for c in kolom_tkad(mapel, s)) for s in range(1, JUMLAH_SESI + 1)])
+    valid = ~np.isnan(blok).all(axis=2) & ada_sesi
+    total = np.where(ada_sesi, np.nansum(blok, axis=2), np.nan)
+    total_valid = np.where(valid, total, np.nan)
+
+    # Kelas kosong (NaN) tidak masuk kelompok mana pun, sama seperti groupby("Kelas")
+    kelas = df["Kelas"] if "Kelas" in df.columns else pd.Series(np.nan, index=df.index)
+    kode_kelas, _ = pd.factorize(kelas)
+    hasil = {}
+    for s in range(JUMLAH_SESI):
+        hasil[f"Total_Sesi_{s + 1}"] = total[:, s]
+    tingkat = [("Peringkat_TKAD", kode_kelas)]
+    if paralel:
+        jenjang = kelas.map(lambda k: np.nan if pd.isna(k) else jenjang_kelas(k))
+        tingkat.append(("Peringkat_Paralel_TKAD", pd.factorize(jenjang)[0]))
+    if sekolah:
+        tingkat.append(("Peringkat_Sekolah_TKAD", np.zeros(len(df), dtype=np.intp)))
+    for prefix, kelompok in tingkat:
+        rank = _peringkat_kelompok(total_valid, kelompok)
+        for s in range(JUMLAH_SESI):
+            hasil[f"{prefix}{s + 1}"] = rank[:, s]
+    return pd.DataFrame(hasil, index=df.index)
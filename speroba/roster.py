@@ -0,0 +1,90 @@
+"""Roster siswa (daftar_siswa.csv): dimuat sekali per proses, dinormalisasi, dipecah per kelas."""
+import functools
+import io
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from speroba import cache_kolom
+from speroba.kelas import KelasIndex
+
+try:
+    import streamlit as st
+    _cache_resource = st.cache_resource(show_spinner=False, max_entries=4)
+except ImportError:  # dipakai tanpa Streamlit (batch/CLI)
+    _cache_resource = functools.lru_cache(maxsize=4)
+
+DEFAULT_ROSTER_PATH = "daftar_siswa.csv"
+
+# Variasi nama kolom yang sering muncul di file sekolah
+ROSTER_RENAME_MAP = {'NISN': 'NIS', 'NAMA': 'Nama', 'KLAS': 'Kelas', 'KLS': 'Kelas'}
+ROSTER_TEXT_COLS = ['NIS', 'Nama', 'Kelas']
+
+
+def normalize_roster(df: pd.DataFrame) -> pd.DataFrame:
+    """Seragamkan nama kolom dan tipe data roster (NIS/Nama/Kelas sebagai string)."""
+    df = df.copy()
+    df.columns = [str(col).strip() for col in df.columns]
+    df = df.rename(columns=ROSTER_RENAME_MAP)
+    for col in ROSTER_TEXT_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+    if 'Kelas' in df.columns:
+        df['Kelas'] = df['Kelas'].str.upper()
+    return df
+
+
+class Roster:
+    """
+    Roster ternormalisasi beserta indeks kelas dan view per kelas yang dibuat saat dimuat.
+    Objek ini dibagi antar sesi (cache_resource): jangan ubah `df` di tempat, salin dulu.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        kelas = df['Kelas'] if 'Kelas' in df.columns else pd.Series([], dtype=str)
+        self.index = KelasIndex(kelas)
+        self.kelas: List[str] = self.index.kelas
+        self.per_kelas: Dict[str, pd.DataFrame] = {
+            k: self.index.take(df, k).reset_index(drop=True) for k in self.kelas
+        }
+
+    def siswa_kelas(self, kelas: str) -> pd.DataFrame:
+        """View siswa satu kelas (frame kosong bila kelas tidak ada)."""
+        view = self.per_kelas.get(kelas)
+        return view if view is not None else self.df.iloc[0:0].reset_index(drop=True)
+
+    def siswa_jenjang(self, kelas: str) -> pd.DataFrame:
+        """Siswa semua kelas paralel yang sejenjang dengan `kelas` (7/8/9)."""
+        return self.index.take(self.df, kelas, paralel=True).reset_index(drop=True)
+
+
+def parse_roster_csv(data: bytes) -> pd.DataFrame:
+    """Parse + normalisasi isi CSV roster. NIS/Kelas dibaca sebagai teks agar nol di depan tidak hilang."""
+    df = pd.read_csv(io.BytesIO(data), dtype={'NIS': str, 'NISN': str, 'Kelas': str})
+    return normalize_roster(df)
+
+
+def read_roster(path: str = DEFAULT_ROSTER_PATH) -> Roster:
+    """Baca CSV roster dari disk; frame ternormalisasi diambil dari cache kolumnar bila isi file sama."""
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    kunci = cache_kolom.kunci_cache(cache_kolom.hash_isi(data))
+    return Roster(cache_kolom.muat_atau_parse("roster", kunci, lambda: parse_roster_csv(data)))
+
+
+@_cache_resource
+def _load_roster_cached(path: str, mtime_ns: int) -> Roster:
+    # mtime_ns hanya dipakai sebagai kunci cache: file berubah -> dibaca ulang
+    return read_roster(path)
+
+
+def load_roster(path: str = DEFAULT_ROSTER_PATH) -> Optional[Roster]:
+    """
+    Roster dari cache proses; dibaca ulang hanya jika mtime file berubah.
+    Mengembalikan None jika file tidak ada; error parsing diteruskan ke pemanggil.
+    """
+    if not os.path.exists(path):
+        return None
+    return _load_roster_cached(os.path.abspath(path), os.stat(path).st_mtime_ns)
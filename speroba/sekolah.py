@@ -0,0 +1,5 @@
+"""Identitas sekolah yang dicetak di formulir dan laporan."""
+
+NAMA_SEKOLAH = "SMP NEGERI 2 BANGUNTAPAN"
+KEPALA_SEKOLAH = "Alina Fiftiyani Nurjannah, M.Pd."
+NIP_KEPSEK = "19800105 200903 2 006"
@@ -0,0 +1,139 @@
+"""
+Template tata letak xlsxwriter: operasi header/baris/footer direkam sekali lalu diputar ulang
+ke setiap sheet baru, hanya isian teks yang diganti.
+
+Format xlsxwriter terikat ke satu workbook, jadi template hanya menyimpan *kunci* gaya;
+kunci diubah menjadi Format lewat callable `gaya` milik workbook tujuan saat diterapkan.
+"""
+from typing import Callable, Hashable, List, Tuple
+
+
+class Isian(str):
+    """Teks dengan isian {nama} yang diganti saat template diterapkan."""
+
+
+class Nilai(str):
+    """Nilai mentah isian[nama] (angka/None ditulis apa adanya, tanpa diubah ke teks)."""
+
+
+class TemplatXlsx:
+    """
+    Rekaman operasi sheet (merge, tulis, sel kosong, tinggi baris, lebar kolom) dengan baris relatif.
+    Sel selain sel awal merge dihitung sekali saat direkam, bukan setiap kali diterapkan.
+    """
+
+    def __init__(self):
+        self._sel: List[Tuple[int, int, object, Hashable]] = []
+        self._merge: List[Tuple[int, int, int, int, object, Hashable]] = []
+        self._kosong: List[Tuple[int, int, Hashable]] = []
+        self._tinggi: List[Tuple[int, float]] = []
+        self._lebar: List[Tuple[int, float, bool]] = []
+        self.jumlah_baris = 0
+
+    def _pakai_baris(self, row):
+        self.jumlah_baris = max(self.jumlah_baris, row + 1)
+
+    def tulis(self, row, col, value, gaya):
+        self._sel.append((row, col, value, gaya))
+        self._pakai_baris(row)
+        return self
+
+    def kosong(self, row, col, gaya):
+        self._kosong.append((row, col, gaya))
+        self._pakai_baris(row)
+        return self
+
+    def merge(self, r1, c1, r2, c2, value, gaya_awal, gaya_sisa):
+        """
+        merge_range memberi format yang sama ke seluruh area; sel selain sel awal lalu
+        ditimpa dengan gaya_sisa agar sama dengan sel gabungan openpyxl (font bawaan).
+        """
+        self._merge.append((r1, c1, r2, c2, value, gaya_awal))
+        for r in range(r1, r2 + 1):
+            for c in range(c1, c2 + 1):
+                if (r, c) != (r1, c1):
+                    self._kosong.append((r, c, gaya_sisa))
+        self._pakai_baris(r2)
+        return self
+
+    def tinggi(self, row, height):
+        self._tinggi.append((row, height))
+        self._pakai_baris(row)
+        return self
+
+    def lebar(self, col, width):
+        """Lebar kolom dalam satuan karakter (set_column)."""
+        self._lebar.append((col, width, False))
+        return self
+
+    def lebar_px(self, col, px):
+        self._lebar.append((col, px, True))
+        return self
+
+    def ikat(self, gaya: Callable[[Hashable], object]) -> "TemplatTerikat":
+        """Ubah kunci gaya menjadi Format workbook tujuan (sekali per workbook)."""
+        return TemplatTerikat(self, gaya)
+
+    def terapkan(self, ws, gaya: Callable[[Hashable], object], baris: int = 0, **isian) -> int:
+        """
+        Tulis template ke `ws` mulai baris `baris` (0-based) dengan isian teks.
+        Mengembalikan baris pertama setelah area template.
+        """
+        return self.ikat(gaya).terapkan(ws, baris, **isian)
+
+
+def _isi(value, isian):
+    if isinstance(value, Nilai):
+        return isian[value]
+    return value.format_map(isian)
+
+
+class TemplatTerikat:
+    """
+    Template yang sudah terikat ke format satu workbook; dipakai ulang untuk banyak sheet/baris.
+    Operasi dikelompokkan per baris dan ditulis berurutan; dalam satu baris: merge, lalu sel kosong,
+    lalu sel bernilai, lalu tinggi baris. Urutan ini hanya cukup untuk mode constant_memory bila tidak
+    ada merge lintas baris (mis. info Form Nilai di olah_nilai). Formulir cetak di formulir_xlsxwriter
+    memakai merge beberapa baris di header, jadi workbook-nya ditulis dengan in_memory.
+    """
+
+    def __init__(self, templat: TemplatXlsx, gaya: Callable[[Hashable], object]):
+        def dinamis(value):
+            return isinstance(value, (Isian, Nilai))
+
+        per_baris = {}
+
+        def kelompok(row):
+            return per_baris.setdefault(row, ([], [], [], []))
+
+        for r1, c1, r2, c2, v, k in templat._merge:
+            kelompok(r1)[0].append((r2 - r1, c1, c2, v, gaya(k), dinamis(v)))
+        for r, c, k in templat._kosong:
+            kelompok(r)[1].append((c, gaya(k)))
+        for r, c, v, k in templat._sel:
+            kelompok(r)[2].append((c, v, gaya(k), dinamis(v)))
+        for r, height in templat._tinggi:
+            kelompok(r)[3].append(height)
+        self.baris = sorted(per_baris.items())
+        self.lebar = list(templat._lebar)
+        self.jumlah_baris = templat.jumlah_baris
+
+    def terapkan(self, ws, baris: int = 0, **isian) -> int:
+        """Tulis ke `ws` mulai baris `baris` (0-based); mengembalikan baris pertama setelah area template."""
+        write, write_blank = ws.write, ws.write_blank
+        for row, (merges, kosong, sel, tinggi) in self.baris:
+            r = baris + row
+            for tambah, c1, c2, value, fmt, berisian in merges:
+                ws.merge_range(r, c1, r + tambah, c2, _isi(value, isian) if berisian else value, fmt)
+            for col, fmt in kosong:
+                write_blank(r, col, None, fmt)
+            for col, value, fmt, berisian in sel:
+                write(r, col, _isi(value, isian) if berisian else value, fmt)
+            for height in tinggi:
+                ws.set_row(r, height)
+        for col, width, piksel in self.lebar:
+            if piksel:
+                ws.set_column_pixels(col, col, width)
+            else:
+                ws.set_column(col, col, width)
+        return baris + self.jumlah_baris
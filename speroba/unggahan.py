@@ -0,0 +1,86 @@
+"""
+Workbook nilai unggahan: isi file di-hash, diparse sekali dengan openpyxl read-only, hanya kolom
+yang dipakai halaman, lalu frame hasilnya di-cache per hash (tidak diparse ulang di setiap rerun,
+dan lewat cache kolumnar juga tidak setelah server restart).
+"""
+import functools
+import io
+import re
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+from pandas.io.parsers import TextParser
+
+from speroba import cache_kolom
+
+try:
+    import streamlit as st
+    from streamlit import runtime as _st_runtime
+except ImportError:
+    _st_runtime = None
+
+if _st_runtime is not None and _st_runtime.exists():
+    _cache_data = st.cache_data(show_spinner=False, max_entries=8)
+else:  # dipakai tanpa server Streamlit (batch/CLI): st.cache_data hanya akan memberi peringatan "No runtime"
+    _cache_data = functools.lru_cache(maxsize=8)
+
+
+def hash_unggahan(data: bytes) -> str:
+    """Hash isi file unggahan; dipakai sebagai kunci cache frame dan PDF."""
+    return cache_kolom.hash_isi(data)
+
+
+def _sel(value):
+    # Sama dengan konversi sel pandas.read_excel: kosong -> "", float bulat -> int
+    if value is None:
+        return ""
+    if type(value) is float and value.is_integer():
+        return int(value)
+    return value
+
+
+def baca_excel_kolom(data: bytes, kolom: Iterable[str] = (), pola: Optional[str] = None) -> pd.DataFrame:
+    """
+    Parse sheet pertama tanpa cache. Hanya kolom yang namanya (setelah strip) ada di `kolom`
+    atau cocok regex `pola` yang diambil; tipe data disimpulkan seperti pandas.read_excel.
+    """
+    kolom = set(kolom)
+    cocok = re.compile(pola).search if pola else None
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("Sheet pertama file Excel kosong.")
+        nama = [str(h).strip() if h is not None else "" for h in header]
+        posisi = [i for i, n in enumerate(nama) if n and (n in kolom or (cocok and cocok(n)))]
+
+        data_rows = [[nama[i] for i in posisi]]
+        terakhir = 1  # baris kosong di akhir sheet dibuang, seperti read_excel
+        for row in rows:
+            n = len(row)
+            data_rows.append([_sel(row[i]) if i < n else "" for i in posisi])
+            if any(v is not None for v in row):
+                terakhir = len(data_rows)
+        del data_rows[terakhir:]
+    finally:
+        wb.close()
+    return TextParser(data_rows, header=0).read()
+
+
+@_cache_data
+def _baca_excel_cached(file_hash: str, kolom: Tuple[str, ...], pola: Optional[str], _data: bytes) -> pd.DataFrame:
+    # Argumen berawalan "_" tidak ikut di-hash oleh st.cache_data (sudah terwakili file_hash)
+    kunci = cache_kolom.kunci_cache(file_hash, kolom, pola)
+    return cache_kolom.muat_atau_parse("unggahan", kunci, lambda: baca_excel_kolom(_data, kolom, pola))
+
+
+def muat_excel_unggahan(data: bytes, kolom: Iterable[str] = (), pola: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Frame dari workbook unggahan (salinan, boleh diubah) beserta hash isinya.
+    Diparse sekali per isi file + pilihan kolom; rerun berikutnya diambil dari cache.
+    """
+    file_hash = hash_unggahan(data)
+    df = _baca_excel_cached(file_hash, tuple(kolom), pola, data)
+    return df.copy(), file_hash
@@ -0,0 +1,118 @@
+"""
+Aset gambar PDF (speroba.aset): toggle useA85 hanya berlaku selama render dan selalu dikembalikan,
+dan gambar yang tertanam di PDF laporan ditulis biner pada resolusi PDF_DPI.
+"""
+import datetime
+import threading
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from pypdf import PdfReader
+from reportlab import rl_config
+from reportlab.lib.utils import ImageReader
+
+from speroba import aset
+from speroba.laporan_asesmen import MAPEL_KELAS_7_8, make_pdf_for_class
+
+
+@pytest.fixture
+def a85_aktif(monkeypatch):
+    # Nilai bawaan ReportLab; dipasang eksplisit agar tes tidak bergantung pada konfigurasi lokal
+    monkeypatch.setattr(rl_config, "useA85", 1)
+
+
+def test_impor_tidak_mengubah_use_a85():
+    assert aset._a85_pemakai == 0
+    assert rl_config.useA85 == rl_config._SAVED["useA85"]
+
+
+def test_pdf_biner_dikembalikan_setelah_error(a85_aktif):
+    with pytest.raises(RuntimeError):
+        with aset.pdf_biner():
+            assert rl_config.useA85 == 0
+            raise RuntimeError("render gagal")
+    assert rl_config.useA85 == 1
+    assert aset._a85_pemakai == 0
+
+
+def test_pdf_biner_bersarang(a85_aktif):
+    with aset.pdf_biner():
+        with aset.pdf_biner():
+            assert rl_config.useA85 == 0
+        assert rl_config.useA85 == 0
+    assert rl_config.useA85 == 1
+
+
+def test_pdf_biner_beberapa_thread(a85_aktif):
+    masuk = threading.Barrier(4)
+    keluar = threading.Event()
+    nilai = []
+
+    def render():
+        with aset.pdf_biner():
+            masuk.wait()
+            keluar.wait()
+            nilai.append(rl_config.useA85)
+
+    threads = [threading.Thread(target=render) for _ in range(3)]
+    for t in threads:
+        t.start()
+    masuk.wait()
+    assert rl_config.useA85 == 0
+    keluar.set()
+    for t in threads:
+        t.join()
+    assert nilai == [0, 0, 0]
+    assert rl_config.useA85 == 1
+    assert aset._a85_pemakai == 0
+
+
+def test_gambar_pdf_imagereader_baru():
+    a = aset.gambar_pdf("aksara_jawa", 100, 20)
+    b = aset.gambar_pdf("aksara_jawa", 100, 20)
+    assert type(a) is ImageReader
+    assert a is not b
+    assert a.getSize() == b.getSize()
+
+
+@pytest.mark.parametrize("nama", ["aksara_jawa", "ttd_kepsek", "logo_kiri"])
+def test_gambar_pdf_diperkecil_ke_dpi(nama):
+    w, h = aset.muat_aset()[nama].ukuran
+    # Kotak 0,1 kali ukuran asli pada PDF_DPI
+    lebar, tinggi = w * 72 / aset.PDF_DPI / 10, h * 72 / aset.PDF_DPI / 10
+    kecil = aset.gambar_pdf(nama, lebar, tinggi)
+    assert kecil.getSize() == (pytest.approx(w / 10, abs=1), pytest.approx(h / 10, abs=1))
+    assert aset.gambar_pdf(nama, w, h).getSize() == (w, h)
+
+
+def _gambar_pdf(data):
+    """(lebar, tinggi, filter) setiap image XObject di halaman pertama (termasuk di dalam Form XObject)."""
+    hasil = []
+
+    def telusuri(resources):
+        for obj in (resources or {}).get("/XObject", {}).values():
+            obj = obj.get_object()
+            if obj["/Subtype"] == "/Image":
+                filt = obj.get("/Filter")
+                hasil.append((obj["/Width"], obj["/Height"], list(filt) if isinstance(filt, list) else [filt]))
+            elif obj["/Subtype"] == "/Form":
+                telusuri(obj.get("/Resources"))
+
+    telusuri(PdfReader(BytesIO(data)).pages[0]["/Resources"])
+    return sorted(hasil)
+
+
+def test_gambar_laporan_tertanam_biner(a85_aktif):
+    df = pd.DataFrame({"Kelas": ["7A", "7A"], "NIS": ["001", "002"], "Nama Siswa": ["Ani", "Budi"]})
+    for mapel in MAPEL_KELAS_7_8:
+        df[mapel] = ["85", "90"]
+    data = make_pdf_for_class(df, MAPEL_KELAS_7_8, "ASESMEN SUMATIF TENGAH SEMESTER GANJIL", "2025/2026",
+                              datetime.date(2025, 10, 1)).getvalue()
+    assert rl_config.useA85 == 1
+
+    gambar = _gambar_pdf(data)
+    assert gambar
+    for lebar, tinggi, filt in gambar:
+        assert "/ASCII85Decode" not in filt
+        assert filt[-1] in ("/DCTDecode", "/FlateDecode")
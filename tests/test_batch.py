@@ -0,0 +1,94 @@
+"""render_parallel: urutan hasil, progres, dan jumlah worker bawaan."""
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from speroba import batch
+
+
+def _kuadrat_lambat(i, jeda):
+    # Job awal tidur lebih lama agar urutan selesai berbeda dengan urutan kirim
+    time.sleep(jeda)
+    return i * i, os.getpid()
+
+
+def _gagal(i):
+    if i == 2:
+        raise ValueError("job 2 gagal")
+    return i
+
+
+@pytest.mark.parametrize("max_workers", [1, 2, 3])
+def test_urutan_hasil_dan_progres(max_workers):
+    jobs = [(i, 0.3 - 0.05 * i) for i in range(6)]
+    laporan = []
+    hasil = batch.render_parallel(_kuadrat_lambat, jobs, max_workers=max_workers,
+                                  progress=lambda selesai, total: laporan.append((selesai, total)))
+    assert [nilai for nilai, _ in hasil] == [i * i for i in range(6)]
+    assert laporan == [(k, 6) for k in range(1, 7)]
+    pid = {p for _, p in hasil}
+    if max_workers == 1:
+        assert pid == {os.getpid()}
+    else:
+        assert os.getpid() not in pid
+        assert len(pid) <= max_workers
+
+
+def test_pool_tidak_memakai_fork():
+    assert batch.START_METHOD in ("forkserver", "spawn")
+
+
+def test_worker_tidak_menjalankan_skrip_main(monkeypatch, tmp_path):
+    # Seperti server Streamlit: __main__ adalah skrip halaman tanpa penjaga if __name__ == "__main__"
+    halaman = tmp_path / "halaman.py"
+    penanda = tmp_path / "dijalankan"
+    halaman.write_text(f"open({str(penanda)!r}, 'w').close()\nraise SystemExit('halaman dijalankan ulang')\n")
+    main = types.ModuleType("__main__")
+    main.__file__ = str(halaman)
+    monkeypatch.setitem(sys.modules, "__main__", main)
+
+    hasil = batch.render_parallel(_kuadrat_lambat, [(i, 0) for i in range(4)], max_workers=2)
+    assert [nilai for nilai, _ in hasil] == [0, 1, 4, 9]
+    assert not penanda.exists()
+    assert sys.modules["__main__"] is main
+
+
+def test_error_worker_diteruskan():
+    with pytest.raises(ValueError, match="job 2 gagal"):
+        batch.render_parallel(_gagal, [(i,) for i in range(4)], max_workers=2)
+    assert batch._pool_aktif == 0
+
+
+def test_jobs_kosong():
+    assert batch.render_parallel(_gagal, [], max_workers=4) == []
+
+
+def test_jumlah_worker_membagi_cpu_dengan_pool_berjalan(monkeypatch):
+    monkeypatch.setattr(batch.os, "cpu_count", lambda: 8)
+    assert batch.jumlah_worker() == 8
+    assert batch.jumlah_worker(jumlah_job=3) == 3
+    assert batch.jumlah_worker(2, jumlah_job=10) == 2
+    monkeypatch.setattr(batch, "_pool_aktif", 1)
+    assert batch.jumlah_worker() == 4
+    monkeypatch.setattr(batch, "_pool_aktif", 20)
+    assert batch.jumlah_worker() == 1
+
+
+def test_pool_aktif_dihitung_selama_render():
+    # Dijalankan dari thread lain, seperti tugas di speroba.jobs
+    terlihat = []
+
+    def lapor(selesai, total):
+        terlihat.append(batch._pool_aktif)
+
+    t = threading.Thread(target=batch.render_parallel,
+                         args=(_kuadrat_lambat, [(i, 0.2) for i in range(4)]),
+                         kwargs={"max_workers": 2, "progress": lapor})
+    t.start()
+    t.join()
+    assert len(terlihat) == 4 and min(terlihat) >= 1
+    assert batch._pool_aktif == 0
@@ -0,0 +1,120 @@
+"""
+Backend formulir xlsxwriter (speroba.formulir_xlsxwriter) harus menghasilkan tata letak yang sama
+dengan backend openpyxl (speroba.formulir_openpyxl): kedua hasil dibaca ulang dengan openpyxl
+lalu dibandingkan sel demi sel.
+"""
+import os
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from speroba import formulir
+
+ROSTER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "daftar_siswa.csv")
+
+
+def _px(width):
+    # Lebar kolom dibandingkan dalam piksel: openpyxl menyimpan lebar apa adanya,
+    # xlsxwriter menyimpan lebar yang sudah dibulatkan ke piksel
+    return int(((256 * width + int(128 / 7)) / 256) * 7)
+
+
+def _gaya(cell):
+    fill = cell.fill.fgColor.rgb if cell.fill is not None and cell.fill.fill_type else None
+    return (
+        cell.value if cell.value != "" else None,
+        cell.number_format,
+        cell.font.b, cell.font.i, cell.font.name, cell.font.sz,
+        fill,
+        cell.border.left.style, cell.border.top.style, cell.border.right.style, cell.border.bottom.style,
+        cell.alignment.horizontal, cell.alignment.vertical, bool(cell.alignment.wrap_text), cell.alignment.indent,
+    )
+
+
+def _lebar(ws):
+    lebar = {}
+    for dim in ws.column_dimensions.values():
+        if dim.width is None:
+            continue
+        for i in range(dim.min, dim.max + 1):
+            lebar[i] = _px(dim.width)
+    return lebar
+
+
+def _validasi(ws):
+    return sorted(
+        (str(dv.sqref), dv.type, dv.operator, dv.formula1, dv.formula2, dv.allow_blank)
+        for dv in ws.data_validations.dataValidation
+    )
+
+
+def bandingkan(data_a, data_b):
+    """Daftar perbedaan tata letak antara dua workbook (kosong jika sama)."""
+    a = openpyxl.load_workbook(BytesIO(data_a))
+    b = openpyxl.load_workbook(BytesIO(data_b))
+    beda = []
+    if a.sheetnames != b.sheetnames:
+        return [("sheet", a.sheetnames, b.sheetnames)]
+    for nama in a.sheetnames:
+        x, y = a[nama], b[nama]
+        if sorted(map(str, x.merged_cells.ranges)) != sorted(map(str, y.merged_cells.ranges)):
+            beda.append((nama, "merge", set(map(str, x.merged_cells.ranges)) ^ set(map(str, y.merged_cells.ranges))))
+        if _lebar(x) != _lebar(y):
+            beda.append((nama, "lebar kolom", _lebar(x), _lebar(y)))
+        if _validasi(x) != _validasi(y):
+            beda.append((nama, "validasi", _validasi(x), _validasi(y)))
+        for attr in ("paperSize", "orientation"):
+            if str(getattr(x.page_setup, attr)) != str(getattr(y.page_setup, attr)):
+                beda.append((nama, attr, getattr(x.page_setup, attr), getattr(y.page_setup, attr)))
+        for m in ("left", "right", "top", "bottom", "header", "footer"):
+            if abs(getattr(x.page_margins, m) - getattr(y.page_margins, m)) > 1e-9:
+                beda.append((nama, "margin", m, getattr(x.page_margins, m), getattr(y.page_margins, m)))
+        if bool(x.print_options.horizontalCentered) != bool(y.print_options.horizontalCentered):
+            beda.append((nama, "horizontalCentered"))
+        for r in range(1, max(x.max_row, y.max_row) + 1):
+            if x.row_dimensions[r].height != y.row_dimensions[r].height:
+                beda.append((nama, "tinggi baris", r, x.row_dimensions[r].height, y.row_dimensions[r].height))
+            for c in range(1, max(x.max_column, y.max_column) + 1):
+                p, q = x.cell(r, c), y.cell(r, c)
+                if _gaya(p) != _gaya(q):
+                    beda.append((nama, p.coordinate, _gaya(p), _gaya(q)))
+    return beda
+
+
+@pytest.fixture(scope="module")
+def roster():
+    return pd.read_csv(ROSTER, dtype={"NIS": str})
+
+
+def _kelas(roster, kelas):
+    return roster[roster["Kelas"] == kelas].reset_index(drop=True)
+
+
+FORMULIR = {
+    "daftar_siswa": lambda d, k, backend: formulir.generate_excel_daftar_siswa(
+        d, k, "Ganjil", "2025/2026", "Wali Kelas", "19800101 200501 1 001", backend=backend),
+    "form_nilai": lambda d, k, backend: formulir.generate_excel_form_nilai_siswa(
+        d, "Matematika", "Ganjil", k, "2025/2026", "Guru Mapel", "19800101 200501 1 002", backend=backend),
+    "absensi": lambda d, k, backend: formulir.generate_excel_absensi_panjang(
+        d, "Matematika", "Genap", k, "2025/2026", "Guru Mapel", "19800101 200501 1 002", backend=backend),
+}
+
+
+@pytest.mark.parametrize("jenis", sorted(FORMULIR))
+@pytest.mark.parametrize("kelas", ["7A", "9A"])
+def test_backend_sama_tata_letak(roster, jenis, kelas):
+    d = _kelas(roster, kelas)
+    assert not d.empty
+    buat = FORMULIR[jenis]
+    hasil_openpyxl = buat(d, kelas, "openpyxl").getvalue()
+    hasil_xlsxwriter = buat(d, kelas, "xlsxwriter").getvalue()
+    assert bandingkan(hasil_openpyxl, hasil_xlsxwriter) == []
+
+
+def test_backend_sama_daftar_siswa_multi(roster):
+    daftar = [(_kelas(roster, k), k, f"Wali {k}", "-") for k in ["7A", "8A", "9A"]]
+    hasil_openpyxl = formulir.generate_excel_daftar_siswa_multi(daftar, "Ganjil", "2025/2026", backend="openpyxl")
+    hasil_xlsxwriter = formulir.generate_excel_daftar_siswa_multi(daftar, "Ganjil", "2025/2026", backend="xlsxwriter")
+    assert bandingkan(hasil_openpyxl.getvalue(), hasil_xlsxwriter.getvalue()) == []
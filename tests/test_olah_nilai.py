@@ -0,0 +1,185 @@
+"""
+Paritas perhitungan NR / status TK / deskripsi versi vektor (speroba.olah_nilai) dengan versi lama
+per baris (apply/iterrows). Versi lama dibekukan di modul ini sebagai acuan.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from speroba.olah_nilai import KKM, calculate_nr, calculate_tk_status, generate_nr_description
+
+TP_COLS = ['TP1', 'TP2', 'TP3', 'TP4', 'TP5']
+LM_COLS = ['LM_1', 'LM_2', 'LM_3', 'LM_4', 'LM_5']
+
+# =========================================================
+# VERSI LAMA (per baris) — jangan diubah
+# =========================================================
+
+def old_calculate_nr(df_input: pd.DataFrame) -> pd.DataFrame:
+    df = df_input.copy()
+
+    tp_cols = [c for c in df.columns if c.startswith('TP') and len(c) == 3]
+    df['Avg_TP'] = df[tp_cols].replace(0.0, np.nan).mean(axis=1).round(2)
+
+    lm_cols = [c for c in df.columns if c.startswith('LM_') and len(c) == 4]
+    df['Avg_LM'] = df[lm_cols].replace(0.0, np.nan).mean(axis=1).round(2)
+
+    df['Avg_PSA'] = np.where(
+        (df['PTS'] + df['SAS']) > 0.0,
+        (df['PTS'] + df['SAS']) / 2,
+        0.0
+    ).round(2)
+
+    nr_components = df[['Avg_TP', 'Avg_LM', 'Avg_PSA']].copy()
+    nr_components['Avg_TP_weighted'] = nr_components['Avg_TP'].fillna(0.0) * 1
+    nr_components['Avg_LM_weighted'] = nr_components['Avg_LM'].fillna(0.0) * 2
+    nr_components['Avg_PSA_weighted'] = nr_components['Avg_PSA'].fillna(0.0) * 1
+    sum_components = (
+        nr_components['Avg_TP_weighted'] +
+        nr_components['Avg_LM_weighted'] +
+        nr_components['Avg_PSA_weighted']
+    )
+    count_components = nr_components.apply(lambda row: sum([1 if pd.notna(row['Avg_TP']) and row['Avg_TP'] > 0.0 else 0,
+                                            2 if pd.notna(row['Avg_LM']) and row['Avg_LM'] > 0.0 else 0,
+                                                           1 if pd.notna(row['Avg_PSA']) and row['Avg_PSA'] > 0.0 else 0]), axis=1)
+
+    df['NR_FLOAT'] = np.where(count_components > 0, sum_components / count_components, 0.0)
+    df['NR_FLOAT'] = np.where(df['Avg_PSA'] > 0.0, df['NR_FLOAT'], 0.0)
+    df['NR'] = df['NR_FLOAT'].round(0).astype(int)
+    df = df.drop(columns=['NR_FLOAT'])
+
+    return df
+
+def old_calculate_tk_status(df_input: pd.DataFrame) -> pd.DataFrame:
+    df = df_input.copy()
+    tp_cols = ['TP1', 'TP2', 'TP3', 'TP4', 'TP5']
+    threshold = float(KKM)
+
+    for tp in tp_cols:
+        tk = f'TK_{tp}'
+        df[tk] = df[tp].apply(
+            lambda x: "" if x <= 0.0 or pd.isna(x)
+            else "T" if x >= threshold
+            else "R"
+        )
+
+    def apply_validation_rule(row):
+        filled_tps = {tp: row[tp] for tp in tp_cols if pd.notna(row[tp]) and row[tp] > 0.0}
+
+        if len(filled_tps) < 2:
+            return row
+
+        all_t = all(v >= threshold for v in filled_tps.values())
+
+        if all_t:
+            smallest_tp = min(filled_tps, key=filled_tps.get)
+            smallest_tk = f'TK_{smallest_tp}'
+            row[smallest_tk] = 'R'
+        return row
+
+    df = df.apply(apply_validation_rule, axis=1)
+
+    return df
+
+def old_generate_nr_description(df_input: pd.DataFrame) -> pd.DataFrame:
+    df = df_input.copy()
+    tp_cols_prefix = [c for c in df.columns if c.startswith('TP') and len(c) == 3]
+    tk_cols = [f'TK_{col}' for col in tp_cols_prefix]
+    descriptions = []
+
+    for index, row in df.iterrows():
+        remidi_tps = [i + 1 for i, col in enumerate(tk_cols) if row.get(col) == 'R']
+        tp_scores_sum = row[tp_cols_prefix].sum()
+
+        if remidi_tps:
+            tp_list = [f"TP-{i}" for i in remidi_tps]
+            if len(tp_list) > 1:
+                tp_list_str = f"{', '.join(tp_list[:-1])}, dan {tp_list[-1]}"
+            else:
+                tp_list_str = tp_list[0]
+            description = f"Ananda perlu meningkatkan pemahaman dan penguasaan pada materi di {tp_list_str}."
+
+        elif tp_scores_sum == 0.0:
+             description = "Nilai Tujuan Pembelajaran belum diinput."
+        else:
+             description = "Ananda telah menunjukkan penguasaan materi yang sangat baik dan tuntas pada seluruh Tujuan Pembelajaran."
+
+        descriptions.append(description)
+
+    df['Deskripsi_NR'] = descriptions
+    return df
+
+# =========================================================
+# DATA UJI
+# =========================================================
+
+# Nilai batas: kosong (NaN/0), tepat di bawah/di KKM, maksimum, dan nilai kembar
+NILAI_BATAS = [np.nan, 0.0, 0.01, 79.99, float(KKM), 80.01, 100.0, 85.0, 85.0]
+
+def frame_nilai(n, seed, tp_cols=TP_COLS):
+    """Frame nilai acak: campuran nilai batas dan nilai bebas 0-100 (1 desimal)."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'NIS': [f"{i:05d}" for i in range(n)],
+        'Nama': [f"Siswa {i}" for i in range(n)],
+        'Kelas': rng.choice(['7A', '8B', '9C'], n),
+    })
+    for col in list(tp_cols) + LM_COLS + ['PTS', 'SAS']:
+        bebas = rng.integers(0, 1001, n) / 10
+        batas = rng.choice(NILAI_BATAS, n)
+        df[col] = np.where(rng.random(n) < 0.5, batas, bebas)
+    # Sebagian baris sama sekali belum diisi / hanya satu TP terisi
+    if n >= 4:
+        df.loc[0, list(tp_cols) + LM_COLS + ['PTS', 'SAS']] = np.nan
+        df.loc[1, list(tp_cols) + LM_COLS + ['PTS', 'SAS']] = 0.0
+        df.loc[2, list(tp_cols)] = [90.0] + [0.0] * (len(tp_cols) - 1)
+        df.loc[3, list(tp_cols)] = [float(KKM)] * len(tp_cols)
+    return df
+
+UKURAN = [0, 1, 5, 400]
+
+# =========================================================
+# PARITAS
+# =========================================================
+
+@pytest.mark.parametrize("n", UKURAN)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_calculate_nr_sama_dengan_versi_lama(n, seed):
+    df = frame_nilai(n, seed)
+    pd.testing.assert_frame_equal(calculate_nr(df), old_calculate_nr(df), check_dtype=False)
+
+@pytest.mark.parametrize("n", UKURAN)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_calculate_tk_status_sama_dengan_versi_lama(n, seed):
+    df = calculate_nr(frame_nilai(n, seed))
+    pd.testing.assert_frame_equal(calculate_tk_status(df), old_calculate_tk_status(df), check_dtype=False)
+
+@pytest.mark.parametrize("n", UKURAN)
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_generate_nr_description_sama_dengan_versi_lama(n, seed):
+    df = old_calculate_tk_status(old_calculate_nr(frame_nilai(n, seed)))
+    pd.testing.assert_frame_equal(generate_nr_description(df), old_generate_nr_description(df), check_dtype=False)
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_pipeline_sama_dengan_versi_lama(seed):
+    df = frame_nilai(400, seed)
+    baru = generate_nr_description(calculate_tk_status(calculate_nr(df)))
+    lama = old_generate_nr_description(old_calculate_tk_status(old_calculate_nr(df)))
+    for col in ['NR'] + [f'TK_{tp}' for tp in TP_COLS] + ['Deskripsi_NR']:
+        pd.testing.assert_series_equal(baru[col], lama[col], check_dtype=False)
+
+def test_kolom_tp_hilang():
+    # NR dan deskripsi mengikuti kolom TP yang ada; status TK (TP1-TP5 tetap) gagal sama seperti versi lama
+    df = frame_nilai(400, 7).drop(columns=['TP5'])
+    pd.testing.assert_frame_equal(calculate_nr(df), old_calculate_nr(df), check_dtype=False)
+
+    with pytest.raises(KeyError):
+        old_calculate_tk_status(df)
+    with pytest.raises(KeyError):
+        calculate_tk_status(df)
+
+    rng = np.random.default_rng(7)
+    df = old_calculate_nr(df)
+    for tp in TP_COLS[:-1]:
+        df[f'TK_{tp}'] = rng.choice(['', 'T', 'R'], len(df))
+    pd.testing.assert_frame_equal(generate_nr_description(df), old_generate_nr_description(df), check_dtype=False)